@@ -0,0 +1,48 @@
+from django.contrib import admin
+from .models import ArchivedConsultation, ArchivedOrder, ArchivedOrderItem, ArchivedSubscription
+
+
+class ReadOnlyArchiveAdmin(admin.ModelAdmin):
+    """Bản ghi lưu trữ chỉ để đọc (được ghi bởi `manage.py archive_history`)."""
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedSubscription)
+class ArchivedSubscriptionAdmin(ReadOnlyArchiveAdmin):
+    list_display = ('id', 'user', 'service', 'status', 'start_date', 'expiration_date', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('user__email', 'service__name')
+    list_select_related = ('user', 'service')
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    can_delete = False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(ReadOnlyArchiveAdmin):
+    list_display = ('id', 'user', 'status', 'total_price', 'created_at', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('id', 'user__email')
+    list_select_related = ('user',)
+    inlines = [ArchivedOrderItemInline]
+
+
+@admin.register(ArchivedConsultation)
+class ArchivedConsultationAdmin(ReadOnlyArchiveAdmin):
+    list_display = ('user', 'service', 'assigned_staff', 'status', 'created_at', 'completed_at', 'archived_at')
+    list_filter = ('status', 'assigned_staff')
+    list_select_related = ('user', 'service', 'assigned_staff')
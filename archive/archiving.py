@@ -0,0 +1,183 @@
+"""
+Chuyển các bản ghi đã kết thúc từ lâu sang bảng lưu trữ (archive/models.py),
+để các bảng đang dùng (dashboard, báo cáo, trang quản lý) và index của chúng
+không lớn mãi:
+
+- UserSubscription đã kết thúc ('expired' / 'disabled') có expiration_date
+  trước mốc lưu trữ (dòng 'disabled' chưa từng có ngày hết hạn được giữ lại);
+- Order 'cancelled' tạo trước mốc lưu trữ (cùng các OrderItem của nó);
+- ConsultationRequest 'completed' hoàn thành trước mốc lưu trữ.
+
+Mốc lưu trữ = now - ARCHIVE_AFTER_DAYS (settings). Chạy bằng
+`manage.py archive_history`. Mỗi lô là một transaction ngắn: một câu
+DELETE ... WHERE id IN (SELECT ... LIMIT n) RETURNING * lấy khóa ghi ngay từ
+đầu và trả về đúng các dòng nó đã xóa (chạy song song không chép trùng), rồi
+một INSERT vào bảng lưu trữ. Lỗi ở bước nào thì cả lô được giữ nguyên.
+Xóa theo cách này không cascade và không phát signal: các dòng con
+(OrderItem) được chuyển tường minh trong cùng lô.
+
+Các view lịch sử đọc cả bảng lưu trữ qua archive/history.py.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from orders.cache import invalidate_status_counts
+from orders.models import Order, OrderItem
+from services.models import UserSubscription
+from users.models import ConsultationRequest
+
+from .models import ArchivedConsultation, ArchivedOrder, ArchivedOrderItem, ArchivedSubscription
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+DEFAULT_BATCH_SIZE = 500
+
+logger = logging.getLogger('archive')
+
+
+class ArchiveResult:
+    def __init__(self):
+        self.counts = {kind: 0 for kind in KINDS}
+        self.batches = 0
+        self.duration = 0.0
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def rows_per_second(self):
+        return self.total / self.duration if self.duration else float(self.total)
+
+    def __str__(self):
+        counts = ' '.join(f'{kind}={count}' for kind, count in self.counts.items())
+        return (
+            f'{counts} batches={self.batches} '
+            f'duration={self.duration * 1000:.0f}ms (~{self.rows_per_second:.0f} dòng/giây)'
+        )
+
+
+def get_archive_after():
+    return timedelta(days=getattr(settings, 'ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS))
+
+
+# --- ĐIỀU KIỆN LƯU TRỮ ---
+
+def archivable_subscriptions(cutoff):
+    # Index sub_status_expiration_idx
+    return UserSubscription.objects.filter(status__in=UserSubscription.ENDED_STATUSES, expiration_date__lt=cutoff)
+
+
+def archivable_orders(cutoff):
+    # Index order_status_created_idx
+    return Order.objects.filter(status='cancelled', created_at__lt=cutoff)
+
+
+def archivable_consultations(cutoff):
+    # Index consult_status_completed_idx
+    return ConsultationRequest.objects.filter(status='completed', completed_at__lt=cutoff)
+
+
+# --- CHUYỂN DỮ LIỆU ---
+
+def _take(queryset, order_by, batch_size=None):
+    """
+    Xóa tối đa `batch_size` dòng của `queryset` (theo `order_by`) và trả về
+    chúng dưới dạng instance của model gốc. Phải gọi trong transaction.
+    """
+    model = queryset.model
+    candidates = queryset.order_by(*order_by)
+    if connection.features.has_select_for_update_skip_locked:
+        # Nhiều node chạy cùng lúc thì lấy các lô khác nhau
+        candidates = candidates.select_for_update(skip_locked=True)
+    if batch_size:
+        candidates = candidates[:batch_size]
+    if not connection.features.can_return_columns_from_insert:
+        rows = list(candidates)
+        # Như câu DELETE bên dưới: không cascade, không signal
+        model.objects.filter(pk__in=[row.pk for row in rows])._raw_delete(queryset.db)
+        return rows
+    sql, params = candidates.values('pk').query.sql_with_params()
+    qn = connection.ops.quote_name
+    delete_sql = (
+        f"DELETE FROM {qn(model._meta.db_table)} "
+        f"WHERE {qn(model._meta.pk.column)} IN ({sql}) RETURNING *"
+    )
+    # raw() chuyển kiểu giá trị trả về (datetime, Decimal...) như một truy vấn ORM
+    return list(model.objects.raw(delete_sql, params))
+
+
+def _copy(rows, archive_model, **extra):
+    fields = [field.attname for field in rows[0]._meta.concrete_fields]
+    archive_model.objects.bulk_create([
+        archive_model(**{name: getattr(row, name) for name in fields}, **extra) for row in rows
+    ])
+
+
+def archive_subscriptions_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """Lưu trữ một lô dịch vụ đã kết thúc. Trả về số dòng đã chuyển (0 = hết việc)."""
+    with transaction.atomic():
+        rows = _take(archivable_subscriptions(cutoff), ('expiration_date', 'pk'), batch_size)
+        if rows:
+            # Dịch vụ đã kết thúc không nằm trong tập quyền (services/entitlements.py): không cần xóa cache.
+            _copy(rows, ArchivedSubscription, archived_at=timezone.now())
+    return len(rows)
+
+
+def archive_orders_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """Lưu trữ một lô hóa đơn đã hủy cùng các mục của chúng."""
+    with transaction.atomic():
+        orders = _take(archivable_orders(cutoff), ('created_at', 'pk'), batch_size)
+        if orders:
+            # Khóa ngoại được kiểm tra khi commit: xóa Order trước OrderItem vẫn hợp lệ.
+            items = _take(OrderItem.objects.filter(order_id__in=[order.pk for order in orders]), ('pk',))
+            _copy(orders, ArchivedOrder, archived_at=timezone.now())
+            if items:
+                _copy(items, ArchivedOrderItem)
+            # Số hóa đơn 'cancelled' trên trang quản lý đã đổi
+            transaction.on_commit(invalidate_status_counts)
+    return len(orders)
+
+
+def archive_consultations_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """Lưu trữ một lô yêu cầu tư vấn đã hoàn thành."""
+    with transaction.atomic():
+        rows = _take(archivable_consultations(cutoff), ('completed_at', 'pk'), batch_size)
+        if rows:
+            _copy(rows, ArchivedConsultation, archived_at=timezone.now())
+    return len(rows)
+
+
+KINDS = {
+    'subscriptions': archive_subscriptions_batch,
+    'orders': archive_orders_batch,
+    'consultations': archive_consultations_batch,
+}
+
+
+def archive_history(kinds=None, batch_size=DEFAULT_BATCH_SIZE, older_than=None, now=None):
+    """
+    Lưu trữ mọi bản ghi đủ điều kiện của các loại `kinds` (mặc định: tất cả),
+    theo từng lô. `older_than` (timedelta) mặc định là ARCHIVE_AFTER_DAYS.
+    Trả về ArchiveResult.
+    """
+    now = now or timezone.now()
+    cutoff = now - (older_than if older_than is not None else get_archive_after())
+    result = ArchiveResult()
+    started = time.perf_counter()
+    for kind in kinds or KINDS:
+        archive_batch = KINDS[kind]
+        while True:
+            moved = archive_batch(cutoff, batch_size)
+            if not moved:
+                break
+            result.counts[kind] += moved
+            result.batches += 1
+    result.duration = time.perf_counter() - started
+    if result.total:
+        logger.info('archive_history cutoff=%s %s', cutoff.isoformat(), result)
+    return result
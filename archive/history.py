@@ -0,0 +1,121 @@
+"""
+Đọc lịch sử gồm cả bản ghi gốc lẫn bản ghi đã lưu trữ (archive/archiving.py).
+
+Bảng lưu trữ có cùng tên cột và quan hệ với bảng gốc, nên mỗi hàm chạy cùng
+một bộ lọc trên cả hai bảng rồi trộn kết quả; template dùng chung cho cả hai
+loại (bản ghi lưu trữ có `is_archived` = True và chỉ để đọc).
+
+Danh sách chỉ lấy từ mỗi bảng đúng số dòng cần cho trang hiện tại (LIMIT trong
+SQL, theo cùng thứ tự với index) rồi trộn hai dãy đã sắp xếp: chi phí không
+tăng theo độ dài lịch sử.
+"""
+import heapq
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
+
+from django.db.models import Count, F
+
+from orders.models import Order, OrderItem
+from services.models import UserSubscription
+from services.pagination import KeysetPage, cursor_for, keyset_paginate
+from users.models import ConsultationRequest
+
+from .models import ArchivedConsultation, ArchivedOrder, ArchivedOrderItem, ArchivedSubscription
+
+_OLDEST = datetime.min.replace(tzinfo=dt_timezone.utc)
+
+
+def _merge_newest(sources, keys, limit):
+    """Trộn các dãy đã sắp xếp giảm dần theo `keys`, lấy `limit` phần tử đầu."""
+    def sort_key(row):
+        return tuple(getattr(row, key) or _OLDEST for key in keys)
+    return list(islice(heapq.merge(*sources, key=sort_key, reverse=True), limit))
+
+
+# --- DỊCH VỤ ---
+
+ENDED_SUBSCRIPTION_LIMIT = 20
+
+
+def _ended_subscription_sources(*args, **filters):
+    hot = UserSubscription.objects.filter(*args, status__in=UserSubscription.ENDED_STATUSES, **filters)
+    archived = ArchivedSubscription.objects.filter(*args, **filters)
+    return hot, archived
+
+
+def ended_subscriptions(*args, limit=ENDED_SUBSCRIPTION_LIMIT, **filters):
+    """
+    `limit` dịch vụ đã kết thúc ('expired' / 'disabled') khớp bộ lọc, hết hạn
+    gần nhất trước (dòng không có ngày hết hạn xếp cuối).
+    """
+    ordering = (F('expiration_date').desc(nulls_last=True), '-pk')
+    related = ('service', 'user', 'purchased_by')
+    sources = [
+        qs.select_related(*related).order_by(*ordering)[:limit]
+        for qs in _ended_subscription_sources(*args, **filters)
+    ]
+    return _merge_newest(sources, ('expiration_date', 'pk'), limit)
+
+
+def ended_subscription_count(*args, **filters):
+    return sum(qs.count() for qs in _ended_subscription_sources(*args, **filters))
+
+
+def subscription_counts_by(field):
+    """{giá trị `field`: số dịch vụ đã bán}, kể cả dịch vụ đã lưu trữ (dùng cho báo cáo)."""
+    counts = {}
+    for model in (UserSubscription, ArchivedSubscription):
+        for value, count in model.objects.order_by().values_list(field).annotate(n=Count('pk')).values_list(field, 'n'):
+            counts[value] = counts.get(value, 0) + count
+    return counts
+
+
+def subscription_total():
+    return UserSubscription.objects.count() + ArchivedSubscription.objects.count()
+
+
+# --- YÊU CẦU TƯ VẤN ---
+
+CONSULTATION_KEYS = ('created_at', 'id')
+
+
+def consultation_page(*args, cursor=None, per_page=50, **filters):
+    """
+    Một trang yêu cầu tư vấn khớp bộ lọc (cả bảng gốc và bảng lưu trữ), mới
+    nhất trước. Hai bảng dùng chung không gian id nên một con trỏ keyset
+    (created_at, id) áp dụng cho cả hai; mỗi bảng chỉ đọc tối đa per_page + 1 dòng.
+    Con trỏ sai: InvalidCursor (services/pagination.py).
+    """
+    pages = [
+        keyset_paginate(
+            model.objects.filter(*args, **filters).select_related('user', 'service', 'assigned_staff'),
+            cursor=cursor, per_page=per_page, keys=CONSULTATION_KEYS,
+        )
+        for model in (ConsultationRequest, ArchivedConsultation)
+    ]
+    items = _merge_newest([page.items for page in pages], CONSULTATION_KEYS, per_page)
+    next_cursor = None
+    if items and (any(page.has_next for page in pages) or sum(len(page) for page in pages) > len(items)):
+        next_cursor = cursor_for(items[-1], CONSULTATION_KEYS)
+    return KeysetPage(items, next_cursor)
+
+
+def consultation_counts_by_staff(**filters):
+    """{assigned_staff_id: số yêu cầu} trên cả bảng gốc và bảng lưu trữ."""
+    counts = {}
+    for model in (ConsultationRequest, ArchivedConsultation):
+        rows = model.objects.filter(**filters).order_by().values_list('assigned_staff').annotate(n=Count('pk'))
+        for staff_id, count in rows.values_list('assigned_staff', 'n'):
+            counts[staff_id] = counts.get(staff_id, 0) + count
+    return counts
+
+
+def consultation_count(**filters):
+    return ConsultationRequest.objects.filter(**filters).count() + ArchivedConsultation.objects.filter(**filters).count()
+
+
+# --- HÓA ĐƠN ---
+
+def order_sources():
+    """Các cặp (model Hóa đơn, model Mục hóa đơn): bảng gốc trước, bảng lưu trữ sau."""
+    return ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem))
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from archive.archiving import DEFAULT_BATCH_SIZE, KINDS, archive_history, get_archive_after
+
+
+class Command(BaseCommand):
+    help = (
+        'Chuyển dịch vụ đã kết thúc, hóa đơn đã hủy và yêu cầu tư vấn đã hoàn thành cũ hơn '
+        'ARCHIVE_AFTER_DAYS sang bảng lưu trữ, theo từng lô. Chạy song song trên nhiều máy vẫn an toàn.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Ghi đè ARCHIVE_AFTER_DAYS.')
+        parser.add_argument('--only', action='append', choices=list(KINDS),
+                            help='Chỉ lưu trữ loại này (lặp lại để chọn nhiều loại).')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days phải >= 0.')
+        older_than = timedelta(days=options['days']) if options['days'] is not None else get_archive_after()
+        result = archive_history(options['only'], options['batch_size'], older_than)
+        counts = ', '.join(f'{count} {kind}' for kind, count in result.counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Đã lưu trữ {counts} (cũ hơn {older_than.days} ngày) trong {result.batches} lô, '
+            f'{result.duration * 1000:.0f} ms (~{result.rows_per_second:.0f} dòng/giây).'
+        ))
@@ -0,0 +1,100 @@
+# Generated by Django 4.2.25 on 2026-10-18 07:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('services', '0022_subscription_archive_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('archived_at', models.DateTimeField(verbose_name='Archived at')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Chờ xác nhận'), ('confirmed', 'Đã xác nhận'), ('cancelled', 'Đã hủy')], max_length=20, verbose_name='Trạng thái')),
+                ('total_price', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Tổng giá')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Hóa đơn lưu trữ',
+                'verbose_name_plural': 'Các Hóa đơn lưu trữ',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('service_name', models.CharField(max_length=255)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Giá')),
+                ('duration_days', models.PositiveIntegerField(verbose_name='Số ngày')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='services.category')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='archive.archivedorder')),
+                ('service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='services.service')),
+                ('supplier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='services.supplier')),
+            ],
+            options={
+                'verbose_name': 'Mục Hóa đơn lưu trữ',
+                'verbose_name_plural': 'Các Mục Hóa đơn lưu trữ',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedConsultation',
+            fields=[
+                ('archived_at', models.DateTimeField(verbose_name='Archived at')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('new', 'Mới'), ('assigned', 'Đã giao'), ('completed', 'Đã hoàn thành')], max_length=20, verbose_name='Trạng thái')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='Ghi chú (Staff)')),
+                ('created_at', models.DateTimeField(verbose_name='Ngày yêu cầu')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Ngày hoàn thành')),
+                ('assigned_staff', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_assigned_consults', to=settings.AUTH_USER_MODEL, verbose_name='Nhân viên tư vấn')),
+                ('service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='services.service', verbose_name='Dịch vụ quan tâm')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_consults', to=settings.AUTH_USER_MODEL, verbose_name='Khách hàng')),
+            ],
+            options={
+                'verbose_name': 'Yêu cầu Tư vấn lưu trữ',
+                'verbose_name_plural': 'Các yêu cầu Tư vấn lưu trữ',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubscription',
+            fields=[
+                ('archived_at', models.DateTimeField(verbose_name='Archived at')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('duration_days', models.PositiveIntegerField(blank=True, null=True, verbose_name='Duration (days)')),
+                ('start_date', models.DateTimeField(blank=True, null=True, verbose_name='Start Date')),
+                ('expiration_date', models.DateTimeField(blank=True, null=True, verbose_name='Expiration Date')),
+                ('is_active', models.BooleanField(default=False)),
+                ('is_verified', models.BooleanField(default=False, verbose_name='Admin Verified')),
+                ('status', models.CharField(choices=[('pending', 'Pending verification'), ('active', 'Active'), ('expiring', 'Expiring soon'), ('expired', 'Expired'), ('disabled', 'Disabled')], max_length=10, verbose_name='Status')),
+                ('purchased_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_purchased_subscriptions', to=settings.AUTH_USER_MODEL)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='services.service')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_subscriptions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived subscription',
+                'verbose_name_plural': 'Archived subscriptions',
+                'indexes': [models.Index(fields=['user', '-expiration_date'], name='archsub_user_exp_idx'), models.Index(fields=['purchased_by'], name='archsub_purchaser_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='archorder_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedconsultation',
+            index=models.Index(fields=['assigned_staff', 'status'], name='archconsult_staff_status_idx'),
+        ),
+    ]
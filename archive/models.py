@@ -0,0 +1,113 @@
+"""
+Bảng lưu trữ cho các bản ghi đã kết thúc lâu (xem archive/archiving.py).
+
+Mỗi bảng có đúng các cột (cùng tên, cùng id) với bảng gốc, cộng thời điểm lưu
+trữ, nên các view lịch sử dùng được bản ghi lưu trữ thay cho bản ghi gốc
+(sub.service.name, consult.get_status_display...) — xem archive/history.py.
+"""
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from orders.models import Order
+from services.models import Category, Service, Supplier, UserSubscription
+from users.models import ConsultationRequest
+
+
+class ArchivedRecord(models.Model):
+    archived_at = models.DateTimeField(_('Archived at'))
+
+    # Template phân biệt bản ghi lưu trữ (chỉ đọc) với bản ghi gốc
+    is_archived = True
+
+    class Meta:
+        abstract = True
+
+
+class ArchivedSubscription(ArchivedRecord):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_subscriptions')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='+')
+    purchased_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='archived_purchased_subscriptions')
+    duration_days = models.PositiveIntegerField(_('Duration (days)'), null=True, blank=True)
+    start_date = models.DateTimeField(_('Start Date'), null=True, blank=True)
+    expiration_date = models.DateTimeField(_('Expiration Date'), null=True, blank=True)
+    is_active = models.BooleanField(default=False)
+    is_verified = models.BooleanField(_('Admin Verified'), default=False)
+    status = models.CharField(_('Status'), max_length=10, choices=UserSubscription.STATUS_CHOICES)
+
+    class Meta:
+        verbose_name = _('Archived subscription')
+        verbose_name_plural = _('Archived subscriptions')
+        indexes = [
+            models.Index(fields=['user', '-expiration_date'], name='archsub_user_exp_idx'),
+            models.Index(fields=['purchased_by'], name='archsub_purchaser_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.service} (lưu trữ)'
+
+
+class ArchivedOrder(ArchivedRecord):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='archived_orders')
+    status = models.CharField(_('Trạng thái'), max_length=20, choices=Order.STATUS_CHOICES)
+    total_price = models.DecimalField(_('Tổng giá'), max_digits=12, decimal_places=2, default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Hóa đơn lưu trữ')
+        verbose_name_plural = _('Các Hóa đơn lưu trữ')
+        indexes = [
+            models.Index(fields=['status', '-created_at', '-id'], name='archorder_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Hóa đơn #{self.id} (lưu trữ)"
+
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    # Cùng tên quan hệ với OrderItem.order / Order.items (bộ lọc và xuất file dùng chung)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    service = models.ForeignKey(Service, on_delete=models.SET_NULL, null=True, related_name='+')
+    service_name = models.CharField(max_length=255)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    supplier = models.ForeignKey(Supplier, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    price = models.DecimalField(_('Giá'), max_digits=10, decimal_places=2)
+    duration_days = models.PositiveIntegerField(_('Số ngày'))
+
+    class Meta:
+        verbose_name = _('Mục Hóa đơn lưu trữ')
+        verbose_name_plural = _('Các Mục Hóa đơn lưu trữ')
+
+    def __str__(self):
+        return f"{self.service_name} ({self.duration_days} ngày) - HĐ #{self.order_id}"
+
+
+class ArchivedConsultation(ArchivedRecord):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_consults', verbose_name=_('Khách hàng'))
+    service = models.ForeignKey(Service, on_delete=models.SET_NULL, null=True, related_name='+', verbose_name=_('Dịch vụ quan tâm'))
+    assigned_staff = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='archived_assigned_consults', verbose_name=_('Nhân viên tư vấn'),
+    )
+    status = models.CharField(_('Trạng thái'), max_length=20, choices=ConsultationRequest.STATUS_CHOICES)
+    notes = models.TextField(_('Ghi chú (Staff)'), blank=True, null=True)
+    created_at = models.DateTimeField(_('Ngày yêu cầu'))
+    completed_at = models.DateTimeField(_('Ngày hoàn thành'), null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Yêu cầu Tư vấn lưu trữ')
+        verbose_name_plural = _('Các yêu cầu Tư vấn lưu trữ')
+        indexes = [
+            models.Index(fields=['assigned_staff', 'status'], name='archconsult_staff_status_idx'),
+        ]
+
+    def __str__(self):
+        service_name = self.service.name if self.service else "[Dịch vụ đã xóa]"
+        return f"Yêu cầu từ {self.user} cho {service_name} (lưu trữ)"
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from services.models import Service, UserSubscription
+from users.models import ConsultationRequest, User
+
+from .archiving import archive_history
+from .history import consultation_page, ended_subscription_count, ended_subscriptions, subscription_total
+from .models import ArchivedConsultation, ArchivedOrder, ArchivedOrderItem, ArchivedSubscription
+
+
+class ArchiveTestMixin:
+    def setUp(self):
+        self.now = timezone.now()
+        self.old = self.now - timedelta(days=400)
+        self.recent = self.now - timedelta(days=10)
+        self.user = User.objects.create_user(email='member@example.com', password='pw-123456')
+        self.staff = User.objects.create_user(email='staff@example.com', password='pw-123456', is_staff=True)
+        self.service = Service.objects.create(name='Bảo hiểm', description='', price=Decimal('100.00'))
+
+    def subscription(self, expiration_date, is_active=False):
+        sub = UserSubscription.objects.create(
+            user=self.user, service=self.service, is_verified=True, is_active=is_active,
+            duration_days=30, expiration_date=expiration_date,
+        )
+        return UserSubscription.objects.get(pk=sub.pk)
+
+    def order(self, status, created_at, items=2):
+        order = Order.objects.create(user=self.user, status=status, total_price=Decimal('200.00'))
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, service=self.service, service_name=self.service.name,
+                      price=Decimal('100.00'), duration_days=30)
+            for _ in range(items)
+        ])
+        return Order.objects.get(pk=order.pk)
+
+    def consultation(self, status, created_at, completed_at=None):
+        consult = ConsultationRequest.objects.create(
+            user=self.user, service=self.service, assigned_staff=self.staff, status=status, completed_at=completed_at,
+        )
+        ConsultationRequest.objects.filter(pk=consult.pk).update(created_at=created_at)
+        return ConsultationRequest.objects.get(pk=consult.pk)
+
+
+# --- CHUYỂN SANG BẢNG LƯU TRỮ ---
+
+class ArchiveHistoryTests(ArchiveTestMixin, TestCase):
+    def test_moves_only_eligible_rows(self):
+        old_sub = self.subscription(self.old)
+        recent_sub = self.subscription(self.recent)
+        current_sub = self.subscription(self.now + timedelta(days=30), is_active=True)
+        old_order = self.order('cancelled', self.old)
+        confirmed_order = self.order('confirmed', self.old)
+        old_consult = self.consultation('completed', self.old, completed_at=self.old)
+        open_consult = self.consultation('assigned', self.old)
+
+        result = archive_history(batch_size=1, now=self.now)
+
+        self.assertEqual(result.counts, {'subscriptions': 1, 'orders': 1, 'consultations': 1})
+        self.assertEqual(set(UserSubscription.objects.values_list('pk', flat=True)), {recent_sub.pk, current_sub.pk})
+        self.assertEqual(list(Order.objects.values_list('pk', flat=True)), [confirmed_order.pk])
+        self.assertEqual(list(ConsultationRequest.objects.values_list('pk', flat=True)), [open_consult.pk])
+        self.assertEqual(list(ArchivedSubscription.objects.values_list('pk', flat=True)), [old_sub.pk])
+        self.assertEqual(list(ArchivedOrder.objects.values_list('pk', flat=True)), [old_order.pk])
+        self.assertEqual(list(ArchivedConsultation.objects.values_list('pk', flat=True)), [old_consult.pk])
+
+    def test_round_trip_keeps_values(self):
+        sub = self.subscription(self.old)
+        order = self.order('cancelled', self.old, items=3)
+        item_values = list(order.items.order_by('pk').values_list('pk', 'service_name', 'price', 'duration_days'))
+        consult = self.consultation('completed', self.old, completed_at=self.old)
+
+        archive_history(now=self.now)
+
+        archived_sub = ArchivedSubscription.objects.get(pk=sub.pk)
+        for field in ('user_id', 'service_id', 'duration_days', 'expiration_date', 'is_active', 'is_verified', 'status'):
+            self.assertEqual(getattr(archived_sub, field), getattr(sub, field), field)
+        archived_order = ArchivedOrder.objects.get(pk=order.pk)
+        for field in ('user_id', 'status', 'total_price', 'created_at', 'updated_at'):
+            self.assertEqual(getattr(archived_order, field), getattr(order, field), field)
+        self.assertEqual(
+            list(archived_order.items.order_by('pk').values_list('pk', 'service_name', 'price', 'duration_days')),
+            item_values,
+        )
+        self.assertFalse(OrderItem.objects.exists())
+        self.assertEqual(ArchivedOrderItem.objects.count(), 3)
+        archived_consult = ArchivedConsultation.objects.get(pk=consult.pk)
+        for field in ('user_id', 'assigned_staff_id', 'status', 'created_at', 'completed_at'):
+            self.assertEqual(getattr(archived_consult, field), getattr(consult, field), field)
+
+    def test_second_run_moves_nothing(self):
+        self.subscription(self.old)
+        self.order('cancelled', self.old)
+        archive_history(now=self.now)
+
+        result = archive_history(now=self.now)
+
+        self.assertEqual(result.total, 0)
+        self.assertEqual(ArchivedOrderItem.objects.count(), 2)
+
+
+# --- ĐỌC LỊCH SỬ (CẢ HAI BẢNG) ---
+
+class HistoryTests(ArchiveTestMixin, TestCase):
+    def test_ended_subscriptions_merge_both_tables_newest_first(self):
+        oldest = self.subscription(self.old - timedelta(days=10))
+        archived = self.subscription(self.old)
+        recent = self.subscription(self.recent)
+        archive_history(kinds=['subscriptions'], now=self.now - timedelta(days=5))
+        # oldest và archived đã sang bảng lưu trữ, recent vẫn ở bảng gốc
+        self.assertEqual(ArchivedSubscription.objects.count(), 2)
+
+        rows = ended_subscriptions(user=self.user)
+
+        self.assertEqual([row.pk for row in rows], [recent.pk, archived.pk, oldest.pk])
+        self.assertEqual([row.pk for row in ended_subscriptions(user=self.user, limit=2)], [recent.pk, archived.pk])
+        self.assertEqual(ended_subscription_count(user=self.user), 3)
+        self.assertEqual(subscription_total(), 3)
+
+    def test_consultation_pages_cover_both_tables(self):
+        consults = [
+            self.consultation('completed', self.old + timedelta(days=i), completed_at=self.old + timedelta(days=i))
+            for i in range(5)
+        ]
+        archive_history(kinds=['consultations'], now=self.old + timedelta(days=365 + 3))
+        self.assertEqual(ArchivedConsultation.objects.count(), 3)
+
+        seen, cursor = [], None
+        while True:
+            page = consultation_page(cursor=cursor, per_page=2, status='completed')
+            seen += [row.pk for row in page]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(seen, [consult.pk for consult in reversed(consults)])
@@ -0,0 +1,16 @@
+"""
+Phiên bản nội dung blog: mốc thời gian của lần thêm/sửa/xóa Post gần nhất.
+Post chỉ có created_at nên bài bị sửa không đổi created_at; ETag/Last-Modified
+của các trang có bài đăng dựa vào phiên bản này (xem store_tis/conditional.py).
+"""
+from services.cache import cache_version, bump_cache_version
+
+BLOG_VERSION_KEY = 'blog:version'
+
+
+def blog_version():
+    return cache_version(BLOG_VERSION_KEY)
+
+
+def bump_blog_version():
+    bump_cache_version(BLOG_VERSION_KEY)
@@ -8,6 +8,7 @@ class Post(models.Model):
     slug = models.SlugField(_('Slug'), max_length=255, unique=True, blank=True, help_text="Tự động tạo nếu để trống.")
     content = models.TextField(_('Nội dung'))
     image = models.ImageField(_('Hình ảnh'), upload_to='posts_images/', null=True, blank=True)
+    image_variants = models.JSONField(_('Ảnh phái sinh'), default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
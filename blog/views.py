@@ -1,11 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from store_tis.conditional import conditional_page, catalog_and_blog_versions
 from .models import Post
 from .forms import PostForm
 
 # --- 1. VIEW DÀNH CHO USER (CÔNG KHAI) ---
 
+@conditional_page(catalog_and_blog_versions)
 def post_detail(request, slug):
     """
     Hiển thị trang chi tiết cho một bài đăng.
@@ -0,0 +1,212 @@
+"""
+Tạo ảnh phái sinh (derivative) cho ảnh upload: các bản WebP/JPEG ở những độ
+rộng cố định, cộng với một ảnh placeholder rất nhỏ (làm mờ) dạng data URI.
+
+Kết quả được lưu vào một JSONField cạnh trường ảnh gốc, ví dụ
+Service.thumbnail_variants:
+
+    {
+        "source": "service_thumbnails/a.jpg",
+        "width": 2048, "height": 1366,
+        "webp": {"320": "derivatives/service_thumbnails/a/320.webp", ...},
+        "jpeg": {"320": "derivatives/service_thumbnails/a/320.jpg", ...},
+        "placeholder": "data:image/jpeg;base64,..."
+    }
+
+Việc tạo ảnh chạy trong worker nền (mediastore/tasks.py), không trong request.
+"""
+import base64
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from PIL import Image, ImageFilter, ImageOps, UnidentifiedImageError
+
+from blog.cache import bump_blog_version
+from blog.models import Post
+from services.cache import bump_catalog_version
+from services.models import Service, ServiceImage, Supplier
+from storefront.prerender import home_path, queue_paths, service_detail_path, service_list_path
+
+from .storage import is_content_addressed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+PLACEHOLDER_WIDTH = 16
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+
+# Derivative luôn ghi bằng storage thường (không theo nội dung), đặt tên theo
+# ảnh gốc: derivatives/<tên ảnh gốc không đuôi>/<độ rộng>.<định dạng>
+derivative_storage = FileSystemStorage()
+
+
+class ImageSource:
+    """
+    Một trường ảnh cần tạo derivative và trường JSON lưu kết quả.
+    `bump_version` và `pages(instance)` cho biết phiên bản cache và các trang
+    tĩnh cần làm mới khi derivative của bản ghi đổi (xem refresh()).
+    """
+
+    def __init__(self, model, field_name, variants_field, bump_version, pages):
+        self.model = model
+        self.field_name = field_name
+        self.variants_field = variants_field
+        self.bump_version = bump_version
+        self.pages = pages
+
+    @property
+    def label(self):
+        return f'{self.model._meta.label}.{self.field_name}'
+
+    def is_stale(self, instance):
+        """Ảnh gốc đã đổi (hoặc bị xóa) so với lần tạo derivative gần nhất."""
+        name = getattr(instance, self.field_name).name or ''
+        variants = getattr(instance, self.variants_field) or {}
+        return variants.get('source', '') != name
+
+
+def _service_pages(service):
+    # Thẻ dịch vụ (services/service_cards.html) nằm trên các trang danh sách
+    yield service_detail_path(service.pk)
+    yield service_list_path()
+    if service.category_id:
+        yield service_list_path(service.category.slug)
+
+
+def _supplier_pages(supplier):
+    return [service_detail_path(pk) for pk in supplier.services.values_list('pk', flat=True)]
+
+
+SOURCES = [
+    ImageSource(Service, 'thumbnail', 'thumbnail_variants', bump_catalog_version, _service_pages),
+    ImageSource(ServiceImage, 'image', 'image_variants', bump_catalog_version,
+                lambda image: [service_detail_path(image.service_id)]),
+    ImageSource(Supplier, 'logo', 'logo_variants', bump_catalog_version, _supplier_pages),
+    ImageSource(Post, 'image', 'image_variants', bump_blog_version, lambda post: [home_path()]),
+]
+SOURCES_BY_MODEL = {source.model: source for source in SOURCES}
+
+
+def get_widths():
+    return tuple(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', DEFAULT_WIDTHS))
+
+
+def _derivative_dir(source_name):
+    stem, _ = posixpath.splitext(source_name)
+    return posixpath.join('derivatives', stem)
+
+
+def _encode(image, fmt, quality):
+    buffer = BytesIO()
+    if fmt == 'JPEG':
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def _resize(image, width):
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def build_variants(source_name):
+    """
+    Đọc ảnh `source_name` từ storage, ghi các derivative và trả về dict mô tả.
+    Trả về {'source': source_name} nếu không đọc được ảnh (ví dụ SVG).
+    """
+    storage = derivative_storage
+    if not source_name:
+        return {}
+    try:
+        with default_storage.open(source_name, 'rb') as fh:
+            image = Image.open(fh)
+            image.load()
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as e:
+        logger.warning('Không tạo được derivative cho %s: %s', source_name, e)
+        return {'source': source_name}
+
+    image = ImageOps.exif_transpose(image)
+    variants = {
+        'source': source_name,
+        'width': image.width,
+        'height': image.height,
+        'webp': {},
+        'jpeg': {},
+    }
+    directory = _derivative_dir(source_name)
+    # Không phóng to ảnh: chỉ tạo các độ rộng nhỏ hơn ảnh gốc (luôn có ít nhất một bản).
+    widths = [w for w in get_widths() if w < image.width] or [image.width]
+    for width in widths:
+        resized = _resize(image, width) if width != image.width else image
+        for key, fmt, ext, quality in (('webp', 'WEBP', 'webp', WEBP_QUALITY), ('jpeg', 'JPEG', 'jpg', JPEG_QUALITY)):
+            name = posixpath.join(directory, f'{width}.{ext}')
+            if storage.exists(name):
+                storage.delete(name)
+            variants[key][str(width)] = storage.save(name, ContentFile(_encode(resized, fmt, quality)))
+
+    tiny = _resize(image, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    variants['placeholder'] = 'data:image/jpeg;base64,' + base64.b64encode(_encode(tiny, 'JPEG', 40)).decode()
+    return variants
+
+
+def delete_variants(variants, keep=()):
+    """
+    Xóa các file derivative cũ (trừ những file nằm trong `keep`).
+    Derivative của ảnh lưu theo nội dung được dùng chung giữa các bản ghi,
+    nên chỉ bị xóa khi chính ảnh gốc hết tham chiếu (mediastore/storage.py).
+    """
+    variants = variants or {}
+    if is_content_addressed(variants.get('source')):
+        return
+    for key in ('webp', 'jpeg'):
+        for name in variants.get(key, {}).values():
+            if name not in keep and derivative_storage.exists(name):
+                derivative_storage.delete(name)
+
+
+def delete_derivative_dir(source_name):
+    """Xóa toàn bộ derivative của một ảnh gốc."""
+    directory = _derivative_dir(source_name)
+    if not derivative_storage.exists(directory):
+        return
+    _, files = derivative_storage.listdir(directory)
+    for name in files:
+        derivative_storage.delete(posixpath.join(directory, name))
+
+
+def refresh(source, pk):
+    """
+    Tạo lại derivative cho một bản ghi nếu ảnh gốc đã đổi.
+    Ghi kết quả bằng UPDATE để không kích hoạt lại post_save; vì không có
+    signal nên tự bump phiên bản cache (ETag) và xếp hàng render lại các trang
+    tĩnh đang dùng bản ảnh gốc thay cho derivative.
+    """
+    instance = source.model.objects.filter(pk=pk).first()
+    if instance is None or not source.is_stale(instance):
+        return False
+    old = getattr(instance, source.variants_field) or {}
+    variants = build_variants(getattr(instance, source.field_name).name)
+    updated = source.model.objects.filter(
+        pk=pk, **{source.field_name: getattr(instance, source.field_name).name}
+    ).update(**{source.variants_field: variants})
+    if updated:
+        new_files = set(variants.get('webp', {}).values()) | set(variants.get('jpeg', {}).values())
+        delete_variants(old, keep=new_files)
+        paths = list(source.pages(instance))
+        transaction.on_commit(source.bump_version)
+        transaction.on_commit(lambda: queue_paths(paths))
+    else:
+        # Ảnh gốc lại vừa đổi trong lúc xử lý: bỏ kết quả này, lượt sau sẽ làm lại.
+        delete_variants(variants)
+    return bool(updated)
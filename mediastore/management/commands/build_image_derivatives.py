@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mediastore.derivatives import SOURCES, refresh
+
+
+class Command(BaseCommand):
+    help = 'Tạo ảnh phái sinh (WebP/JPEG nhiều kích thước + placeholder) cho các ảnh còn thiếu hoặc đã đổi.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Tạo lại cho mọi ảnh, kể cả ảnh đã có derivative.')
+
+    def handle(self, *args, **options):
+        for source in SOURCES:
+            started = time.monotonic()
+            if options['force']:
+                source.model.objects.update(**{source.variants_field: {}})
+            built = 0
+            for pk in source.model.objects.values_list('pk', flat=True).iterator():
+                if refresh(source, pk):
+                    built += 1
+            self.stdout.write(self.style.SUCCESS(
+                f'{source.label}: đã tạo {built} bộ derivative trong {time.monotonic() - started:.2f}s.'
+            ))
@@ -0,0 +1,63 @@
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mediastore.models import MediaBlob
+from mediastore.signals import _file_fields
+from mediastore.storage import CAS_PREFIX, is_content_addressed
+
+
+class Command(BaseCommand):
+    help = (
+        'Đếm lại số tham chiếu của các file lưu theo nội dung từ dữ liệu thực tế '
+        '(dùng khi có thao tác QuerySet.update()/bulk_create bỏ qua signal).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete-orphans', action='store_true', help='Xóa các file cas/ không còn bản ghi nào dùng.')
+
+    def handle(self, *args, **options):
+        counts = Counter()
+        for model in apps.get_models():
+            for field in _file_fields(model):
+                names = model._base_manager.filter(**{f'{field.attname}__startswith': CAS_PREFIX}) \
+                                           .values_list(field.attname, flat=True)
+                counts.update(names.iterator())
+
+        with transaction.atomic():
+            existing = {blob.name: blob for blob in MediaBlob.objects.select_for_update()}
+            to_update = []
+            for name, blob in existing.items():
+                if blob.refcount != counts.get(name, 0):
+                    blob.refcount = counts.get(name, 0)
+                    to_update.append(blob)
+            MediaBlob.objects.bulk_update(to_update, ['refcount'], batch_size=500)
+            MediaBlob.objects.bulk_create(
+                [MediaBlob(name=name, refcount=count) for name, count in counts.items() if name not in existing],
+                batch_size=500,
+            )
+            MediaBlob.objects.filter(refcount=0).delete()
+
+        orphans = 0
+        if options['delete_orphans']:
+            orphans = self._delete_orphans(set(counts))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(counts)} file đang được dùng, đã sửa {len(to_update)} bộ đếm, xóa {orphans} file mồ côi.'
+        ))
+
+    def _delete_orphans(self, referenced, directory=CAS_PREFIX.rstrip('/')):
+        deleted = 0
+        if not default_storage.exists(directory):
+            return 0
+        subdirs, files = default_storage.listdir(directory)
+        for name in files:
+            path = f'{directory}/{name}'
+            if is_content_addressed(path) and path not in referenced:
+                default_storage.delete(path)
+                deleted += 1
+        for subdir in subdirs:
+            deleted += self._delete_orphans(referenced, f'{directory}/{subdir}')
+        return deleted
@@ -0,0 +1,21 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class MediaBlob(models.Model):
+    """
+    Một file trong kho lưu trữ theo nội dung (xem mediastore/storage.py).
+    `refcount` đếm số trường file (trên mọi model) đang trỏ tới file này;
+    file chỉ bị xóa khỏi đĩa khi refcount về 0.
+    """
+    name = models.CharField(_('File Name'), max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(_('Size (bytes)'), default=0)
+    refcount = models.PositiveIntegerField(_('Reference Count'), default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Media Blob')
+        verbose_name_plural = _('Media Blobs')
+
+    def __str__(self):
+        return f'{self.name} ({self.refcount})'
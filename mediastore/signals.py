@@ -0,0 +1,94 @@
+from django.apps import apps
+from django.db import models
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+
+from .derivatives import SOURCES_BY_MODEL, delete_variants
+from .storage import ContentAddressedStorage, retain, release
+from .tasks import enqueue
+
+
+# --- TẠO ẢNH PHÁI SINH KHI ẢNH GỐC THAY ĐỔI ---
+
+def _queue_derivatives(sender, instance, raw=False, **kwargs):
+    source = SOURCES_BY_MODEL[sender]
+    if not raw and source.is_stale(instance):
+        enqueue(source, instance.pk)
+
+
+def _delete_derivatives(sender, instance, **kwargs):
+    delete_variants(getattr(instance, SOURCES_BY_MODEL[sender].variants_field))
+
+
+for _model in SOURCES_BY_MODEL:
+    post_save.connect(_queue_derivatives, sender=_model, dispatch_uid=f'derivatives-save-{_model._meta.label}')
+    post_delete.connect(_delete_derivatives, sender=_model, dispatch_uid=f'derivatives-delete-{_model._meta.label}')
+
+
+# --- ĐẾM THAM CHIẾU FILE TRONG STORAGE THEO NỘI DUNG ---
+
+def _file_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def _name(value):
+    return getattr(value, 'name', value) or ''
+
+
+def _size(storage, name):
+    try:
+        return storage.size(name) if name else 0
+    except OSError:
+        return 0
+
+
+def _remember_files(sender, instance, **kwargs):
+    # Trường bị defer (.only()/.defer()) không có trong __dict__: để None, pre_save sẽ tra DB nếu cần.
+    instance._original_files = {
+        field.attname: _name(instance.__dict__[field.attname]) if field.attname in instance.__dict__ else None
+        for field in _file_fields(sender)
+    }
+
+
+def _load_unknown_originals(sender, instance, raw=False, **kwargs):
+    original = getattr(instance, '_original_files', {})
+    unknown = [name for name, value in original.items() if value is None and name in instance.__dict__]
+    if raw or not unknown or instance.pk is None:
+        return
+    row = sender._base_manager.filter(pk=instance.pk).values(*unknown).first() or {}
+    for name in unknown:
+        original[name] = row.get(name) or ''
+
+
+def _update_file_refs(sender, instance, created=False, raw=False, **kwargs):
+    original = getattr(instance, '_original_files', {})
+    for field in _file_fields(sender):
+        if field.attname not in instance.__dict__:
+            continue
+        old = '' if created else original.get(field.attname)
+        new = _name(instance.__dict__[field.attname])
+        if old is None or old == new:
+            continue
+        retain(new, size=_size(field.storage, new))
+        release(old, field.storage)
+        original[field.attname] = new
+
+
+def _release_file_refs(sender, instance, **kwargs):
+    original = getattr(instance, '_original_files', {})
+    for field in _file_fields(sender):
+        name = original.get(field.attname)
+        if name is None and field.attname in instance.__dict__:
+            name = _name(instance.__dict__[field.attname])
+        release(name or '', field.storage)
+
+
+for _model in apps.get_models():
+    if _file_fields(_model):
+        _uid = _model._meta.label
+        post_init.connect(_remember_files, sender=_model, dispatch_uid=f'file-refs-init-{_uid}')
+        pre_save.connect(_load_unknown_originals, sender=_model, dispatch_uid=f'file-refs-pre-save-{_uid}')
+        post_save.connect(_update_file_refs, sender=_model, dispatch_uid=f'file-refs-save-{_uid}')
+        post_delete.connect(_release_file_refs, sender=_model, dispatch_uid=f'file-refs-delete-{_uid}')
@@ -0,0 +1,138 @@
+"""
+Storage lưu file theo nội dung (content-addressed).
+
+Mỗi file upload được đặt tên theo SHA-256 của nội dung và chia thư mục theo
+2 cặp ký tự đầu: cas/ab/cd/abcdef....jpg. Upload trùng nội dung (dù ở
+ServiceImage, Service.thumbnail, Supplier.logo, Post.image hay User.face_id_image)
+dùng chung một file. Nội dung của một URL không bao giờ đổi, nên có thể cache
+URL media vĩnh viễn (Cache-Control: immutable) ở web server.
+
+Số tham chiếu tới mỗi file được lưu trong MediaBlob và cập nhật bởi signal
+(mediastore/signals.py); file chỉ bị xóa khi không còn bản ghi nào dùng.
+
+Upload trùng nội dung không ghi lại file có sẵn, nhưng tham chiếu của nó chỉ
+được tính (retain) ở post_save, sau khi file đã lưu xong. Trong khoảng đó một
+release() khác có thể đưa refcount về 0, nên việc xóa file:
+- giữ khóa dòng MediaBlob (select_for_update) và kiểm tra lại refcount = 0;
+- bỏ qua file vừa được dùng lại trong REUSE_GRACE_SECONDS (_save() chạm mtime).
+File bị bỏ qua mà rốt cuộc không ai dùng sẽ được dọn bởi
+`manage.py rebuild_media_refcounts --delete-orphans`.
+"""
+import hashlib
+import os
+import posixpath
+import time
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+CAS_PREFIX = 'cas/'
+HASH_CHUNK_SIZE = 64 * 1024
+REUSE_GRACE_SECONDS = 15 * 60
+
+
+def is_content_addressed(name):
+    return bool(name) and name.startswith(CAS_PREFIX)
+
+
+def content_name(digest, original_name):
+    ext = posixpath.splitext(original_name)[1].lower()
+    return posixpath.join(CAS_PREFIX.rstrip('/'), digest[:2], digest[2:4], digest + ext)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # Tên thật được quyết định trong _save() theo nội dung file.
+        return name
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+
+        name = content_name(digest.hexdigest(), name)
+        if self.exists(name):
+            # Đã có file cùng nội dung: không ghi lại, chỉ đánh dấu vừa dùng để
+            # _delete_unreferenced() không xóa nó trước khi retain() kịp chạy.
+            try:
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                pass  # Vừa bị xóa: ghi lại bên dưới.
+        # Ghi ra file tạm cạnh đích rồi đổi tên (atomic). Hai lần lưu cùng nội dung
+        # chạy đồng thời thì lần sau chỉ ghi đè bằng đúng nội dung đó; không ghi
+        # thẳng vào `name`, vì FileSystemStorage._save() gặp file đã tồn tại sẽ
+        # hỏi lại get_available_name() (luôn trả về cùng tên) và lặp mãi.
+        tmp_name = super()._save(f'{name}.{uuid.uuid4().hex}.tmp', content)
+        try:
+            os.replace(self.path(tmp_name), self.path(name))
+        except BaseException:
+            os.remove(self.path(tmp_name))
+            raise
+        return name
+
+    def delete(self, name):
+        """Không xóa file còn được tham chiếu (refcount > 0)."""
+        if is_content_addressed(name):
+            from .models import MediaBlob
+            if MediaBlob.objects.filter(name=name, refcount__gt=0).exists():
+                return
+        super().delete(name)
+
+
+# --- ĐẾM THAM CHIẾU ---
+
+def retain(name, size=0):
+    from .models import MediaBlob
+
+    if not is_content_addressed(name):
+        return
+    if MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1):
+        return
+    blob, created = MediaBlob.objects.get_or_create(name=name, defaults={'refcount': 1, 'size': size})
+    if not created:
+        MediaBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + 1)
+
+
+def release(name, storage):
+    """
+    Giảm refcount; khi về 0 thì sau khi transaction commit xóa file, các ảnh
+    phái sinh của nó và bản ghi MediaBlob (bản ghi được giữ tới lúc đó để khóa).
+    """
+    from .models import MediaBlob
+
+    if not is_content_addressed(name):
+        return
+    MediaBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1)
+    if MediaBlob.objects.filter(name=name, refcount=0).exists():
+        transaction.on_commit(lambda: _delete_unreferenced(name, storage))
+
+
+def _recently_reused(storage, name):
+    try:
+        return time.time() - os.path.getmtime(storage.path(name)) < REUSE_GRACE_SECONDS
+    except (FileNotFoundError, NotImplementedError):
+        return False
+
+
+def _delete_unreferenced(name, storage):
+    from .derivatives import delete_derivative_dir
+    from .models import MediaBlob
+
+    with transaction.atomic():
+        # Khóa dòng: retain() đồng thời phải chờ tới khi xóa xong (rồi tạo lại dòng).
+        blob = MediaBlob.objects.select_for_update().filter(name=name, refcount=0).first()
+        if blob is None:
+            return  # Đã được dùng lại (retain) sau khi refcount về 0.
+        if _recently_reused(storage, name):
+            return
+        blob.delete()
+        if storage.exists(name):
+            storage.delete(name)
+        delete_derivative_dir(name)
@@ -0,0 +1,50 @@
+"""
+Worker nền cho việc tạo ảnh phái sinh.
+
+Công việc được đưa vào hàng đợi sau khi transaction commit và chạy trên một
+ThreadPoolExecutor riêng, nên request upload không phải chờ xử lý ảnh.
+Nếu process dừng giữa chừng, `manage.py build_image_derivatives` sẽ bù lại
+các ảnh còn thiếu.
+
+Đặt IMAGE_DERIVATIVES_ASYNC = False (ví dụ khi chạy test) để xử lý ngay.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .derivatives import refresh
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-derivatives')
+        return _executor
+
+
+def _run(source, pk):
+    close_old_connections()
+    try:
+        refresh(source, pk)
+    except Exception:
+        logger.exception('Lỗi khi tạo derivative cho %s #%s', source.label, pk)
+    finally:
+        close_old_connections()
+
+
+def enqueue(source, pk):
+    """Lên lịch tạo derivative cho bản ghi `pk` sau khi transaction hiện tại commit."""
+    if getattr(settings, 'IMAGE_DERIVATIVES_ASYNC', True):
+        transaction.on_commit(lambda: _get_executor().submit(_run, source, pk))
+    else:
+        transaction.on_commit(lambda: refresh(source, pk))
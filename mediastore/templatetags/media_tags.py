@@ -0,0 +1,44 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from mediastore.derivatives import derivative_storage
+
+register = template.Library()
+
+
+def _srcset(names):
+    items = sorted(((int(width), name) for width, name in names.items()))
+    return ', '.join(f'{derivative_storage.url(name)} {width}w' for width, name in items)
+
+
+@register.simple_tag
+def responsive_image(image, variants, alt='', sizes='100vw', **attrs):
+    """
+    Render <picture> với srcset WebP/JPEG từ các derivative (mediastore/derivatives.py).
+    Khi derivative chưa được tạo xong, quay về <img> trỏ tới ảnh gốc.
+
+    Ví dụ: {% responsive_image service.thumbnail service.thumbnail_variants alt=service.name sizes="300px" style="..." %}
+    """
+    if not image:
+        return ''
+    style = attrs.pop('style', '')
+    extra = format_html_join(' ', '{}="{}"', sorted(attrs.items()))
+    variants = variants or {}
+    if variants.get('source') != image.name or not variants.get('jpeg'):
+        return format_html(
+            '<img src="{}" alt="{}" loading="lazy" decoding="async" style="{}" {}>', image.url, alt, style, extra
+        )
+
+    fallback = variants['jpeg'][max(variants['jpeg'], key=int)]
+    placeholder = variants.get('placeholder', '')
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" width="{}" height="{}" loading="lazy" decoding="async" '
+        'style="background: url({}) center / cover no-repeat; {}" {}>'
+        '</picture>',
+        _srcset(variants['webp']), sizes,
+        derivative_storage.url(fallback), _srcset(variants['jpeg']), sizes, alt,
+        variants.get('width', ''), variants.get('height', ''),
+        placeholder, style, extra,
+    )
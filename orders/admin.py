@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, DraftOrder, DraftOrderItem
 
 class OrderItemInline(admin.TabularInline):
     """Hiển thị các mục con ngay trong trang Hóa đơn."""
@@ -25,4 +25,22 @@ class OrderAdmin(admin.ModelAdmin):
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ('order', 'service_name', 'price', 'duration_days')
     search_fields = ('service_name', 'order__id')
-    autocomplete_fields = ('order', 'service', 'category', 'supplier')
\ No newline at end of file
+    autocomplete_fields = ('order', 'service', 'category', 'supplier')
+
+class DraftOrderItemInline(admin.TabularInline):
+    model = DraftOrderItem
+    extra = 0
+    readonly_fields = ('cart_item', 'service', 'service_name', 'price', 'duration_days')
+    can_delete = False
+
+    def has_add_permission(self, request, obj):
+        return False
+
+@admin.register(DraftOrder)
+class DraftOrderAdmin(admin.ModelAdmin):
+    """Nháp chưa xác nhận: dùng để xem các lượt bỏ dở thanh toán."""
+    list_display = ('id', 'user', 'total_price', 'created_at', 'expires_at')
+    list_filter = ('created_at',)
+    search_fields = ('user__email', 'user__full_name', 'id')
+    readonly_fields = ('user', 'total_price', 'idempotency_key', 'created_at', 'expires_at')
+    inlines = [DraftOrderItemInline]
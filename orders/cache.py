@@ -0,0 +1,28 @@
+"""
+Cache số hóa đơn theo trạng thái (hiển thị trong bộ lọc trang quản lý).
+
+Xóa bởi signal khi Order được tạo/sửa/xóa (orders/signals.py), và gọi trực
+tiếp sau các UPDATE hàng loạt không phát signal (orders/processing.py).
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Order
+
+STATUS_COUNTS_KEY = 'orders:status_counts'
+STATUS_COUNTS_TIMEOUT = 60 * 5
+
+
+def status_counts():
+    """{status: số hóa đơn}, một truy vấn GROUP BY khi cache trống."""
+    counts = cache.get(STATUS_COUNTS_KEY)
+    if counts is None:
+        counts = dict(
+            Order.objects.order_by().values_list('status').annotate(n=Count('id')).values_list('status', 'n')
+        )
+        cache.set(STATUS_COUNTS_KEY, counts, STATUS_COUNTS_TIMEOUT)
+    return counts
+
+
+def invalidate_status_counts():
+    cache.delete(STATUS_COUNTS_KEY)
@@ -0,0 +1,189 @@
+"""
+Luồng thanh toán: tạo Hóa đơn nháp (DraftOrder) từ giỏ hàng, rồi tạo Hóa đơn
+thật từ nháp trong một transaction duy nhất.
+
+Số truy vấn không phụ thuộc số mục trong giỏ: một truy vấn in_bulk cho mọi
+dịch vụ, một INSERT Order, một bulk INSERT OrderItem, một INSERT sự kiện
+outbox và một DELETE giỏ hàng.
+Lỗi ở bất kỳ bước nào thì không có gì được ghi (không còn hóa đơn dở dang).
+
+Mỗi lần checkout ghi log số mục, số truy vấn và thời gian xử lý
+(logger 'orders.checkout').
+"""
+import logging
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from outbox.events import order_payload, publish
+from services.cache import cart_changed
+from services.models import CartItem, Service
+from services.pricing import price_for, price_matrix
+
+from .idempotency import new_key
+from .models import DraftOrder, DraftOrderItem, Order, OrderItem
+
+DEFAULT_DRAFT_ORDER_TTL = 60 * 60
+SESSION_KEY = 'draft_order_id'
+
+logger = logging.getLogger('orders.checkout')
+
+
+class CheckoutError(Exception):
+    """Lỗi nghiệp vụ hiển thị được cho user (dịch vụ không còn, giỏ hàng đã đổi...)."""
+
+
+class CheckoutMetrics:
+    def __init__(self):
+        self.items = 0
+        self.queries = 0
+        self.duration_ms = 0.0
+
+    def __str__(self):
+        return f'items={self.items} queries={self.queries} duration={self.duration_ms:.1f}ms'
+
+
+@contextmanager
+def _measure(metrics):
+    """Đếm số truy vấn và thời gian (không cần DEBUG=True)."""
+    def counter(execute, sql, params, many, context):
+        metrics.queries += 1
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(counter):
+            yield metrics
+    finally:
+        metrics.duration_ms = (time.perf_counter() - started) * 1000
+
+
+# --- HÓA ĐƠN NHÁP ---
+
+def get_draft_ttl():
+    return timedelta(seconds=getattr(settings, 'DRAFT_ORDER_TTL', DEFAULT_DRAFT_ORDER_TTL))
+
+
+def create_draft(user, cart_items):
+    """
+    Tạo DraftOrder từ các CartItem (đã select_related('service')).
+    Giá mỗi dòng theo thời hạn đã chọn, tra trong bảng giá có cache (services/pricing.py).
+    Nháp cũ đang dở của user bị thay thế.
+    """
+    matrix = price_matrix()
+    prices = {}
+    for item in cart_items:
+        prices[item.pk] = price_for(item.service_id, item.duration_days, matrix)
+        if prices[item.pk] is None:
+            raise CheckoutError(f'Dịch vụ "{item.service.name}" cần liên hệ để báo giá, không thể mua trực tuyến.')
+    with transaction.atomic():
+        DraftOrder.objects.filter(user=user).delete()
+        draft = DraftOrder.objects.create(
+            user=user,
+            total_price=sum(prices.values()),
+            idempotency_key=new_key(),
+            expires_at=timezone.now() + get_draft_ttl(),
+        )
+        DraftOrderItem.objects.bulk_create([
+            DraftOrderItem(
+                draft=draft,
+                cart_item=item,
+                service=item.service,
+                service_name=item.service.name,
+                price=prices[item.pk],
+                duration_days=item.duration_days,
+            )
+            for item in cart_items
+        ])
+    return draft
+
+
+def get_draft(request):
+    """Nháp còn hạn của user theo id trong session, hoặc None."""
+    draft_id = request.session.get(SESSION_KEY)
+    if not draft_id:
+        return None
+    return DraftOrder.objects.filter(
+        pk=draft_id, user=request.user, expires_at__gt=timezone.now()
+    ).first()
+
+
+# --- TẠO HÓA ĐƠN ---
+
+def place_order(user, draft):
+    """
+    Tạo Order (status='pending') và các OrderItem từ DraftOrder `draft`,
+    xóa các mục giỏ hàng tương ứng và chính bản nháp. Trả về (order, metrics).
+    """
+    metrics = CheckoutMetrics()
+    with _measure(metrics), transaction.atomic():
+        items = list(draft.items.all())
+        if not items:
+            # Nháp vừa được gửi bởi request khác (các mục đã bị xóa cùng nháp).
+            raise CheckoutError('Hóa đơn nháp đã được gửi hoặc đã hết hạn. Vui lòng tạo lại từ giỏ hàng.')
+        metrics.items = len(items)
+        # Chỉ cần khóa ngoại category/supplier để sao chép vào OrderItem.
+        services = Service.objects.only('pk', 'category_id', 'supplier_id').in_bulk(
+            {item.service_id for item in items if item.service_id}
+        )
+        missing = [item.service_name for item in items if item.service_id not in services]
+        if missing:
+            raise CheckoutError(f'Dịch vụ không còn tồn tại: {", ".join(missing)}.')
+
+        cart_item_ids = {item.cart_item_id for item in items}
+        if None in cart_item_ids:
+            raise CheckoutError('Giỏ hàng đã thay đổi. Vui lòng tạo lại hóa đơn nháp.')
+
+        order = Order.objects.create(
+            user=user,
+            status='pending',
+            total_price=draft.total_price,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                service_id=item.service_id,
+                service_name=item.service_name,
+                category_id=services[item.service_id].category_id,
+                supplier_id=services[item.service_id].supplier_id,
+                price=item.price,
+                duration_days=item.duration_days,
+            )
+            for item in items
+        ])
+        # Email / webhook / báo cáo được worker outbox xử lý sau khi commit.
+        publish('order.placed', order_payload(order, user.email, items=len(items)))
+
+        # Xóa nháp trước giỏ hàng để SET_NULL trên DraftOrderItem.cart_item không phải chạy.
+        # Không còn gì để xóa: request khác đã gửi nháp này trong lúc đó.
+        deleted, _ = DraftOrder.objects.filter(pk=draft.pk).delete()
+        if not deleted:
+            raise CheckoutError('Hóa đơn nháp đã được gửi hoặc đã hết hạn. Vui lòng tạo lại từ giỏ hàng.')
+        deleted, _ = CartItem.objects.filter(user=user, id__in=cart_item_ids).delete()
+        if deleted != len(cart_item_ids):
+            # Giỏ hàng đã đổi (hoặc hóa đơn này vừa được gửi ở tab khác): hủy toàn bộ.
+            raise CheckoutError('Giỏ hàng đã thay đổi. Vui lòng tạo lại hóa đơn nháp.')
+        cart_changed(user.pk)
+
+    logger.info('checkout order=%s user=%s %s', order.pk, user.pk, metrics)
+    return order, metrics
+
+
+# --- DỌN NHÁP HẾT HẠN ---
+
+def purge_expired_drafts(batch_size=1000):
+    """Xóa nháp hết hạn theo từng lô (mỗi lô một transaction ngắn). Trả về số nháp đã xóa."""
+    total = 0
+    now = timezone.now()
+    while True:
+        ids = list(DraftOrder.objects.filter(expires_at__lte=now).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        with transaction.atomic():
+            DraftOrderItem.objects.filter(draft_id__in=ids).delete()
+            DraftOrder.objects.filter(pk__in=ids).delete()
+        total += len(ids)
@@ -0,0 +1,138 @@
+"""
+Xuất Hóa đơn / Mục hóa đơn ra CSV hoặc XLSX, mỗi dòng là một OrderItem kèm
+thông tin Hóa đơn và khách hàng.
+
+Hóa đơn đã lưu trữ (archive/archiving.py) cũng được xuất: history_sources()
+trả về queryset đã lọc trên cả bảng gốc lẫn bảng lưu trữ, các dòng được trộn
+theo ngày tạo hóa đơn.
+
+Dữ liệu đọc bằng values_list(...).iterator(chunk_size) và ghi ra từng dòng,
+nên bộ nhớ không phụ thuộc số hóa đơn:
+- CSV: stream trực tiếp qua StreamingHttpResponse / stdout.
+- XLSX: openpyxl ở chế độ write_only (ghi dần ra file tạm). openpyxl là phụ
+  thuộc tùy chọn; không cài thì chỉ xuất được CSV.
+"""
+import csv
+import heapq
+import tempfile
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - tùy môi trường
+    openpyxl = None
+
+from django.utils import timezone
+
+from archive.history import order_sources
+
+DEFAULT_CHUNK_SIZE = 2000
+FORMATS = ('csv', 'xlsx')
+
+COLUMNS = [
+    ('order__id', 'Mã hóa đơn'),
+    ('order__created_at', 'Ngày tạo'),
+    ('order__status', 'Trạng thái'),
+    ('order__user__email', 'Email khách hàng'),
+    ('order__user__full_name', 'Tên khách hàng'),
+    ('order__user__phone_number', 'SĐT khách hàng'),
+    ('service_name', 'Dịch vụ'),
+    ('category__name', 'Category'),
+    ('supplier__name', 'Nhà cung cấp'),
+    ('price', 'Giá'),
+    ('duration_days', 'Số ngày'),
+    ('order__total_price', 'Tổng hóa đơn'),
+]
+
+
+class ExportUnavailable(Exception):
+    """Định dạng được yêu cầu cần thư viện chưa được cài (openpyxl)."""
+
+
+def xlsx_available():
+    return openpyxl is not None
+
+
+def history_sources(form):
+    """Hóa đơn khớp bộ lọc của `form` (đã is_valid()) trên bảng gốc và bảng lưu trữ."""
+    return [form.filter_queryset(order_model.objects.all()) for order_model, _ in order_sources()]
+
+
+def _source_rows(orders_qs, chunk_size):
+    item_model = orders_qs.model.items.rel.related_model
+    items = (
+        item_model.objects.filter(order__in=orders_qs.order_by().values('pk'))
+        .order_by('order__created_at', 'order_id', 'pk')
+        .values_list(*[field for field, _ in COLUMNS])
+    )
+    return items.iterator(chunk_size=chunk_size)
+
+
+def iter_rows(sources, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Sinh từng dòng (list) cho các mục của các hóa đơn trong `sources` (các
+    queryset Order / ArchivedOrder, xem history_sources()), theo ngày tạo hóa đơn.
+    """
+    fields = [field for field, _ in COLUMNS]
+    created_at_index = fields.index('order__created_at')
+    order_index = fields.index('order__id')
+    rows = heapq.merge(
+        *[_source_rows(orders_qs, chunk_size) for orders_qs in sources],
+        key=lambda row: (row[created_at_index], row[order_index]),
+    )
+    for row in rows:
+        row = list(row)
+        row[created_at_index] = timezone.localtime(row[created_at_index]).replace(tzinfo=None)
+        yield row
+
+
+def header():
+    return [label for _, label in COLUMNS]
+
+
+class _Echo:
+    """File giả: trả lại giá trị được ghi, để csv.writer sinh từng dòng."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(sources, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Sinh từng dòng CSV (chuỗi) — dùng cho StreamingHttpResponse."""
+    writer = csv.writer(_Echo())
+    # BOM để Excel nhận đúng UTF-8 (tiếng Việt)
+    yield '﻿' + writer.writerow(header())
+    for row in iter_rows(sources, chunk_size):
+        yield writer.writerow(row)
+
+
+def write_csv(sources, fh, chunk_size=DEFAULT_CHUNK_SIZE):
+    count = 0
+    writer = csv.writer(fh)
+    writer.writerow(header())
+    for row in iter_rows(sources, chunk_size):
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_xlsx(sources, fh, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Ghi XLSX vào file nhị phân `fh`. Trả về số dòng dữ liệu."""
+    if openpyxl is None:
+        raise ExportUnavailable('Cần cài openpyxl để xuất XLSX (pip install openpyxl).')
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Orders')
+    sheet.append(header())
+    count = 0
+    for row in iter_rows(sources, chunk_size):
+        sheet.append(row)
+        count += 1
+    workbook.save(fh)
+    return count
+
+
+def xlsx_tempfile(sources, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Ghi XLSX ra file tạm (tự xóa khi đóng), trả về file đã tua về đầu."""
+    fh = tempfile.TemporaryFile()
+    write_xlsx(sources, fh, chunk_size)
+    fh.seek(0)
+    return fh
@@ -1,8 +1,16 @@
+from datetime import datetime, timedelta
+
 from django import forms
+from django.utils import timezone
+from django.db.models import Exists, OuterRef
 from .models import Order
 from services.models import Category, Supplier
 from django.utils.translation import gettext_lazy as _
 
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
 class OrderFilterForm(forms.Form):
     """Form lọc đơn hàng cho Admin."""
     
@@ -31,4 +39,43 @@ class OrderFilterForm(forms.Form):
         required=False,
         empty_label=_("Tất cả NCC"),
         widget=forms.Select(attrs={'class': 'form-control'})
-    )
\ No newline at end of file
+    )
+    
+    date_from = forms.DateField(
+        label=_("Từ ngày"),
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    
+    date_to = forms.DateField(
+        label=_("Đến ngày"),
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+
+    def filter_queryset(self, orders_qs):
+        """
+        Áp dụng bộ lọc (form đã is_valid()) lên queryset Order (hoặc ArchivedOrder).
+        Dùng chung cho trang quản lý và chức năng xuất file (orders/export.py).
+        """
+        data = self.cleaned_data
+        # Mục hóa đơn của đúng bảng đang lọc (OrderItem, hoặc ArchivedOrderItem cho bảng lưu trữ)
+        item_model = orders_qs.model.items.rel.related_model
+        # Chỉ lọc status nếu người dùng CHỌN một status (khác rỗng, nghĩa là 'Tất cả')
+        if data.get('status'):
+            orders_qs = orders_qs.filter(status=data['status'])
+        # EXISTS thay cho JOIN + DISTINCT (dùng index (category, order) / (supplier, order))
+        if data.get('category'):
+            orders_qs = orders_qs.filter(
+                Exists(item_model.objects.filter(order=OuterRef('pk'), category=data['category']))
+            )
+        if data.get('supplier'):
+            orders_qs = orders_qs.filter(
+                Exists(item_model.objects.filter(order=OuterRef('pk'), supplier=data['supplier']))
+            )
+        # So sánh trực tiếp trên created_at (không dùng __date) để còn dùng được index
+        if data.get('date_from'):
+            orders_qs = orders_qs.filter(created_at__gte=_start_of_day(data['date_from']))
+        if data.get('date_to'):
+            orders_qs = orders_qs.filter(created_at__lt=_start_of_day(data['date_to'] + timedelta(days=1)))
+        return orders_qs
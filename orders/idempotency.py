@@ -0,0 +1,87 @@
+"""
+Chống gửi trùng (double-click, client gửi lại khi phản hồi chậm) cho các view
+POST tạo Order/UserSubscription.
+
+Form mang một khóa ngẫu nhiên (input ẩn `idempotency_key`). View được bọc bởi
+`@idempotent(scope)` chạy trong một transaction, bắt đầu bằng việc INSERT khóa
+(cột unique). Hai request cùng khóa chạy đồng thời thì request sau phải chờ
+request trước commit rồi gặp IntegrityError, khi đó chỉ phát lại redirect đã
+lưu, không tạo thêm dữ liệu.
+
+Chỉ response chuyển hướng mà view đánh dấu thành công bằng `succeeded(...)`
+được lưu. Mọi response khác (render lại form, redirect báo lỗi sau một lỗi tạm
+thời...) làm transaction bị rollback: khóa chưa được dùng và user có thể gửi lại.
+"""
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.http import HttpResponseBadRequest, HttpResponseRedirect
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+FIELD_NAME = 'idempotency_key'
+REDIRECT_STATUSES = (301, 302, 303)
+
+
+def new_key():
+    return uuid.uuid4().hex
+
+
+def key_for_form(request):
+    """Khóa cho form đang hiển thị: giữ khóa cũ khi render lại form sau POST lỗi."""
+    if request.method == 'POST' and request.POST.get(FIELD_NAME):
+        return request.POST[FIELD_NAME][:64]
+    return new_key()
+
+
+def succeeded(response):
+    """Đánh dấu redirect thành công của view @idempotent: chỉ response này được lưu và phát lại."""
+    response.idempotent_success = True
+    return response
+
+
+def _replay(request, record):
+    if record.user_id != request.user.pk:
+        return HttpResponseBadRequest('Idempotency key không hợp lệ.')
+    messages.info(request, 'Yêu cầu này đã được xử lý trước đó.')
+    response = HttpResponseRedirect(record.response_location)
+    response.status_code = record.response_status
+    return response
+
+
+def idempotent(scope):
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key = request.POST.get(FIELD_NAME, '')[:64] if request.method == 'POST' else ''
+            if not key:
+                # Form cũ (chưa có khóa) hoặc GET: xử lý như bình thường.
+                return view_func(request, *args, **kwargs)
+
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        record = IdempotencyKey.objects.create(key=key, user=request.user, scope=scope)
+                except IntegrityError:
+                    return _replay(request, IdempotencyKey.objects.get(key=key))
+
+                response = view_func(request, *args, **kwargs)
+                if response.status_code in REDIRECT_STATUSES and getattr(response, 'idempotent_success', False):
+                    record.response_status = response.status_code
+                    record.response_location = response['Location']
+                    record.save(update_fields=['response_status', 'response_location'])
+                else:
+                    transaction.set_rollback(True)
+                return response
+        return wrapper
+    return decorator
+
+
+def purge_expired(days=7):
+    """Xóa khóa cũ hơn `days` ngày. Trả về số khóa đã xóa."""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orders.checkout import purge_expired_drafts
+
+
+class Command(BaseCommand):
+    help = 'Xóa các Hóa đơn nháp (DraftOrder) đã hết hạn, theo từng lô.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_drafts(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Đã xóa {deleted} hóa đơn nháp hết hạn.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orders.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Xóa các khóa chống gửi trùng (IdempotencyKey) đã cũ.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Giữ lại khóa trong số ngày này (mặc định 7).')
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Đã xóa {deleted} khóa.'))
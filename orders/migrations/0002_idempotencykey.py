@@ -0,0 +1,32 @@
+# Generated by Django 4.2.25 on 2026-10-18 06:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Khóa')),
+                ('scope', models.CharField(max_length=50, verbose_name='Thao tác')),
+                ('response_status', models.PositiveSmallIntegerField(default=302, verbose_name='Mã phản hồi')),
+                ('response_location', models.CharField(blank=True, max_length=500, verbose_name='Chuyển hướng tới')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Khóa chống gửi trùng',
+                'verbose_name_plural': 'Các khóa chống gửi trùng',
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.25 on 2026-10-18 06:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0017_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0002_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DraftOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_price', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Tổng giá')),
+                ('idempotency_key', models.CharField(max_length=64, verbose_name='Khóa chống gửi trùng')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Hết hạn lúc')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='draft_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Hóa đơn nháp',
+                'verbose_name_plural': 'Các Hóa đơn nháp',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DraftOrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('service_name', models.CharField(max_length=255)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Giá')),
+                ('duration_days', models.PositiveIntegerField(verbose_name='Số ngày')),
+                ('cart_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='services.cartitem')),
+                ('draft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.draftorder')),
+                ('service', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='services.service')),
+            ],
+            options={
+                'verbose_name': 'Mục Hóa đơn nháp',
+                'verbose_name_plural': 'Các Mục Hóa đơn nháp',
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
-from services.models import Service, Supplier, Category
+from services.models import Service, Supplier, Category, CartItem
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 class Order(models.Model):
@@ -24,6 +25,11 @@ class Order(models.Model):
         ordering = ['-created_at']
         verbose_name = _("Hóa đơn")
         verbose_name_plural = _("Các Hóa đơn")
+        # Khóa sắp xếp của phân trang keyset trên trang quản lý (lọc theo trạng thái hoặc không)
+        indexes = [
+            models.Index(fields=['status', '-created_at', '-id'], name='order_status_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='order_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"Hóa đơn #{self.id} - {self.user.email if self.user else 'Khách'}"
@@ -46,6 +52,74 @@ class OrderItem(models.Model):
     class Meta:
         verbose_name = _("Mục Hóa đơn")
         verbose_name_plural = _("Các Mục Hóa đơn")
+        # Phục vụ bộ lọc EXISTS theo category/NCC trên trang quản lý hóa đơn
+        indexes = [
+            models.Index(fields=['category', 'order'], name='orderitem_category_order_idx'),
+            models.Index(fields=['supplier', 'order'], name='orderitem_supplier_order_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.service_name} ({self.duration_days} ngày) - HĐ #{self.order.id}"
\ No newline at end of file
+        return f"{self.service_name} ({self.duration_days} ngày) - HĐ #{self.order.id}"
+
+class DraftOrder(models.Model):
+    """
+    Hóa đơn nháp: ảnh chụp các mục giỏ hàng user đã chọn để thanh toán.
+    Session chỉ giữ id; nháp hết hạn sau `expires_at` và bị dọn bởi
+    `manage.py purge_draft_orders`.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="draft_orders")
+    total_price = models.DecimalField(_("Tổng giá"), max_digits=12, decimal_places=2, default=0)
+    # Khóa chống gửi trùng cho lần xác nhận nháp này (orders/idempotency.py)
+    idempotency_key = models.CharField(_("Khóa chống gửi trùng"), max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(_("Hết hạn lúc"), db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _("Hóa đơn nháp")
+        verbose_name_plural = _("Các Hóa đơn nháp")
+
+    def __str__(self):
+        return f"Nháp #{self.id} - {self.user}"
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+
+class DraftOrderItem(models.Model):
+    draft = models.ForeignKey(DraftOrder, on_delete=models.CASCADE, related_name="items")
+    # Mục giỏ hàng gốc: bị xóa khỏi giỏ thì thành NULL và nháp không xác nhận được nữa.
+    cart_item = models.ForeignKey(CartItem, on_delete=models.SET_NULL, null=True, blank=True)
+    service = models.ForeignKey(Service, on_delete=models.SET_NULL, null=True)
+    service_name = models.CharField(max_length=255)
+    price = models.DecimalField(_("Giá"), max_digits=10, decimal_places=2)
+    duration_days = models.PositiveIntegerField(_("Số ngày"))
+
+    class Meta:
+        verbose_name = _("Mục Hóa đơn nháp")
+        verbose_name_plural = _("Các Mục Hóa đơn nháp")
+
+    def __str__(self):
+        return f"{self.service_name} ({self.duration_days} ngày) - Nháp #{self.draft_id}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Khóa chống gửi trùng cho các form tạo dữ liệu (xem orders/idempotency.py).
+    Mỗi lần hiển thị form sinh một khóa mới; lần POST đầu tiên ghi khóa cùng
+    response (redirect) của nó, các lần gửi lại với cùng khóa chỉ phát lại response.
+    """
+    key = models.CharField(_("Khóa"), max_length=64, unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="idempotency_keys")
+    scope = models.CharField(_("Thao tác"), max_length=50)
+    response_status = models.PositiveSmallIntegerField(_("Mã phản hồi"), default=302)
+    response_location = models.CharField(_("Chuyển hướng tới"), max_length=500, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _("Khóa chống gửi trùng")
+        verbose_name_plural = _("Các khóa chống gửi trùng")
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
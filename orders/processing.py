@@ -0,0 +1,100 @@
+"""
+Xử lý (xác nhận / hủy) Hóa đơn đang chờ, một hoặc nhiều hóa đơn một lần.
+
+Mọi hóa đơn được chọn được xử lý trong một transaction:
+- SELECT ... FOR UPDATE các hóa đơn còn 'pending' (hai staff bấm cùng lúc thì
+  người sau phải chờ và thấy hóa đơn đã được xử lý, không xác nhận hai lần);
+- một bulk_create cho mọi UserSubscription (chưa xác minh, nên không cần logic
+  đặt ngày trong UserSubscription.save());
+- một UPDATE trạng thái cho tất cả hóa đơn;
+- một INSERT các sự kiện outbox 'order.confirmed' / 'order.cancelled' (email,
+  webhook, báo cáo do `manage.py drain_outbox` xử lý ngoài request).
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from outbox.events import order_payload, publish_many
+from services.models import UserSubscription
+
+from .cache import invalidate_status_counts
+from .models import Order, OrderItem
+
+PENDING = 'pending'
+TARGET_STATUSES = ('confirmed', 'cancelled')
+
+
+class StatusChangeResult:
+    def __init__(self, status):
+        self.status = status
+        self.order_ids = []
+        self.skipped = 0
+        self.subscriptions = 0
+        self.duration = 0.0
+
+    @property
+    def processed(self):
+        return len(self.order_ids)
+
+    @property
+    def orders_per_second(self):
+        return self.processed / self.duration if self.duration else float(self.processed)
+
+
+def change_status(order_ids, new_status):
+    """
+    Chuyển các hóa đơn 'pending' trong `order_ids` sang `new_status`.
+    Hóa đơn không còn 'pending' bị bỏ qua (đếm trong `skipped`).
+    """
+    if new_status not in TARGET_STATUSES:
+        raise ValueError(f'Trạng thái không hợp lệ: {new_status!r}')
+    order_ids = set(order_ids)
+    result = StatusChangeResult(new_status)
+    started = time.perf_counter()
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update()
+            .filter(pk__in=order_ids, status=PENDING)
+            .only('pk', 'user_id', 'total_price')
+        )
+        result.order_ids = [order.pk for order in orders]
+        result.skipped = len(order_ids) - len(orders)
+        if not orders:
+            result.duration = time.perf_counter() - started
+            return result
+
+        if new_status == 'confirmed':
+            users = {order.pk: order.user_id for order in orders}
+            items = (
+                OrderItem.objects.filter(order_id__in=result.order_ids, service__isnull=False)
+                .values_list('order_id', 'service_id', 'duration_days')
+            )
+            created = UserSubscription.objects.bulk_create([
+                UserSubscription(
+                    user_id=users[order_id],
+                    service_id=service_id,
+                    purchased_by_id=users[order_id],
+                    duration_days=duration_days,
+                    is_active=True,
+                    is_verified=False,
+                )
+                for order_id, service_id, duration_days in items
+                if users[order_id]
+            ])
+            result.subscriptions = len(created)
+
+        Order.objects.filter(pk__in=result.order_ids).update(status=new_status, updated_at=timezone.now())
+        emails = dict(
+            get_user_model().objects.filter(pk__in={order.user_id for order in orders})
+            .values_list('pk', 'email')
+        )
+        publish_many(
+            (f'order.{new_status}', order_payload(order, emails.get(order.user_id)))
+            for order in orders
+        )
+        # UPDATE hàng loạt không phát signal.
+        transaction.on_commit(invalidate_status_counts)
+    result.duration = time.perf_counter() - started
+    return result
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_status_counts
+from .models import Order
+
+
+# --- XÓA CACHE SỐ HÓA ĐƠN THEO TRẠNG THÁI ---
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def evict_status_counts(sender, instance, **kwargs):
+    invalidate_status_counts()
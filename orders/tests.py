@@ -0,0 +1,121 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from outbox.models import OutboxEvent
+from services.cart import add_items
+from services.models import CartItem, Service
+from users.models import User
+
+from .checkout import CheckoutError, SESSION_KEY, create_draft, place_order
+from .idempotency import FIELD_NAME
+from .models import DraftOrder, IdempotencyKey, Order, OrderItem
+
+
+def make_user(email='buyer@example.com'):
+    return User.objects.create_user(
+        email=email, phone_number=email[:10], password='pw-123456',
+        address='Hà Nội', face_id_image='faces/buyer.jpg',
+    )
+
+
+class CheckoutTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.services = [
+            Service.objects.create(name=f'Dịch vụ {i}', description='', price=Decimal('100.00') * i)
+            for i in (1, 2)
+        ]
+        add_items(self.user.pk, [(service.pk, 30) for service in self.services])
+
+    def cart_items(self):
+        return CartItem.objects.filter(user=self.user).select_related('service').order_by('pk')
+
+
+# --- TẠO HÓA ĐƠN TỪ NHÁP ---
+
+class PlaceOrderTests(CheckoutTestMixin, TestCase):
+    def test_consumes_cart_items_and_draft(self):
+        draft = create_draft(self.user, self.cart_items())
+
+        order, metrics = place_order(self.user, draft)
+
+        self.assertEqual(order.status, 'pending')
+        self.assertEqual(order.total_price, Decimal('300.00'))
+        self.assertEqual(metrics.items, 2)
+        self.assertEqual(
+            sorted(OrderItem.objects.filter(order=order).values_list('service_name', flat=True)),
+            ['Dịch vụ 1', 'Dịch vụ 2'],
+        )
+        self.assertFalse(CartItem.objects.filter(user=self.user).exists())
+        self.assertFalse(DraftOrder.objects.filter(pk=draft.pk).exists())
+        self.assertTrue(OutboxEvent.objects.filter(topic='order.placed', payload__order_id=order.pk).exists())
+
+    def test_changed_cart_rolls_back_everything(self):
+        draft = create_draft(self.user, self.cart_items())
+        # Mục giỏ hàng bị xóa ở tab khác sau khi tạo nháp
+        self.cart_items().first().delete()
+
+        with self.assertRaises(CheckoutError):
+            place_order(self.user, DraftOrder.objects.get(pk=draft.pk))
+
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        self.assertFalse(OutboxEvent.objects.filter(topic='order.placed').exists())
+        self.assertEqual(CartItem.objects.filter(user=self.user).count(), 1)
+
+    def test_cart_consumed_by_another_order_is_rejected(self):
+        draft = create_draft(self.user, self.cart_items())
+        stale = DraftOrder.objects.get(pk=draft.pk)
+        place_order(self.user, draft)
+
+        with self.assertRaises(CheckoutError):
+            place_order(self.user, stale)
+
+        self.assertEqual(Order.objects.count(), 1)
+
+
+# --- CHỐNG GỬI TRÙNG ---
+
+class ConfirmOrderIdempotencyTests(CheckoutTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.client.post(reverse('orders:create_draft_order'), {
+            'cart_item_ids': [item.pk for item in self.cart_items()],
+        })
+        self.draft = DraftOrder.objects.get(user=self.user)
+        self.assertEqual(self.client.session[SESSION_KEY], self.draft.pk)
+
+    def confirm(self, key):
+        return self.client.post(reverse('orders:confirm_order'), {FIELD_NAME: key})
+
+    def test_resubmission_replays_first_response(self):
+        first = self.confirm(self.draft.idempotency_key)
+        second = self.confirm(self.draft.idempotency_key)
+
+        self.assertRedirects(first, reverse('orders:order_success'), fetch_redirect_response=False)
+        self.assertEqual(second.status_code, first.status_code)
+        self.assertEqual(second['Location'], first['Location'])
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().scope, 'confirm_order')
+
+    def test_failed_attempt_does_not_use_up_key(self):
+        CartItem.objects.filter(user=self.user).delete()
+
+        response = self.confirm(self.draft.idempotency_key)
+
+        self.assertRedirects(response, reverse('orders:view_draft_order'), fetch_redirect_response=False)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_key_of_another_user_is_rejected(self):
+        self.confirm(self.draft.idempotency_key)
+        self.client.force_login(make_user('other@example.com'))
+
+        response = self.confirm(self.draft.idempotency_key)
+
+        self.assertEqual(response.status_code, 400)
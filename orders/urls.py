@@ -13,5 +13,7 @@ urlpatterns = [
     # Trang Quản lý của Admin
     path('management/', views.order_management_list, name='order_management_list'),
     path('management/update/<int:order_id>/', views.update_order_status, name='update_order_status'),
+    path('management/bulk-update/', views.bulk_update_order_status, name='bulk_update_order_status'),
+    path('management/export/', views.export_orders, name='export_orders'),
     
 ]
\ No newline at end of file
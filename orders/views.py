@@ -1,8 +1,13 @@
+import logging
+
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import FileResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
 from datetime import timedelta
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal # <-- THÊM IMPORT NÀY
@@ -10,10 +15,20 @@ from decimal import Decimal # <-- THÊM IMPORT NÀY
 # Imports từ các app khác
 from users.decorators import profile_complete_required
 from services.models import CartItem, Service, Category, Supplier, UserSubscription 
+from services.pagination import keyset_paginate, InvalidCursor
 
 # Imports từ app 'orders'
 from .models import Order, OrderItem
 from .forms import OrderFilterForm
+from .checkout import (
+    create_draft, get_draft, place_order, CheckoutError, SESSION_KEY as DRAFT_SESSION_KEY,
+)
+from .idempotency import idempotent, succeeded
+from .processing import change_status, TARGET_STATUSES
+from .cache import status_counts
+from . import export
+
+logger = logging.getLogger(__name__)
 
 # --- 1. LUỒNG CỦA USER ---
 
@@ -21,7 +36,7 @@ from .forms import OrderFilterForm
 @profile_complete_required 
 def create_draft_order(request):
     """
-    Bước 1: Lấy các mục từ giỏ hàng, tạo "Hóa đơn nháp" (lưu trong session)
+    Bước 1: Lấy các mục từ giỏ hàng, tạo "Hóa đơn nháp" (DraftOrder)
     và chuyển đến trang xác nhận.
     """
     if request.method != 'POST':
@@ -39,26 +54,14 @@ def create_draft_order(request):
         messages.error(request, "Không tìm thấy mục nào trong giỏ hàng. Vui lòng thử lại.")
         return redirect('services:view_cart')
 
-    draft_items = []
-    total_price = 0
-    for item in cart_items:
-        if item.service.is_price_on_contact or item.service.price is None:
-            messages.error(request, f'Dịch vụ "{item.service.name}" cần liên hệ để báo giá, không thể mua trực tuyến.')
-            return redirect('services:view_cart')
-            
-        draft_items.append({
-            'cart_item_id': item.id,
-            'service_id': item.service.id,
-            'service_name': item.service.name,
-            'duration_days': item.duration_days,
-            'price': str(item.service.price), # <-- UPDATE: Dùng str() thay vì float()
-        })
-        total_price += item.service.price
-
-    request.session['draft_order'] = {
-        'items': draft_items,
-        'total_price': str(total_price) # <-- UPDATE: Dùng str() thay vì float()
-    }
+    # Nháp lưu trong DB (orders.DraftOrder); session chỉ giữ id.
+    # Giá theo thời hạn lấy từ bảng giá; dịch vụ "Liên hệ" bị từ chối (CheckoutError).
+    try:
+        draft = create_draft(request.user, cart_items)
+    except CheckoutError as e:
+        messages.error(request, str(e))
+        return redirect('services:view_cart')
+    request.session[DRAFT_SESSION_KEY] = draft.pk
 
     return redirect('orders:view_draft_order')
 
@@ -68,21 +71,23 @@ def view_draft_order(request):
     """
     Bước 2: Hiển thị trang "Hóa đơn nháp" (Trang xác nhận).
     """
-    draft_order = request.session.get('draft_order')
+    draft = get_draft(request)
     
-    if not draft_order:
-        messages.warning(request, "Không có hóa đơn nháp. Vui lòng chọn dịch vụ từ giỏ hàng.")
+    if not draft:
+        messages.warning(request, "Không có hóa đơn nháp (hoặc nháp đã hết hạn). Vui lòng chọn dịch vụ từ giỏ hàng.")
         return redirect('services:view_cart')
         
     context = {
-        'draft_items': draft_order['items'],
-        'total_price': draft_order['total_price'] # Truyền 'str' vào template vẫn an toàn
+        'draft_items': draft.items.all(),
+        'total_price': draft.total_price,
+        'idempotency_key': draft.idempotency_key,
     }
     return render(request, 'orders/draft_order.html', context)
 
 
 @login_required
 @profile_complete_required # <-- UPDATE: Bật lại decorator này
+@idempotent('confirm_order')
 def confirm_order(request):
     """
     Bước 3: Xác nhận Hóa đơn nháp, tạo Hóa đơn thật (status='pending')
@@ -91,50 +96,26 @@ def confirm_order(request):
     if request.method != 'POST':
         return redirect('orders:view_draft_order')
         
-    draft_order = request.session.get('draft_order')
-    if not draft_order:
+    draft = get_draft(request)
+    if not draft:
+        messages.warning(request, "Hóa đơn nháp đã hết hạn. Vui lòng tạo lại từ giỏ hàng.")
         return redirect('services:view_cart')
 
     try:
-        new_order = Order.objects.create(
-            user=request.user,
-            status='pending', 
-            total_price=Decimal(draft_order['total_price']) # <-- UPDATE: Dùng Decimal()
-        )
-        
-        cart_item_ids_to_delete = []
-
-        for item_data in draft_order['items']:
-            service = Service.objects.get(id=item_data['service_id'])
-            OrderItem.objects.create(
-                order=new_order,
-                service=service,
-                service_name=item_data['service_name'],
-                category=service.category, 
-                supplier=service.supplier, 
-                price=Decimal(item_data['price']), # <-- UPDATE: Dùng Decimal()
-                duration_days=item_data['duration_days']
-            )
-            cart_item_ids_to_delete.append(item_data['cart_item_id'])
-        
-        CartItem.objects.filter(user=request.user, id__in=cart_item_ids_to_delete).delete()
-        del request.session['draft_order']
-        
-        messages.success(request, f"Đã gửi Hóa đơn #{new_order.id}. Vui lòng chờ Admin xác nhận.")
-        return redirect('orders:order_success')
-
+        new_order, _ = place_order(request.user, draft)
+    except CheckoutError as e:
+        messages.error(request, str(e))
+        return redirect('orders:view_draft_order')
     except Exception as e:
-        # Giữ lại bản ghi lỗi (debug)
-        print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
-        print("!!!!!!!!!!! LỖI KHI TẠO HÓA ĐƠN !!!!!!!!!!!")
-        print(f"User: {request.user.email}")
-        print(f"Lỗi: {e}")
-        print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
-        
+        logger.exception('Lỗi khi tạo hóa đơn cho user %s', request.user.pk)
         messages.error(request, f"Đã xảy ra lỗi khi tạo hóa đơn: {e}")
         return redirect('orders:view_draft_order')
-    
-    
+
+    request.session.pop(DRAFT_SESSION_KEY, None)
+    messages.success(request, f"Đã gửi Hóa đơn #{new_order.id}. Vui lòng chờ Admin xác nhận.")
+    return succeeded(redirect('orders:order_success'))
+
+
 @login_required
 def order_success(request):
     """
@@ -142,36 +123,29 @@ def order_success(request):
     """
     return render(request, 'orders/order_success.html')
 
+ORDER_MANAGEMENT_PAGE_SIZE = 50
+
+
 @staff_member_required
 def order_management_list(request):
     """
     Trang cho Admin/Staff xem và lọc tất cả Hóa đơn.
     MẶC ĐỊNH LỌC CÁC ĐƠN "CHỜ XÁC NHẬN".
+    Phân trang keyset theo (created_at, id) với con trỏ `?cursor=`.
     """
     
     # Bắt đầu với queryset cơ bản
-    orders_qs = Order.objects.all().select_related('user').prefetch_related('items', 'items__service')
+    orders_qs = Order.objects.all().select_related('user').prefetch_related('items')
     
     # Khởi tạo form với dữ liệu GET (nếu có)
     form = OrderFilterForm(request.GET)
+    params = request.GET.copy()
+    params.pop('cursor', None)
     
     # Kiểm tra xem có dữ liệu filter được gửi lên không
-    if request.GET:
+    if params:
         if form.is_valid():
-            status_filter = form.cleaned_data.get('status')
-            category_filter = form.cleaned_data.get('category')
-            supplier_filter = form.cleaned_data.get('supplier')
-
-            # Chỉ lọc status nếu người dùng CHỌN một status
-            # (khác rỗng, nghĩa là 'Tất cả')
-            if status_filter:
-                orders_qs = orders_qs.filter(status=status_filter)
-            
-            if category_filter:
-                orders_qs = orders_qs.filter(items__category=category_filter).distinct()
-            
-            if supplier_filter:
-                orders_qs = orders_qs.filter(items__supplier=supplier_filter).distinct()
+            orders_qs = form.filter_queryset(orders_qs)
     
     else:
         # --- ĐÂY LÀ LOGIC CHÍNH ---
@@ -180,10 +154,36 @@ def order_management_list(request):
         orders_qs = orders_qs.filter(status='pending')
         # Và khởi tạo form để hiển thị 'pending' trong dropdown
         form = OrderFilterForm(initial={'status': 'pending'})
+        params['status'] = 'pending'
+
+    # Số hóa đơn theo trạng thái (có cache) hiển thị trong dropdown
+    counts = status_counts()
+    form.fields['status'].choices = [
+        (value, f'{label} ({counts.get(value, 0) if value else sum(counts.values())})')
+        for value, label in form.fields['status'].choices
+    ]
+
+    try:
+        page = keyset_paginate(
+            orders_qs,
+            cursor=request.GET.get('cursor'),
+            per_page=ORDER_MANAGEMENT_PAGE_SIZE,
+            keys=('created_at', 'id'),
+        )
+    except InvalidCursor:
+        return redirect(f"{request.path}?{params.urlencode()}")
+
+    next_page_url = None
+    if page.next_cursor:
+        params['cursor'] = page.next_cursor
+        next_page_url = f"{request.path}?{params.urlencode()}"
+        del params['cursor']
 
     context = {
-        'orders': orders_qs,
-        'filter_form': form
+        'orders': page.items,
+        'filter_form': form,
+        'next_page_url': next_page_url,
+        'first_page_url': f"{request.path}?{params.urlencode()}" if request.GET.get('cursor') else None,
     }
     return render(request, 'orders/order_management.html', context)
 
@@ -191,8 +191,7 @@ def order_management_list(request):
 @staff_member_required
 def update_order_status(request, order_id):
     """
-    Xử lý khi Admin bấm "Xác nhận" hoặc "Hủy đơn".
-    (Hàm này giữ nguyên như file bạn đã cung cấp)
+    Xử lý khi Admin bấm "Xác nhận" hoặc "Hủy đơn" trên một hóa đơn.
     """
     if request.method != 'POST':
         return redirect('orders:order_management_list')
@@ -200,32 +199,85 @@ def update_order_status(request, order_id):
     order = get_object_or_404(Order, id=order_id)
     new_status = request.POST.get('status')
 
-    if new_status == 'confirmed' and order.status == 'pending':
-        order.status = 'confirmed'
-        order.updated_at = timezone.now()
-        order.save()
-        
-        items_created_count = 0
-        for item in order.items.all():
-            UserSubscription.objects.create(
-                user=order.user, 
-                service=item.service,
-                purchased_by=order.user,
-                duration_days=item.duration_days, 
-                is_active=True,
-                is_verified=False 
-            )
-            items_created_count += 1
-
-        messages.success(request, f"Đã xác nhận Hóa đơn #{order.id}. Đã tạo {items_created_count} dịch vụ và chuyển sang trang 'Quản lý Kích hoạt'.")
-        
-    elif new_status == 'cancelled' and order.status == 'pending':
-        order.status = 'cancelled'
-        order.updated_at = timezone.now()
-        order.save()
-        messages.warning(request, f"Đã hủy Hóa đơn #{order.id}.")
-        
-    else:
+    if new_status not in TARGET_STATUSES:
+        messages.error(request, "Thao tác không hợp lệ.")
+        return redirect('orders:order_management_list')
+
+    result = change_status([order.id], new_status)
+    if not result.processed:
         messages.error(request, "Thao tác không hợp lệ.")
+    elif new_status == 'confirmed':
+        messages.success(request, f"Đã xác nhận Hóa đơn #{order.id}. Đã tạo {result.subscriptions} dịch vụ và chuyển sang trang 'Quản lý Kích hoạt'.")
+    else:
+        messages.warning(request, f"Đã hủy Hóa đơn #{order.id}.")
+
+    return redirect('orders:order_management_list')
+
+
+def _back_to_list(request):
+    """Quay lại danh sách hóa đơn, giữ nguyên bộ lọc đang dùng (tham số `next`)."""
+    next_url = request.POST.get('next', '')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('orders:order_management_list')
+
+
+@staff_member_required
+def bulk_update_order_status(request):
+    """
+    Xác nhận / Hủy nhiều hóa đơn đã chọn trong một transaction (orders/processing.py).
+    """
+    if request.method != 'POST':
+        return redirect('orders:order_management_list')
+
+    new_status = request.POST.get('status')
+    order_ids = [int(pk) for pk in request.POST.getlist('order_ids') if pk.isdigit()]
+    if new_status not in TARGET_STATUSES or not order_ids:
+        messages.error(request, "Vui lòng chọn ít nhất một hóa đơn và một thao tác hợp lệ.")
+        return _back_to_list(request)
+
+    result = change_status(order_ids, new_status)
+    action = "xác nhận" if new_status == 'confirmed' else "hủy"
+    summary = (
+        f"Đã {action} {result.processed} hóa đơn"
+        + (f", tạo {result.subscriptions} dịch vụ" if new_status == 'confirmed' else "")
+        + f" trong {result.duration * 1000:.0f} ms (~{result.orders_per_second:.0f} hóa đơn/giây)."
+    )
+    if result.skipped:
+        summary += f" Bỏ qua {result.skipped} hóa đơn đã được xử lý trước đó."
+    (messages.success if result.processed else messages.warning)(request, summary)
+    return _back_to_list(request)
+
+
+@staff_member_required
+def export_orders(request):
+    """
+    Xuất toàn bộ hóa đơn (mỗi dòng một mục) theo bộ lọc của trang quản lý,
+    `?format=csv` (mặc định) hoặc `?format=xlsx`. Không phân trang.
+    """
+    params = request.GET.copy()
+    fmt = params.pop('format', ['csv'])[-1]
+    params.pop('cursor', None)
+    form = OrderFilterForm(params)
+    if fmt not in export.FORMATS or not form.is_valid():
+        messages.error(request, "Bộ lọc hoặc định dạng xuất không hợp lệ.")
+        return redirect('orders:order_management_list')
+
+    # Gồm cả hóa đơn đã lưu trữ (archive/archiving.py)
+    sources = export.history_sources(form)
+    filename = f"orders-{timezone.localdate():%Y%m%d}.{fmt}"
+
+    if fmt == 'xlsx':
+        if not export.xlsx_available():
+            messages.error(request, "Máy chủ chưa cài openpyxl, vui lòng xuất CSV.")
+            return redirect(f"{reverse('orders:order_management_list')}?{params.urlencode()}")
+        return FileResponse(
+            export.xlsx_tempfile(sources),
+            as_attachment=True,
+            filename=filename,
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
 
-    return redirect('orders:order_management_list')
\ No newline at end of file
+    response = StreamingHttpResponse(export.stream_csv(sources), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,14 @@
+from django.contrib import admin
+from .models import OutboxEvent
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'topic', 'status', 'attempts', 'created_at', 'processed_at')
+    list_filter = ('status', 'topic')
+    readonly_fields = ('created_at', 'processed_at', 'completed_handlers', 'last_error')
+    actions = ['retry_events']
+
+    @admin.action(description='Thử lại các sự kiện đã chọn')
+    def retry_events(self, request, queryset):
+        updated = queryset.exclude(status='done').update(status='pending', attempts=0)
+        self.message_user(request, f'Đã đưa {updated} sự kiện vào hàng đợi lại.')
@@ -0,0 +1,46 @@
+"""
+Ghi sự kiện vào outbox. Gọi bên trong transaction đang thay đổi dữ liệu: sự kiện
+và thay đổi cùng được commit hoặc cùng bị hủy, nên không mất và không "ảo".
+
+Payload tự chứa đủ thông tin cho handler (email, tổng tiền...) để worker không
+phải đọc lại dữ liệu có thể đã đổi.
+"""
+from .models import OutboxEvent
+
+
+def publish(topic, payload):
+    return OutboxEvent.objects.create(topic=topic, payload=payload)
+
+
+def publish_many(events):
+    """`events`: các cặp (topic, payload). Một câu INSERT cho cả lô."""
+    return OutboxEvent.objects.bulk_create([
+        OutboxEvent(topic=topic, payload=payload) for topic, payload in events
+    ])
+
+
+def order_payload(order, email, **extra):
+    payload = {
+        'order_id': order.pk,
+        'user_id': order.user_id,
+        'email': email or '',
+        'total_price': order.total_price,
+    }
+    payload.update(extra)
+    return payload
+
+
+def subscription_payload(subscription, **extra):
+    payload = {
+        'subscription_id': subscription.pk,
+        'user_id': subscription.user_id,
+        'purchased_by_id': subscription.purchased_by_id,
+        'email': subscription.user.email or '',
+        'service_id': subscription.service_id,
+        'service_name': subscription.service.name,
+        'duration_days': subscription.duration_days,
+        'start_date': subscription.start_date,
+        'expiration_date': subscription.expiration_date,
+    }
+    payload.update(extra)
+    return payload
@@ -0,0 +1,99 @@
+"""
+Các handler xử lý sự kiện outbox.
+
+Mỗi handler đăng ký bằng `@handler(name, topics)` (topics='*' nghĩa là mọi
+sự kiện). Handler có thể chạy lại khi worker lỗi giữa chừng, nên phải chịu
+được việc nhận trùng; handler chỉ ghi DB thì chạy đúng một lần vì việc ghi
+và việc đánh dấu "đã xong" nằm trong cùng transaction (xem outbox/worker.py).
+
+Các app khác đăng ký handler riêng trong AppConfig.ready() (ví dụ reports).
+"""
+import hashlib
+import hmac
+import json
+import logging
+import urllib.request
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger('outbox')
+
+_HANDLERS = []
+
+
+def handler(name, topics='*'):
+    def register(func):
+        _HANDLERS.append((name, topics if topics == '*' else frozenset(topics), func))
+        return func
+    return register
+
+
+def handlers_for(topic):
+    return [(name, func) for name, topics, func in _HANDLERS if topics == '*' or topic in topics]
+
+
+# --- EMAIL ---
+
+EMAILS = {
+    'order.placed': (
+        'Đã nhận Hóa đơn #{order_id}',
+        'Chúng tôi đã nhận Hóa đơn #{order_id} (tổng {total_price} VND) và sẽ xác nhận sớm.',
+    ),
+    'order.confirmed': (
+        'Hóa đơn #{order_id} đã được xác nhận',
+        'Hóa đơn #{order_id} đã được xác nhận. Dịch vụ sẽ được kích hoạt sau khi admin xác minh.',
+    ),
+    'order.cancelled': (
+        'Hóa đơn #{order_id} đã bị hủy',
+        'Hóa đơn #{order_id} đã bị hủy. Vui lòng liên hệ chúng tôi nếu cần hỗ trợ.',
+    ),
+    'subscription.verified': (
+        'Dịch vụ "{service_name}" đã được kích hoạt',
+        'Dịch vụ "{service_name}" ({duration_days} ngày) đã được kích hoạt, hết hạn vào {expiration_date}.',
+    ),
+    'subscription.expired': (
+        'Dịch vụ "{service_name}" đã hết hạn',
+        'Dịch vụ "{service_name}" đã hết hạn vào {expiration_date}. Vui lòng gia hạn để tiếp tục sử dụng.',
+    ),
+}
+
+
+@handler('email', topics=EMAILS)
+def send_notification_email(event):
+    email = event.payload.get('email')
+    if not email:
+        return
+    subject, body = EMAILS[event.topic]
+    send_mail(subject.format(**event.payload), body.format(**event.payload), None, [email])
+
+
+# --- WEBHOOK ---
+
+@handler('webhook')
+def post_webhook(event):
+    """
+    POST sự kiện dạng JSON tới OUTBOX_WEBHOOK_URL (ký HMAC-SHA256 nếu có
+    OUTBOX_WEBHOOK_SECRET). Chưa cấu hình URL thì chỉ ghi log 'outbox.webhook'.
+    """
+    body = json.dumps({
+        'id': event.pk,
+        'topic': event.topic,
+        'created_at': event.created_at,
+        'payload': event.payload,
+    }, cls=DjangoJSONEncoder).encode()
+
+    url = getattr(settings, 'OUTBOX_WEBHOOK_URL', None)
+    if not url:
+        logging.getLogger('outbox.webhook').info('%s', body.decode())
+        return
+
+    headers = {'Content-Type': 'application/json', 'X-Outbox-Event': str(event.pk)}
+    secret = getattr(settings, 'OUTBOX_WEBHOOK_SECRET', '')
+    if secret:
+        headers['X-Outbox-Signature'] = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    request = urllib.request.Request(url, data=body, headers=headers, method='POST')
+    # Mã lỗi HTTP (>= 400) ném HTTPError -> sự kiện được thử lại sau
+    with urllib.request.urlopen(request, timeout=10):
+        pass
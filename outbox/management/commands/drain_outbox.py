@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from outbox.worker import drain, purge_done
+
+
+class Command(BaseCommand):
+    help = 'Chuyển các sự kiện trong outbox (hóa đơn, dịch vụ) cho handler: email, webhook, tổng hợp báo cáo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, help='Mặc định OUTBOX_MAX_ATTEMPTS.')
+        parser.add_argument('--watch', type=float, metavar='SECONDS',
+                            help='Chạy liên tục, kiểm tra hàng đợi sau mỗi SECONDS giây.')
+        parser.add_argument('--purge-days', type=int,
+                            help='Xóa các sự kiện đã xử lý xong quá số ngày này.')
+
+    def handle(self, *args, **options):
+        if options['purge_days'] is not None:
+            deleted = purge_done(options['purge_days'])
+            self.stdout.write(f'Đã xóa {deleted} sự kiện cũ.')
+        while True:
+            result = drain(options['batch_size'], options['max_attempts'])
+            if result.total:
+                self.stdout.write(f'Outbox: {result}')
+            if not options['watch']:
+                return
+            time.sleep(options['watch'])
@@ -0,0 +1,43 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxEvent(models.Model):
+    """
+    Sự kiện nghiệp vụ (hóa đơn / dịch vụ đổi trạng thái) được ghi CÙNG transaction
+    với thay đổi dữ liệu (xem outbox/events.py), rồi được `manage.py drain_outbox`
+    chuyển cho các handler (email, webhook, tổng hợp báo cáo).
+    """
+    STATUS_CHOICES = (
+        ('pending', _('Pending')),
+        ('done', _('Done')),
+        ('failed', _('Failed')),
+    )
+
+    topic = models.CharField(_('Topic'), max_length=100)
+    payload = models.JSONField(_('Payload'), default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(_('Status'), max_length=10, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(_('Created At'), default=timezone.now)
+    # Thời điểm sớm nhất được xử lý (lùi lại khi đang được worker giữ hoặc khi thử lại)
+    available_at = models.DateTimeField(_('Available At'), default=timezone.now)
+    attempts = models.PositiveIntegerField(_('Attempts'), default=0)
+    # Tên các handler đã chạy xong, để lần thử lại không gửi trùng
+    completed_handlers = models.JSONField(_('Completed Handlers'), default=list, blank=True)
+    processed_at = models.DateTimeField(_('Processed At'), null=True, blank=True)
+    last_error = models.TextField(_('Last Error'), blank=True)
+
+    class Meta:
+        verbose_name = _('Outbox Event')
+        verbose_name_plural = _('Outbox Events')
+        indexes = [
+            # Chỉ index các sự kiện còn chờ: worker chỉ quét phần này
+            models.Index(
+                fields=['available_at', 'id'], name='outbox_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f'#{self.pk} {self.topic} ({self.status})'
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .events import publish
+from .models import OutboxEvent
+from .worker import LEASE, claim, drain
+
+
+def make_events(count, topic='test.event'):
+    return [publish(topic, {'n': i}) for i in range(count)]
+
+
+def pks(events):
+    return [event.pk for event in events]
+
+
+# --- GIỮ SỰ KIỆN (LEASE) ---
+
+class ClaimTests(TestCase):
+    def test_claims_oldest_due_events_once(self):
+        events = make_events(3)
+
+        first = claim(2)
+        second = claim(2)
+
+        self.assertEqual(pks(first), pks(events[:2]))
+        self.assertEqual(pks(second), pks(events[2:]))
+        self.assertEqual(claim(2), [])
+
+    def test_claim_pushes_available_at_by_lease(self):
+        make_events(1)
+        before = timezone.now()
+
+        event, = claim(10)
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'pending')
+        self.assertGreaterEqual(event.available_at, before + LEASE)
+
+    def test_expired_lease_is_claimed_again(self):
+        event, = make_events(1)
+        claim(10)
+        # Worker chết giữa chừng: hết LEASE thì sự kiện quay lại hàng đợi
+        OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(pks(claim(10)), [event.pk])
+
+    def test_future_and_processed_events_are_not_claimed(self):
+        later, done = make_events(2)
+        OutboxEvent.objects.filter(pk=later.pk).update(available_at=timezone.now() + timedelta(hours=1))
+        OutboxEvent.objects.filter(pk=done.pk).update(status='done')
+
+        self.assertEqual(claim(10), [])
+
+
+# --- XỬ LÝ VÀ THỬ LẠI ---
+
+class DrainTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.failures = 0
+
+        def ok(event):
+            self.calls.append(('ok', event.pk))
+
+        def flaky(event):
+            self.calls.append(('flaky', event.pk))
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError('tạm thời')
+
+        patcher = mock.patch('outbox.worker.handlers_for', return_value=[('ok', ok), ('flaky', flaky)])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_marks_events_done(self):
+        events = make_events(3)
+
+        result = drain(batch_size=2)
+
+        self.assertEqual((result.done, result.retried, result.failed), (3, 0, 0))
+        self.assertEqual(set(OutboxEvent.objects.values_list('status', flat=True)), {'done'})
+        self.assertEqual(len(self.calls), 2 * len(events))
+
+    def test_retry_skips_completed_handlers(self):
+        event, = make_events(1)
+        self.failures = 1
+
+        with self.assertLogs('outbox', 'ERROR'):
+            result = drain()
+
+        self.assertEqual((result.done, result.retried), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts, event.completed_handlers), ('pending', 1, ['ok']))
+        self.assertGreater(event.available_at, timezone.now())
+
+        OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+        drain()
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'done')
+        self.assertEqual(self.calls, [('ok', event.pk), ('flaky', event.pk), ('flaky', event.pk)])
+
+    def test_gives_up_after_max_attempts(self):
+        event, = make_events(1)
+        self.failures = 1
+
+        with self.assertLogs('outbox', 'ERROR'):
+            result = drain(max_attempts=1)
+
+        self.assertEqual(result.failed, 1)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('failed', 1))
+        self.assertIn('RuntimeError', event.last_error)
@@ -0,0 +1,144 @@
+"""
+Worker chuyển sự kiện outbox cho các handler (chạy bằng `manage.py drain_outbox`).
+
+- Lấy từng lô sự kiện 'pending' đã đến hạn và "giữ" chúng bằng cách lùi
+  available_at thêm LEASE trong MỘT câu UPDATE ... WHERE id IN (SELECT ...
+  LIMIT n) AND <vẫn còn đến hạn> RETURNING id: worker chỉ xử lý đúng các dòng
+  chính câu lệnh của nó đã đổi, nên nhiều worker chạy song song (kể cả trên
+  SQLite, không có SKIP LOCKED) không xử lý trùng; worker chết giữa chừng thì
+  hết LEASE sự kiện tự quay lại hàng đợi.
+- Mỗi handler chạy trong transaction riêng cùng với việc ghi tên nó vào
+  completed_handlers; lần thử lại chỉ chạy các handler chưa xong.
+- Lỗi: tăng attempts, thử lại sau 2^attempts phút; quá max_attempts thì 'failed'.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .handlers import handlers_for
+from .models import OutboxEvent
+
+LEASE = timedelta(minutes=5)
+DEFAULT_MAX_ATTEMPTS = 8
+
+logger = logging.getLogger('outbox')
+
+
+class DrainResult:
+    def __init__(self):
+        self.done = 0
+        self.retried = 0
+        self.failed = 0
+        self.duration = 0.0
+
+    @property
+    def total(self):
+        return self.done + self.retried + self.failed
+
+    def __str__(self):
+        return f'done={self.done} retried={self.retried} failed={self.failed} duration={self.duration:.2f}s'
+
+
+def get_max_attempts():
+    return getattr(settings, 'OUTBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+
+
+def claim(batch_size):
+    now = timezone.now()
+    lease_until = now + LEASE
+    due = OutboxEvent.objects.filter(status='pending', available_at__lte=now)
+    with transaction.atomic():
+        candidates = due.order_by('available_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        candidates = candidates[:batch_size]
+        if connection.features.can_return_columns_from_insert:
+            pks = _lease(candidates, now, lease_until)
+        else:
+            # Không có RETURNING: UPDATE có điều kiện, rồi đọc lại các dòng mang đúng mốc lease của lần gọi này.
+            pks = list(candidates.values_list('pk', flat=True))
+            due.filter(pk__in=pks).update(available_at=lease_until)
+            pks = list(OutboxEvent.objects.filter(pk__in=pks, available_at=lease_until).values_list('pk', flat=True))
+        if not pks:
+            return []
+        return list(OutboxEvent.objects.filter(pk__in=pks).order_by('id'))
+
+
+def _lease(candidates, now, lease_until):
+    """
+    UPDATE ... SET available_at = lease_until WHERE id IN (<candidates>) AND
+    status = 'pending' AND available_at <= now RETURNING id. Lấy khóa ghi ngay
+    từ đầu (SQLite không phải nâng khóa đọc lên ghi giữa chừng).
+    """
+    meta = OutboxEvent._meta
+    qn = connection.ops.quote_name
+    column = lambda name: qn(meta.get_field(name).column)  # noqa: E731
+    sub_sql, sub_params = candidates.values('pk').query.sql_with_params()
+    sql = (
+        f"UPDATE {qn(meta.db_table)} SET {column('available_at')} = %s "
+        f"WHERE {column('id')} IN ({sub_sql}) "
+        f"AND {column('status')} = %s AND {column('available_at')} <= %s "
+        f"RETURNING {column('id')}"
+    )
+    adapt = connection.ops.adapt_datetimefield_value
+    params = [adapt(lease_until), *sub_params, 'pending', adapt(now)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def dispatch(event):
+    for name, func in handlers_for(event.topic):
+        if name in event.completed_handlers:
+            continue
+        with transaction.atomic():
+            func(event)
+            OutboxEvent.objects.filter(pk=event.pk).update(
+                completed_handlers=event.completed_handlers + [name]
+            )
+        event.completed_handlers.append(name)
+
+
+def process(event, max_attempts, result):
+    try:
+        dispatch(event)
+    except Exception as exc:
+        logger.exception('Lỗi khi xử lý sự kiện outbox #%s (%s)', event.pk, event.topic)
+        attempts = event.attempts + 1
+        update = {'attempts': attempts, 'last_error': f'{type(exc).__name__}: {exc}'}
+        if attempts >= max_attempts:
+            update['status'] = 'failed'
+            result.failed += 1
+        else:
+            update['available_at'] = timezone.now() + timedelta(minutes=2 ** attempts)
+            result.retried += 1
+        OutboxEvent.objects.filter(pk=event.pk).update(**update)
+    else:
+        OutboxEvent.objects.filter(pk=event.pk).update(status='done', processed_at=timezone.now(), last_error='')
+        result.done += 1
+
+
+def drain(batch_size=100, max_attempts=None):
+    """Xử lý mọi sự kiện đang đến hạn. Trả về DrainResult."""
+    max_attempts = max_attempts or get_max_attempts()
+    result = DrainResult()
+    started = time.perf_counter()
+    while True:
+        events = claim(batch_size)
+        if not events:
+            break
+        for event in events:
+            process(event, max_attempts, result)
+    result.duration = time.perf_counter() - started
+    return result
+
+
+def purge_done(days):
+    """Xóa sự kiện đã xử lý xong quá `days` ngày. Trả về số dòng đã xóa."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OutboxEvent.objects.filter(status='done', processed_at__lt=cutoff).delete()
+    return deleted
@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import DailySalesRollup
 
-# Register your models here.
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'orders_placed', 'orders_confirmed', 'orders_cancelled', 'revenue',
+                    'subscriptions_requested', 'subscriptions_verified')
+    date_hierarchy = 'day'
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.25 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='Day')),
+                ('orders_placed', models.PositiveIntegerField(default=0, verbose_name='Orders Placed')),
+                ('orders_confirmed', models.PositiveIntegerField(default=0, verbose_name='Orders Confirmed')),
+                ('orders_cancelled', models.PositiveIntegerField(default=0, verbose_name='Orders Cancelled')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Confirmed Revenue')),
+                ('subscriptions_requested', models.PositiveIntegerField(default=0, verbose_name='Subscriptions Requested')),
+                ('subscriptions_verified', models.PositiveIntegerField(default=0, verbose_name='Subscriptions Verified')),
+            ],
+            options={
+                'verbose_name': 'Daily Sales Rollup',
+                'verbose_name_plural': 'Daily Sales Rollups',
+                'ordering': ['-day'],
+            },
+        ),
+    ]
@@ -1,3 +1,24 @@
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class DailySalesRollup(models.Model):
+    """
+    Số liệu bán hàng theo ngày, cộng dồn từ sự kiện outbox (xem reports/rollups.py)
+    thay vì đếm lại toàn bộ bảng mỗi lần mở báo cáo.
+    """
+    day = models.DateField(_('Day'), unique=True)
+    orders_placed = models.PositiveIntegerField(_('Orders Placed'), default=0)
+    orders_confirmed = models.PositiveIntegerField(_('Orders Confirmed'), default=0)
+    orders_cancelled = models.PositiveIntegerField(_('Orders Cancelled'), default=0)
+    revenue = models.DecimalField(_('Confirmed Revenue'), max_digits=14, decimal_places=2, default=0)
+    subscriptions_requested = models.PositiveIntegerField(_('Subscriptions Requested'), default=0)
+    subscriptions_verified = models.PositiveIntegerField(_('Subscriptions Verified'), default=0)
+
+    class Meta:
+        verbose_name = _('Daily Sales Rollup')
+        verbose_name_plural = _('Daily Sales Rollups')
+        ordering = ['-day']
+
+    def __str__(self):
+        return str(self.day)
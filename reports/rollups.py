@@ -0,0 +1,30 @@
+"""
+Handler outbox cộng dồn số liệu vào DailySalesRollup (theo ngày phát sinh sự kiện).
+Chỉ ghi DB nên chạy đúng một lần cho mỗi sự kiện (xem outbox/worker.py).
+"""
+from decimal import Decimal
+
+from django.db.models import F
+from django.utils import timezone
+
+from outbox.handlers import handler
+
+from .models import DailySalesRollup
+
+COUNTERS = {
+    'order.placed': 'orders_placed',
+    'order.confirmed': 'orders_confirmed',
+    'order.cancelled': 'orders_cancelled',
+    'subscription.requested': 'subscriptions_requested',
+    'subscription.verified': 'subscriptions_verified',
+}
+
+
+@handler('reports.rollup', topics=COUNTERS)
+def rollup(event):
+    day = timezone.localdate(event.created_at)
+    DailySalesRollup.objects.get_or_create(day=day)
+    changes = {COUNTERS[event.topic]: F(COUNTERS[event.topic]) + 1}
+    if event.topic == 'order.confirmed':
+        changes['revenue'] = F('revenue') + Decimal(str(event.payload.get('total_price') or 0))
+    DailySalesRollup.objects.filter(day=day).update(**changes)
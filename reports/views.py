@@ -4,6 +4,7 @@ from django.db.models import Count, Q
 from django.utils import timezone
 from users.models import User, ConsultationRequest
 from services.models import UserSubscription, Supplier, Category, Service
+from archive.history import consultation_count, consultation_counts_by_staff, subscription_counts_by, subscription_total
 import datetime
 import json 
 
@@ -22,25 +23,24 @@ def reports_dashboard(request):
 
     # 2. BÁO CÁO TƯ VẤN
     pending_consults = ConsultationRequest.objects.filter(status__in=['new', 'assigned']).count()
-    completed_consults = ConsultationRequest.objects.filter(status='completed').count()
+    # Số liệu lịch sử gồm cả bản ghi đã lưu trữ (archive/history.py)
+    completed_consults = consultation_count(status='completed')
     
     # 3. BÁO CÁO BÁN HÀNG
-    total_sales = UserSubscription.objects.count()
+    total_sales = subscription_total()
     sales_today = UserSubscription.objects.filter(start_date__date=today).count()
     
     # 4. CHUẨN BỊ DỮ LIỆU CHO BIỂU ĐỒ
-    sales_by_service_qs = UserSubscription.objects.values('service__name') \
-                                             .annotate(count=Count('id')) \
-                                             .order_by('-count')
-    sales_by_service_labels = json.dumps([item['service__name'] for item in sales_by_service_qs])
-    sales_by_service_data = json.dumps([item['count'] for item in sales_by_service_qs])
+    sales_by_service = sorted(subscription_counts_by('service__name').items(), key=lambda item: -item[1])
+    sales_by_service_labels = json.dumps([name for name, _ in sales_by_service])
+    sales_by_service_data = json.dumps([count for _, count in sales_by_service])
 
-    sales_by_supplier_qs = UserSubscription.objects.filter(service__supplier__isnull=False) \
-                                               .values('service__supplier__name') \
-                                               .annotate(count=Count('id')) \
-                                               .order_by('-count')
-    sales_by_supplier_labels = json.dumps([item['service__supplier__name'] for item in sales_by_supplier_qs])
-    sales_by_supplier_data = json.dumps([item['count'] for item in sales_by_supplier_qs])
+    sales_by_supplier = sorted(
+        ((name, count) for name, count in subscription_counts_by('service__supplier__name').items() if name is not None),
+        key=lambda item: -item[1],
+    )
+    sales_by_supplier_labels = json.dumps([name for name, _ in sales_by_supplier])
+    sales_by_supplier_data = json.dumps([count for _, count in sales_by_supplier])
 
     staff_stats_labels = []
     staff_stats_assigned = []
@@ -48,12 +48,12 @@ def reports_dashboard(request):
     if request.user.is_superuser:
         staff_stats_qs = User.objects.filter(is_staff=True, is_superuser=False).annotate(
             assigned_count=Count('assigned_consults', filter=Q(assigned_consults__status__in=['new', 'assigned'])),
-            completed_count=Count('assigned_consults', filter=Q(assigned_consults__status='completed'))
         ).order_by('-assigned_count')
+        completed_counts = consultation_counts_by_staff(status='completed')
         
         staff_stats_labels = json.dumps([staff.full_name or staff.email for staff in staff_stats_qs])
         staff_stats_assigned = json.dumps([staff.assigned_count for staff in staff_stats_qs])
-        staff_stats_completed = json.dumps([staff.completed_count for staff in staff_stats_qs])
+        staff_stats_completed = json.dumps([completed_counts.get(staff.pk, 0) for staff in staff_stats_qs])
 
     context = {
         'total_users': total_users,
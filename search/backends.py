@@ -0,0 +1,163 @@
+"""
+Backend tìm kiếm toàn văn (full-text) cho dịch vụ và bài đăng.
+
+- SQLite: bảng ảo FTS5, xếp hạng BM25.
+- PostgreSQL: cột tsvector + GIN index, xếp hạng ts_rank_cd.
+- CSDL khác: quay về LIKE (icontains) như trước đây.
+
+Mọi backend dùng chung giao diện: index(), remove(), rebuild(), search().
+Văn bản được bỏ dấu trước khi ghi và trước khi truy vấn (search/text.py),
+nên "bao hiem" khớp với "bảo hiểm".
+"""
+from django.db import connection as default_connection
+from django.db.models import Q
+
+from .documents import DOCUMENTS
+from .text import tokenize
+
+# Trọng số BM25 cho (title, body): khớp ở tiêu đề quan trọng hơn nội dung.
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+class BaseSearchBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index(self, document, objects):
+        raise NotImplementedError
+
+    def remove(self, document, pks):
+        raise NotImplementedError
+
+    def clear(self, document):
+        raise NotImplementedError
+
+    def search(self, document, query, limit=10):
+        """Trả về danh sách pk theo thứ tự liên quan giảm dần."""
+        raise NotImplementedError
+
+    def rebuild(self, document, batch_size=1000):
+        self.clear(document)
+        batch = []
+        for obj in document.get_queryset().iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                self.index(document, batch)
+                batch = []
+        if batch:
+            self.index(document, batch)
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    def index(self, document, objects):
+        rows = [document.prepare(obj) for obj in objects]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {document.table} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(f'INSERT INTO {document.table} (rowid, title, body) VALUES (%s, %s, %s)', rows)
+
+    def remove(self, document, pks):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {document.table} WHERE rowid = %s', [(pk,) for pk in pks])
+
+    def clear(self, document):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {document.table}')
+
+    def search(self, document, query, limit=10):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Mỗi từ là một truy vấn tiền tố ("bao"* khớp "bao", "baohiem"...); các từ nối bằng AND.
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {document.table} WHERE {document.table} MATCH %s '
+                f'ORDER BY bm25({document.table}, %s, %s) LIMIT %s',
+                [match, TITLE_WEIGHT, BODY_WEIGHT, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    def index(self, document, objects):
+        rows = [document.prepare(obj) for obj in objects]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {document.table} (id, document) VALUES "
+                f"(%s, setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+                f"ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+
+    def remove(self, document, pks):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {document.table} WHERE id = ANY(%s)', [list(pks)])
+
+    def clear(self, document):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {document.table}')
+
+    def search(self, document, query, limit=10):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM {document.table}, to_tsquery('simple', %s) AS q "
+                f"WHERE document @@ q ORDER BY ts_rank_cd(document, q) DESC LIMIT %s",
+                [tsquery, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """Dự phòng cho CSDL không hỗ trợ: không cần bảng chỉ mục, quét LIKE."""
+
+    def index(self, document, objects):
+        pass
+
+    def remove(self, document, pks):
+        pass
+
+    def clear(self, document):
+        pass
+
+    def rebuild(self, document, batch_size=1000):
+        pass
+
+    def search(self, document, query, limit=10):
+        condition = Q()
+        for field in document.search_fields:
+            condition |= Q(**{f'{field}__icontains': query})
+        return list(document.model.objects.filter(condition).values_list('pk', flat=True)[:limit])
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend(connection=None):
+    connection = connection or default_connection
+    return BACKENDS.get(connection.vendor, LikeSearchBackend)(connection)
+
+
+def search(name, query, limit=10):
+    """
+    Tìm trong loại tài liệu `name` ('services' hoặc 'posts'),
+    trả về các object theo thứ tự liên quan.
+    """
+    document = DOCUMENTS[name]
+    pks = get_backend().search(document, query, limit=limit)
+    if not pks:
+        return []
+    objects = document.get_queryset().in_bulk(pks)
+    return [objects[pk] for pk in pks if pk in objects]
+
@@ -0,0 +1,73 @@
+"""
+Định nghĩa các loại tài liệu được đánh chỉ mục tìm kiếm.
+
+Mỗi loại tài liệu có một bảng chỉ mục riêng, dòng trong bảng dùng chung
+khóa chính với model gốc nên việc cập nhật/xóa một tài liệu luôn là tra cứu
+theo khóa chính.
+"""
+from blog.models import Post
+from services.models import Service
+
+from .text import fold
+
+
+class SearchDocument:
+    name = None
+    table = None
+    model = None
+    search_fields = ()
+
+    @classmethod
+    def get_queryset(cls):
+        return cls.model.objects.all()
+
+    @classmethod
+    def get_title(cls, obj):
+        raise NotImplementedError
+
+    @classmethod
+    def get_body(cls, obj):
+        raise NotImplementedError
+
+    @classmethod
+    def prepare(cls, obj):
+        """Trả về (pk, title, body) đã bỏ dấu để ghi vào chỉ mục."""
+        return obj.pk, fold(cls.get_title(obj)), fold(cls.get_body(obj))
+
+
+class ServiceDocument(SearchDocument):
+    name = 'services'
+    table = 'search_service'
+    model = Service
+    search_fields = ('name', 'description')
+
+    @classmethod
+    def get_queryset(cls):
+        return Service.objects.select_related('category')
+
+    @classmethod
+    def get_title(cls, obj):
+        return obj.name
+
+    @classmethod
+    def get_body(cls, obj):
+        return obj.description
+
+
+class PostDocument(SearchDocument):
+    name = 'posts'
+    table = 'search_post'
+    model = Post
+    search_fields = ('title', 'content')
+
+    @classmethod
+    def get_title(cls, obj):
+        return obj.title
+
+    @classmethod
+    def get_body(cls, obj):
+        return obj.content
+
+
+DOCUMENTS = {doc.name: doc for doc in (ServiceDocument, PostDocument)}
+DOCUMENTS_BY_MODEL = {doc.model: doc for doc in DOCUMENTS.values()}
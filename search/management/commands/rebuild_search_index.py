@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from search.backends import get_backend
+from search.documents import DOCUMENTS
+
+
+class Command(BaseCommand):
+    help = 'Xây dựng lại toàn bộ chỉ mục tìm kiếm (dịch vụ, bài đăng).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('documents', nargs='*', help=f'Một trong {", ".join(DOCUMENTS)}. Mặc định: tất cả.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        names = options['documents'] or list(DOCUMENTS)
+        unknown = [name for name in names if name not in DOCUMENTS]
+        if unknown:
+            raise CommandError(f'Loại tài liệu không hợp lệ: {", ".join(unknown)}')
+        backend = get_backend()
+        for name in names:
+            document = DOCUMENTS[name]
+            started = time.monotonic()
+            with transaction.atomic():
+                backend.rebuild(document, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Đã đánh chỉ mục "{name}" trong {time.monotonic() - started:.2f}s.'
+            ))
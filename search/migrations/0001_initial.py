@@ -0,0 +1,65 @@
+from django.db import migrations
+
+from search.text import fold
+
+TABLES = {
+    'search_service': ('services', 'Service', 'name', 'description'),
+    'search_post': ('blog', 'Post', 'title', 'content'),
+}
+
+
+def create_tables(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in TABLES:
+        if vendor == 'sqlite':
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {table} USING fts5("
+                f"title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        elif vendor == 'postgresql':
+            schema_editor.execute(f'CREATE TABLE {table} (id bigint PRIMARY KEY, document tsvector NOT NULL)')
+            schema_editor.execute(f'CREATE INDEX {table}_document_gin ON {table} USING GIN (document)')
+
+
+def drop_tables(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        for table in TABLES:
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+def populate(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table, (app_label, model_name, title_field, body_field) in TABLES.items():
+            model = apps.get_model(app_label, model_name)
+            rows = [
+                (pk, fold(title), fold(body))
+                for pk, title, body in model.objects.values_list('pk', title_field, body_field)
+            ]
+            if not rows:
+                continue
+            if vendor == 'sqlite':
+                sql = f'INSERT INTO {table} (rowid, title, body) VALUES (%s, %s, %s)'
+            else:
+                sql = (
+                    f"INSERT INTO {table} (id, document) VALUES "
+                    f"(%s, setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B'))"
+                )
+            cursor.executemany(sql, rows)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('services', '0016_service_keyset_indexes'),
+        ('blog', '0002_post_slug'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_tables, drop_tables),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
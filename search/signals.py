@@ -0,0 +1,45 @@
+from django.db import connections
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from blog.models import Post
+from services.models import Service, Category, Supplier
+
+from .backends import get_backend
+from .documents import DOCUMENTS_BY_MODEL
+from .suggest import suggestion_index
+
+
+# --- CẬP NHẬT CHỈ MỤC TÌM KIẾM THEO TỪNG BẢN GHI ---
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Post)
+def index_object(sender, instance, raw=False, using='default', **kwargs):
+    if raw:
+        return
+    get_backend(connections[using]).index(DOCUMENTS_BY_MODEL[sender], [instance])
+
+
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Post)
+def unindex_object(sender, instance, using='default', **kwargs):
+    get_backend(connections[using]).remove(DOCUMENTS_BY_MODEL[sender], [instance.pk])
+
+
+# --- CẬP NHẬT CHỈ MỤC GỢI Ý (TYPEAHEAD) TRONG BỘ NHỚ ---
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Supplier)
+@receiver(post_save, sender=Post)
+def update_suggestion(sender, instance, raw=False, **kwargs):
+    if not raw:
+        suggestion_index.upsert(instance)
+
+
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Supplier)
+@receiver(post_delete, sender=Post)
+def remove_suggestion(sender, instance, **kwargs):
+    suggestion_index.remove(instance)
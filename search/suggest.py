@@ -0,0 +1,228 @@
+"""
+Gợi ý tìm kiếm tức thời (typeahead) từ bộ nhớ của process.
+
+Chỉ mục là một mảng khóa đã sắp xếp (tra cứu bằng bisect) gồm tên dịch vụ,
+category, nhà cung cấp và tiêu đề bài đăng đã bỏ dấu. Mỗi tên được đánh chỉ
+mục tại mọi đầu từ, nên "hiem" cũng khớp "Bảo hiểm ...". Kết quả sắp xếp theo
+độ phổ biến (số lượt mua dịch vụ, số dịch vụ của category/NCC).
+
+Chỉ mục được dựng ở lần dùng đầu tiên trong mỗi process và cập nhật ngay bởi
+signal (search/signals.py) của chính process đó; trả lời truy vấn không chạm
+tới DB. Chỉ thay đổi nhãn (thêm / xóa / đổi tên, đổi đường dẫn) mới bump
+phiên bản gợi ý trong cache dùng chung; sửa giá, ảnh, chi tiết... không làm
+chỉ mục dựng lại. Process khác (hoặc `manage.py catalog_import`) đổi nhãn thì
+chỉ mục được dựng lại ở lần gợi ý kế tiếp; phiên bản được đọc tối đa mỗi
+VERSION_CHECK_INTERVAL giây. Độ phổ biến thay đổi theo đơn hàng nên được tính
+lại định kỳ (POPULARITY_REFRESH_INTERVAL) mà không dựng lại khóa.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.urls import reverse
+
+from blog.models import Post
+from services.cache import cache_version
+from services.models import Service, Category, Supplier
+
+from .text import tokenize
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+MAX_CACHED_PREFIXES = 2048
+VERSION_CHECK_INTERVAL = 5
+POPULARITY_REFRESH_INTERVAL = 10 * 60
+
+SUGGEST_VERSION_KEY = 'search:suggest:version'
+
+
+def suggest_version():
+    return cache_version(SUGGEST_VERSION_KEY)
+
+
+def bump_suggest_version():
+    """Báo nhãn gợi ý đã đổi; trả về phiên bản mới."""
+    try:
+        return cache.incr(SUGGEST_VERSION_KEY)
+    except ValueError:
+        # Key đã mất: cache_version() tạo phiên bản mới, không trùng phiên bản cũ nào.
+        return suggest_version()
+
+
+class Suggestion:
+    __slots__ = ('kind', 'pk', 'label', 'url', 'popularity', 'keys')
+
+    def __init__(self, kind, pk, label, url, popularity=0):
+        self.kind = kind
+        self.pk = pk
+        self.label = label
+        self.url = url
+        self.popularity = popularity
+        tokens = tokenize(label)
+        self.keys = {' '.join(tokens[i:]) for i in range(len(tokens))}
+
+    def as_dict(self):
+        return {'kind': self.kind, 'label': self.label, 'url': self.url}
+
+
+def _service(obj, popularity=0):
+    return Suggestion('service', obj.pk, obj.name, reverse('services:service_detail', args=[obj.pk]), popularity)
+
+
+def _category(obj, popularity=0):
+    return Suggestion('category', obj.pk, obj.name, obj.get_absolute_url(), popularity)
+
+
+def _supplier(obj, popularity=0):
+    return Suggestion('supplier', obj.pk, obj.name, None, popularity)
+
+
+def _post(obj, popularity=0):
+    return Suggestion('post', obj.pk, obj.title, obj.get_absolute_url(), popularity)
+
+
+BUILDERS = {
+    Service: _service,
+    Category: _category,
+    Supplier: _supplier,
+    Post: _post,
+}
+KINDS = {Service: 'service', Category: 'category', Supplier: 'supplier', Post: 'post'}
+
+
+def _popularity():
+    """{(kind, pk): độ phổ biến} của dịch vụ, category và nhà cung cấp (3 truy vấn)."""
+    counts = {}
+    for model, relation in ((Service, 'orderitem'), (Category, 'services'), (Supplier, 'services')):
+        rows = model.objects.order_by().annotate(n=Count(relation)).values_list('pk', 'n')
+        counts.update(((KINDS[model], pk), n) for pk, n in rows)
+    return counts
+
+
+class SuggestionIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []      # danh sách (key, kind, pk) đã sắp xếp
+        self._items = {}     # (kind, pk) -> Suggestion
+        self._memo = {}      # prefix -> danh sách Suggestion (xóa khi chỉ mục đổi)
+        self._version = None  # phiên bản gợi ý lúc dựng; None = chưa dựng
+        self._checked_at = 0.0     # time.monotonic() lần đọc phiên bản gần nhất
+        self._popularity_at = 0.0  # time.monotonic() lần tính độ phổ biến gần nhất
+
+    def build(self, version=None):
+        """Dựng lại toàn bộ chỉ mục từ DB (4 truy vấn)."""
+        # Đọc phiên bản TRƯỚC khi đọc DB: thay đổi xen giữa sẽ làm lần sau dựng lại.
+        version = version or suggest_version()
+        items = []
+        for obj in Service.objects.annotate(popularity=Count('orderitem')).only('pk', 'name'):
+            items.append(_service(obj, obj.popularity))
+        for obj in Category.objects.annotate(popularity=Count('services')).only('pk', 'name', 'slug'):
+            items.append(_category(obj, obj.popularity))
+        for obj in Supplier.objects.annotate(popularity=Count('services')).only('pk', 'name'):
+            items.append(_supplier(obj, obj.popularity))
+        for obj in Post.objects.only('pk', 'title', 'slug'):
+            items.append(_post(obj))
+
+        keys = sorted((key, item.kind, item.pk) for item in items for key in item.keys)
+        with self._lock:
+            self._items = {(item.kind, item.pk): item for item in items}
+            self._keys = keys
+            self._memo = {}
+            self._version = version
+            self._checked_at = self._popularity_at = time.monotonic()
+
+    def refresh_popularity(self):
+        """Tính lại độ phổ biến (số lượt mua thay đổi theo đơn hàng, không qua signal)."""
+        counts = _popularity()
+        with self._lock:
+            for key, item in self._items.items():
+                item.popularity = counts.get(key, item.popularity)
+            self._memo = {}
+            self._popularity_at = time.monotonic()
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+        version = suggest_version()
+        with self._lock:
+            self._checked_at = now
+            if self._version != version:
+                self.build(version)
+                return
+        if now - self._popularity_at >= POPULARITY_REFRESH_INTERVAL:
+            self.refresh_popularity()
+
+    def _labels_changed(self):
+        """Báo cho process khác sau khi commit; giữ chỉ mục của process này nếu không bỏ lỡ thay đổi nào."""
+        def publish():
+            version = bump_suggest_version()
+            with self._lock:
+                if self._version is not None and version == self._version + 1:
+                    self._version = version
+        transaction.on_commit(publish)
+
+    def upsert(self, obj):
+        """Thêm/cập nhật một bản ghi, giữ nguyên độ phổ biến đã biết."""
+        if self._version is None:
+            self._labels_changed()
+            return
+        item = BUILDERS[type(obj)](obj)
+        with self._lock:
+            old = self._items.get((item.kind, item.pk))
+            if old is not None and (old.label, old.url) == (item.label, item.url):
+                return
+            if old is not None:
+                item.popularity = old.popularity
+            self._discard(old)
+            self._items[(item.kind, item.pk)] = item
+            for key in item.keys:
+                insort(self._keys, (key, item.kind, item.pk))
+            self._memo = {}
+        self._labels_changed()
+
+    def remove(self, obj):
+        if self._version is not None:
+            with self._lock:
+                self._discard(self._items.pop((KINDS[type(obj)], obj.pk), None))
+                self._memo = {}
+        self._labels_changed()
+
+    def _discard(self, item):
+        if item is None:
+            return
+        for key in item.keys:
+            entry = (key, item.kind, item.pk)
+            i = bisect_left(self._keys, entry)
+            if i < len(self._keys) and self._keys[i] == entry:
+                del self._keys[i]
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        """Trả về tối đa `limit` Suggestion có khóa bắt đầu bằng `query`."""
+        prefix = ' '.join(tokenize(query))
+        if not prefix:
+            return []
+        self._ensure_current()
+        cached = self._memo.get(prefix)
+        if cached is None:
+            with self._lock:
+                matches = {}
+                i = bisect_left(self._keys, (prefix,))
+                while i < len(self._keys) and self._keys[i][0].startswith(prefix):
+                    _, kind, pk = self._keys[i]
+                    matches[(kind, pk)] = self._items[(kind, pk)]
+                    i += 1
+                cached = heapq.nlargest(
+                    MAX_LIMIT, matches.values(), key=lambda item: (item.popularity, -len(item.label))
+                )
+                if len(self._memo) >= MAX_CACHED_PREFIXES:
+                    self._memo = {}
+                self._memo[prefix] = cached
+        return cached[:min(limit, MAX_LIMIT)]
+
+
+suggestion_index = SuggestionIndex()
@@ -0,0 +1,23 @@
+"""
+Chuẩn hóa văn bản tiếng Việt cho tìm kiếm: bỏ dấu, chữ thường.
+Ví dụ: "Bảo Hiểm Đường Bộ" -> "bao hiem duong bo".
+"""
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fold(text):
+    """Bỏ dấu tiếng Việt (kể cả đ/Đ) và chuyển về chữ thường."""
+    if not text:
+        return ''
+    text = text.replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', text)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return unicodedata.normalize('NFC', stripped).lower()
+
+
+def tokenize(text):
+    """Tách chuỗi đã chuẩn hóa thành các từ (chỉ gồm chữ/số)."""
+    return _TOKEN_RE.findall(fold(text))
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Service, ServiceDetail, UserSubscription, Category, Supplier, CartItem
+from .models import Service, ServiceDetail, ServicePrice, UserSubscription, Category, Supplier, CartItem
+from .subscriptions import verify_subscriptions
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -16,12 +17,17 @@ class ServiceDetailInline(admin.StackedInline):
     model = ServiceDetail
     extra = 1
 
+class ServicePriceInline(admin.TabularInline):
+    # Giá riêng theo thời hạn; thời hạn không có dòng nào dùng giá chung của dịch vụ
+    model = ServicePrice
+    extra = 0
+
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'supplier', 'price', 'is_price_on_contact', 'created_by')
     search_fields = ('name', 'supplier__name', 'category__name') 
     list_filter = ('category', 'supplier', 'is_price_on_contact') 
-    inlines = [ServiceDetailInline] 
+    inlines = [ServicePriceInline, ServiceDetailInline] 
     
     fieldsets = (
         (None, {'fields': ('name', 'category', 'supplier', 'description', 'price', 'is_price_on_contact', 'thumbnail')}), 
@@ -38,11 +44,18 @@ class ServiceAdmin(admin.ModelAdmin):
 
 @admin.register(UserSubscription)
 class UserSubscriptionAdmin(admin.ModelAdmin):
-    list_display = ('user', 'service', 'purchased_by', 'start_date', 'expiration_date', 'is_active') 
-    list_filter = ('is_active', 'service', 'service__category', 'service__supplier')
+    list_display = ('user', 'service', 'purchased_by', 'start_date', 'expiration_date', 'is_active', 'status') 
+    list_filter = ('status', 'is_active', 'service', 'service__category', 'service__supplier')
     search_fields = ('user__email', 'user__phone_number', 'user__cccd', 'service__name')
     date_hierarchy = 'start_date'
     autocomplete_fields = ['user', 'service', 'purchased_by']
+    actions = ['verify_selected']
+
+    @admin.action(description='Xác minh (kích hoạt) các dịch vụ đã chọn')
+    def verify_selected(self, request, queryset):
+        # Một câu UPDATE cho cả lô, cùng ngữ nghĩa với save() (services/subscriptions.py)
+        verified = verify_subscriptions(queryset)
+        self.message_user(request, f'Đã xác minh {verified} dịch vụ.')
 
 @admin.register(CartItem)
 class CartItemAdmin(admin.ModelAdmin):
@@ -0,0 +1,130 @@
+"""
+Cache cho các trang public của catalog dịch vụ (và tóm tắt giỏ hàng của từng user).
+
+Các key được xóa (evict) bởi signal trong services/signals.py mỗi khi
+Service, ServiceImage, ServiceDetail, Category hoặc Supplier thay đổi.
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+from django.template.loader import render_to_string
+
+from .models import CartItem, Service
+
+SERVICE_DETAIL_TIMEOUT = 60 * 60 * 24
+
+
+def service_detail_key(pk):
+    return f'services:detail:{pk}'
+
+
+def get_service_detail(pk):
+    """
+    Trả về (service, main_html) cho trang chi tiết dịch vụ.
+
+    Khi cache trống: tải Service cùng category/supplier và prefetch images/details,
+    render phần ảnh + tab một lần rồi lưu lại. Lần sau không chạm tới DB.
+    Phần riêng của user (form giỏ hàng, CSRF) vẫn được render ở view.
+    """
+    key = service_detail_key(pk)
+    entry = cache.get(key)
+    if entry is None:
+        service = (
+            Service.objects.select_related('category', 'supplier')
+            .prefetch_related('images', 'details')
+            .filter(pk=pk)
+            .first()
+        )
+        if service is None:
+            raise Http404('No Service matches the given query.')
+        main_html = render_to_string('components/service_detail_main.html', {'service': service})
+        entry = {'service': service, 'updated_at': service.updated_at, 'main_html': main_html}
+        cache.set(key, entry, SERVICE_DETAIL_TIMEOUT)
+    return entry['service'], entry['main_html']
+
+
+def invalidate_service_detail(*pks):
+    if pks:
+        cache.delete_many([service_detail_key(pk) for pk in pks])
+
+
+# --- PHIÊN BẢN CATALOG ---
+# Thời điểm (nano giây) của lần thay đổi Service/Category/Supplier gần nhất.
+# Các cache suy ra từ toàn bộ catalog (số đếm facet, ETag các trang public)
+# đưa phiên bản vào key, nên chỉ cần ghi số mới là mọi entry cũ tự hết hiệu
+# lực. Vì là mốc thời gian, nó cũng dùng được làm Last-Modified.
+
+CATALOG_VERSION_KEY = 'services:catalog:version'
+
+
+def cache_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Cache bị xóa: coi như vừa thay đổi, không trùng phiên bản cũ nào.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(key):
+    cache.set(key, time.time_ns(), None)
+
+
+def version_datetime(version):
+    return datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)
+
+
+def catalog_version():
+    return cache_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    bump_cache_version(CATALOG_VERSION_KEY)
+
+
+# --- TÓM TẮT GIỎ HÀNG ---
+# Số mục, tạm tính (giá theo thời hạn, services/pricing.py) và số mục "Liên hệ" của giỏ hàng,
+# dùng cho badge trên thanh điều hướng và trang giỏ hàng. Key gồm phiên bản
+# catalog vì giá dịch vụ đổi thì tạm tính cũng đổi. Được tính lại ngay khi
+# giỏ hàng thay đổi (thêm / xóa / thanh toán), xem cart_changed().
+
+CART_SUMMARY_TIMEOUT = 60 * 60 * 24
+
+
+def cart_summary_key(user_id):
+    return f'services:cart:{user_id}:{catalog_version()}'
+
+
+def compute_cart_summary(user_id):
+    from .pricing import price_for, price_matrix  # pricing.py dùng catalog_version() của module này
+
+    matrix = price_matrix()
+    prices = [
+        price_for(service_id, days, matrix)
+        for service_id, days in CartItem.objects.filter(user_id=user_id).values_list('service_id', 'duration_days')
+    ]
+    summary = {
+        'count': len(prices),
+        'subtotal': sum(price for price in prices if price is not None),
+        'contact_items': sum(1 for price in prices if price is None),
+    }
+    summary['has_contact_price'] = bool(summary['contact_items'])
+    # Dùng trong ETag (store_tis/conditional.py): đổi mỗi khi giỏ hàng đổi.
+    summary['version'] = time.time_ns()
+    cache.set(cart_summary_key(user_id), summary, CART_SUMMARY_TIMEOUT)
+    return summary
+
+
+def get_cart_summary(user_id):
+    summary = cache.get(cart_summary_key(user_id))
+    if summary is None:
+        summary = compute_cart_summary(user_id)
+    return summary
+
+
+def cart_changed(user_id):
+    """Gọi sau khi thêm/xóa CartItem của user; tính lại khi transaction commit."""
+    transaction.on_commit(lambda: compute_cart_summary(user_id))
@@ -0,0 +1,69 @@
+"""
+Ghi giỏ hàng (CartItem) an toàn khi có nhiều request cùng lúc.
+
+add_items() thêm một hoặc nhiều dịch vụ bằng MỘT câu lệnh
+
+    INSERT ... ON CONFLICT (user_id, service_id, duration_days) DO NOTHING RETURNING ...
+
+dựa trên unique_together của CartItem: hai lần bấm "Thêm vào giỏ" cùng lúc
+không còn gây IntegrityError, và dòng RETURNING cho biết mục nào vừa được
+thêm, mục nào đã có sẵn, trong cùng một lượt truy vấn. Cú pháp này có trên
+SQLite (>= 3.35) và PostgreSQL; CSDL khác dùng bulk_create(ignore_conflicts).
+"""
+from django.db import connection
+from django.utils import timezone
+
+from .cache import cart_changed
+from .models import CartItem
+
+UPSERT_VENDORS = ('sqlite', 'postgresql')
+
+
+def add_items(user_id, items):
+    """
+    Thêm các cặp (service_id, duration_days) vào giỏ của user.
+    Trả về set các cặp vừa được thêm; cặp không có trong set là đã có trong giỏ.
+    Các service_id phải tồn tại (view đã kiểm tra).
+    """
+    items = list(dict.fromkeys((int(service_id), int(days)) for service_id, days in items))
+    if not items:
+        return set()
+    if connection.vendor in UPSERT_VENDORS:
+        created = _insert_returning(user_id, items)
+    else:
+        created = _insert_fallback(user_id, items)
+    if created:
+        cart_changed(user_id)
+    return created
+
+
+def _insert_returning(user_id, items):
+    meta = CartItem._meta
+    qn = connection.ops.quote_name
+    column = lambda name: qn(meta.get_field(name).column)  # noqa: E731
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    sql = (
+        f"INSERT INTO {qn(meta.db_table)} "
+        f"({column('user')}, {column('service')}, {column('duration_days')}, {column('created_at')}) "
+        f"VALUES {', '.join(['(%s, %s, %s, %s)'] * len(items))} "
+        f"ON CONFLICT ({column('user')}, {column('service')}, {column('duration_days')}) DO NOTHING "
+        f"RETURNING {column('service')}, {column('duration_days')}"
+    )
+    params = []
+    for service_id, days in items:
+        params += [user_id, service_id, days, now]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {tuple(row) for row in cursor.fetchall()}
+
+
+def _insert_fallback(user_id, items):
+    existing = set(
+        CartItem.objects.filter(user_id=user_id, service_id__in={service_id for service_id, _ in items})
+        .values_list('service_id', 'duration_days')
+    )
+    CartItem.objects.bulk_create(
+        [CartItem(user_id=user_id, service_id=service_id, duration_days=days) for service_id, days in items],
+        ignore_conflicts=True,
+    )
+    return {item for item in items if item not in existing}
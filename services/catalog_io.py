@@ -0,0 +1,144 @@
+"""
+Đọc/ghi catalog dịch vụ dạng CSV hoặc JSONL (dùng cho catalog_import/catalog_export).
+
+Mỗi dòng là một dịch vụ với các cột:
+    id, name, description, category, supplier, price, is_price_on_contact,
+    thumbnail, images, details
+
+- category/supplier: theo TÊN (tự tạo nếu chưa có).
+- thumbnail/images: URL http(s) hoặc đường dẫn file cục bộ. Trong CSV, `images`
+  là danh sách JSON hoặc các giá trị nối bằng "|".
+- details: danh sách [{"title": ..., "content": ...}]. Trong CSV là chuỗi JSON.
+"""
+import contextlib
+import csv
+import json
+import os
+import sys
+import urllib.parse
+import urllib.request
+from decimal import Decimal, InvalidOperation
+
+COLUMNS = [
+    'id', 'name', 'description', 'category', 'supplier', 'price',
+    'is_price_on_contact', 'thumbnail', 'images', 'details',
+]
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'x', 'có'}
+FETCH_TIMEOUT = 30
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def open_input(path):
+    # stdin không thuộc về lệnh: `with` không được đóng nó.
+    return contextlib.nullcontext(sys.stdin) if path == '-' else open(path, newline='', encoding='utf-8')
+
+
+def open_output(path):
+    return sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+
+
+def read_rows(fh, fmt):
+    """Sinh từng dòng (dict) từ file, không đọc cả file vào bộ nhớ."""
+    if fmt == 'jsonl':
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        yield from csv.DictReader(fh)
+
+
+def _list(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, list):
+        return value
+    value = value.strip()
+    if value.startswith('['):
+        return json.loads(value)
+    return [item.strip() for item in value.split('|') if item.strip()]
+
+
+def parse_row(row):
+    """Chuẩn hóa một dòng thô thành dict với kiểu dữ liệu đúng."""
+    name = (row.get('name') or '').strip()
+    if not name:
+        raise RowError('Thiếu tên dịch vụ (name).')
+
+    raw_price = row.get('price')
+    price = None
+    if raw_price not in (None, ''):
+        try:
+            price = Decimal(str(raw_price))
+        except InvalidOperation:
+            raise RowError(f'Giá không hợp lệ: {raw_price!r}')
+
+    is_contact = row.get('is_price_on_contact')
+    if not isinstance(is_contact, bool):
+        is_contact = str(is_contact or '').strip().lower() in TRUE_VALUES
+
+    details = []
+    for item in _list(row.get('details')):
+        if isinstance(item, dict):
+            details.append((str(item.get('title', '')), str(item.get('content', ''))))
+        else:
+            title, _, content = str(item).partition(':')
+            details.append((title.strip(), content.strip()))
+
+    raw_id = row.get('id')
+    return {
+        'id': int(raw_id) if raw_id not in (None, '') else None,
+        'name': name,
+        'description': row.get('description') or '',
+        'category': (row.get('category') or '').strip(),
+        'supplier': (row.get('supplier') or '').strip(),
+        'price': None if is_contact else price,
+        'is_price_on_contact': is_contact,
+        'thumbnail': (row.get('thumbnail') or '').strip(),
+        'images': [str(item) for item in _list(row.get('images'))],
+        'details': details,
+    }
+
+
+def fetch(location, base_dir=None):
+    """Tải nội dung ảnh từ URL hoặc đọc từ file cục bộ. Trả về (tên file, bytes)."""
+    if location.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(location, timeout=FETCH_TIMEOUT) as response:
+            data = response.read()
+        filename = os.path.basename(urllib.parse.urlparse(location).path) or 'image'
+        return filename, data
+    path = location if os.path.isabs(location) or not base_dir else os.path.join(base_dir, location)
+    with open(path, 'rb') as fh:
+        return os.path.basename(path), fh.read()
+
+
+def serialize_service(service, fmt):
+    """Chuyển một Service (đã prefetch details/images) thành dict để ghi ra."""
+    details = [{'title': d.title, 'content': d.content} for d in service.details.all()]
+    images = [img.image.name for img in service.images.all()]
+    row = {
+        'id': service.pk,
+        'name': service.name,
+        'description': service.description,
+        'category': service.category.name if service.category else '',
+        'supplier': service.supplier.name if service.supplier else '',
+        'price': str(service.price) if service.price is not None else '',
+        'is_price_on_contact': service.is_price_on_contact,
+        'thumbnail': service.thumbnail.name or '',
+        'images': images,
+        'details': details,
+    }
+    if fmt == 'csv':
+        row['is_price_on_contact'] = '1' if service.is_price_on_contact else '0'
+        row['images'] = '|'.join(images)
+        row['details'] = json.dumps(details, ensure_ascii=False) if details else ''
+    return row
@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_cart_summary
+
+
+def cart(request):
+    """
+    `cart_summary` (count, subtotal, contact_items, has_contact_price) cho mọi template.
+    Lazy: chỉ đọc cache khi template thực sự dùng, và không truy vấn DB khi cache còn.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'cart_summary': SimpleLazyObject(lambda: get_cart_summary(user.pk))}
@@ -0,0 +1,110 @@
+"""
+Quyền sử dụng dịch vụ (entitlement): "user X hiện có dịch vụ Y không?".
+
+    has_entitlement(user_id, service_id)  -> bool
+    get_entitlements(user_id)             -> Entitlements (service_ids, hạn từng dịch vụ)
+
+Một dịch vụ được tính là đang có khi có UserSubscription của user đã xác minh,
+còn active và chưa hết hạn (status 'active' / 'expiring', qua index
+sub_user_status_exp_idx). Kết quả mỗi user là một frozenset id dịch vụ kèm hạn
+dùng, lưu trong cache dùng chung với thời gian sống không quá mốc hết hạn sớm
+nhất: khi một dịch vụ hết hạn, entry tự hết hiệu lực mà không cần chờ
+`manage.py expire_subscriptions`. Mỗi lần kiểm tra là một cache.get, không
+truy vấn DB.
+
+Entry bị xóa khi UserSubscription của user thay đổi: qua signal
+(services/signals.py) với save()/delete(), và gọi invalidate_entitlements()
+trực tiếp ở các chỗ UPDATE hàng loạt (xác minh, hết hạn, xóa user con).
+"""
+import math
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import UserSubscription
+
+ENTITLEMENT_TIMEOUT = 60 * 60
+ENTITLED_STATUSES = ('active', 'expiring')
+
+
+class Entitlements:
+    __slots__ = ('user_id', 'expires', 'service_ids', 'valid_until')
+
+    def __init__(self, user_id, expires, valid_until):
+        self.user_id = user_id
+        # {service_id: expiration_date | None (không thời hạn)}
+        self.expires = expires
+        self.service_ids = frozenset(expires)
+        # Mốc hết hạn sớm nhất: sau thời điểm này tập quyền phải tính lại.
+        self.valid_until = valid_until
+
+    def __contains__(self, service_id):
+        return service_id in self.service_ids
+
+    def __len__(self):
+        return len(self.service_ids)
+
+    def expires_at(self, service_id):
+        return self.expires.get(service_id)
+
+    def is_stale(self, now):
+        return self.valid_until is not None and self.valid_until <= now
+
+    def as_dict(self):
+        return {
+            'user_id': self.user_id,
+            'services': [
+                {'service_id': service_id, 'expires_at': self.expires[service_id]}
+                for service_id in sorted(self.service_ids)
+            ],
+            'valid_until': self.valid_until,
+        }
+
+
+def entitlements_key(user_id):
+    return f'services:entitlements:{user_id}'
+
+
+def build_entitlements(user_id, now=None):
+    now = now or timezone.now()
+    rows = (
+        UserSubscription.objects.filter(
+            user_id=user_id, status__in=ENTITLED_STATUSES, is_active=True, is_verified=True,
+        )
+        .filter(Q(expiration_date__isnull=True) | Q(expiration_date__gt=now))
+        .values_list('service_id', 'expiration_date')
+    )
+    expires = {}
+    for service_id, expiration in rows:
+        # Nhiều gói cho cùng một dịch vụ: lấy hạn xa nhất (None = không thời hạn).
+        if service_id in expires and (expires[service_id] is None or (expiration and expiration < expires[service_id])):
+            continue
+        expires[service_id] = expiration
+    valid_until = min((expiration for expiration in expires.values() if expiration), default=None)
+    return Entitlements(user_id, expires, valid_until)
+
+
+def get_entitlements(user_id):
+    now = timezone.now()
+    key = entitlements_key(user_id)
+    entitlements = cache.get(key)
+    if entitlements is None or entitlements.is_stale(now):
+        entitlements = build_entitlements(user_id, now)
+        timeout = ENTITLEMENT_TIMEOUT
+        if entitlements.valid_until is not None:
+            timeout = max(1, min(timeout, math.ceil((entitlements.valid_until - now).total_seconds())))
+        cache.set(key, entitlements, timeout)
+    return entitlements
+
+
+def has_entitlement(user_id, service_id):
+    return service_id in get_entitlements(user_id)
+
+
+def invalidate_entitlements(*user_ids):
+    """Xóa tập quyền của các user khi transaction hiện tại commit."""
+    keys = [entitlements_key(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
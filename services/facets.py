@@ -0,0 +1,153 @@
+"""
+Lọc theo facet (category, nhà cung cấp, mức giá) cho trang quản lý dịch vụ.
+
+Số đếm được tính bằng ba truy vấn: một GROUP BY category_id, một GROUP BY
+supplier_id, và một aggregate cho tổng cùng các mức giá (số mức giá cố định).
+Số cột không tăng theo số category / nhà cung cấp (SQLite giới hạn khoảng 2000
+cột mỗi câu SELECT). Số đếm của một facet áp dụng mọi bộ lọc đang chọn TRỪ
+chính facet đó, nên nó cho biết chọn lựa chọn ấy sẽ ra bao nhiêu dịch vụ.
+
+Kết quả được cache theo chữ ký bộ lọc + phiên bản catalog (services/cache.py).
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .cache import catalog_version
+from .models import Service, Category, Supplier
+
+FACETS_TIMEOUT = 60 * 15
+
+PRICE_BUCKETS = {
+    'paid': ('Có phí', Q(price__gt=0, is_price_on_contact=False)),
+    'free': ('Miễn phí', Q(price=0, is_price_on_contact=False)),
+    'contact': ('Liên hệ', Q(is_price_on_contact=True)),
+}
+
+SORTS = {
+    'name_asc': ('name', 'pk'),
+    'name_desc': ('-name', '-pk'),
+    'price_asc': ('price', 'pk'),
+    'price_desc': ('-price', '-pk'),
+    'newest': ('-created_at', '-pk'),
+}
+DEFAULT_SORT = 'name_asc'
+
+
+def _int_or_none(value):
+    return int(value) if value and value.isdigit() else None
+
+
+class ServiceFilter:
+    """Bộ lọc đọc từ query string (?q=&category=&supplier=&price=&sort=)."""
+
+    def __init__(self, data):
+        self.q = (data.get('q') or '').strip()
+        self.category = _int_or_none(data.get('category'))
+        self.supplier = _int_or_none(data.get('supplier'))
+        price = data.get('price') or ''
+        self.price = price if price in PRICE_BUCKETS else ''
+        sort = data.get('sort') or ''
+        self.sort = sort if sort in SORTS else ''
+
+    def signature(self):
+        return f'{self.q.lower()}|{self.category or ""}|{self.supplier or ""}|{self.price}'
+
+    def conditions(self):
+        """Điều kiện của từng facet đang chọn (không gồm ô tìm theo tên)."""
+        conditions = {}
+        if self.category:
+            conditions['category'] = Q(category_id=self.category)
+        if self.supplier:
+            conditions['supplier'] = Q(supplier_id=self.supplier)
+        if self.price:
+            conditions['price'] = PRICE_BUCKETS[self.price][1]
+        return conditions
+
+    def base_queryset(self):
+        services = Service.objects.all()
+        if self.q:
+            services = services.filter(name__icontains=self.q)
+        return services
+
+    def apply(self, queryset=None):
+        services = queryset if queryset is not None else self.base_queryset()
+        for condition in self.conditions().values():
+            services = services.filter(condition)
+        return services.order_by(*SORTS[self.sort or DEFAULT_SORT])
+
+
+def _combine(conditions, exclude=None):
+    combined = Q()
+    for facet, condition in conditions.items():
+        if facet != exclude:
+            combined &= condition
+    return combined
+
+
+def _count(condition):
+    return Count('pk', filter=condition) if condition else Count('pk')
+
+
+def facet_options():
+    """Danh sách (id, name) của category và nhà cung cấp, cache theo phiên bản catalog."""
+    key = f'services:facets:options:{catalog_version()}'
+    options = cache.get(key)
+    if options is None:
+        options = {
+            'category': list(Category.objects.order_by('name').values_list('id', 'name')),
+            'supplier': list(Supplier.objects.order_by('name').values_list('id', 'name')),
+        }
+        cache.set(key, options, FACETS_TIMEOUT)
+    return options
+
+
+def _group_counts(services, field):
+    """{giá trị `field`: số dịch vụ} bằng một truy vấn GROUP BY (bỏ qua giá trị NULL)."""
+    rows = services.filter(**{f'{field}__isnull': False}).order_by().values(field).annotate(n=Count('pk'))
+    return {row[field]: row['n'] for row in rows}
+
+
+def facet_counts(service_filter):
+    """
+    Trả về {'total': n, 'category': {id: n}, 'supplier': {id: n}, 'price': {bucket: n}}
+    cho bộ lọc hiện tại (lựa chọn không có dịch vụ nào thì không có trong dict).
+    """
+    key = f'services:facets:counts:{catalog_version()}:{service_filter.signature()}'
+    counts = cache.get(key)
+    if counts is not None:
+        return counts
+
+    conditions = service_filter.conditions()
+    services = service_filter.base_queryset()
+    aggregates = {'total': _count(_combine(conditions))}
+    for bucket, (_, condition) in PRICE_BUCKETS.items():
+        aggregates[f'price_{bucket}'] = _count(_combine(conditions, 'price') & condition)
+
+    row = services.aggregate(**aggregates)
+    counts = {
+        'total': row['total'],
+        'category': _group_counts(services.filter(_combine(conditions, 'category')), 'category_id'),
+        'supplier': _group_counts(services.filter(_combine(conditions, 'supplier')), 'supplier_id'),
+        'price': {bucket: row[f'price_{bucket}'] for bucket in PRICE_BUCKETS},
+    }
+    cache.set(key, counts, FACETS_TIMEOUT)
+    return counts
+
+
+def build_facets(service_filter):
+    """Ghép tên lựa chọn với số đếm để render bộ lọc."""
+    options = facet_options()
+    counts = facet_counts(service_filter)
+    return {
+        'total': counts['total'],
+        'category': [
+            {'id': pk, 'name': name, 'count': counts['category'].get(pk, 0)} for pk, name in options['category']
+        ],
+        'supplier': [
+            {'id': pk, 'name': name, 'count': counts['supplier'].get(pk, 0)} for pk, name in options['supplier']
+        ],
+        'price': [
+            {'id': bucket, 'name': label, 'count': counts['price'][bucket]}
+            for bucket, (label, _) in PRICE_BUCKETS.items()
+        ],
+    }
@@ -1,16 +1,9 @@
 from django import forms
 from django.forms import inlineformset_factory 
-from .models import Service, ServiceDetail, ServiceImage, Category, Supplier
+from .models import Service, ServiceDetail, ServiceImage, Category, Supplier, DURATION_CHOICES
 from users.models import User
 from django.utils.translation import gettext_lazy as _
 
-DURATION_CHOICES = [
-    (30, _('1 Tháng')),
-    (90, _('3 Tháng')),
-    (180, _('6 Tháng')),
-    (365, _('1 Năm')),
-]
-
 class AssignServiceForm(forms.Form):
     child_user = forms.ModelChoiceField(queryset=User.objects.none(), label="Chọn user con để gán dịch vụ")
     duration_choice = forms.ChoiceField(label="Chọn thời hạn gói", choices=DURATION_CHOICES, required=True)
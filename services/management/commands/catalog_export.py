@@ -0,0 +1,54 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services.catalog_io import COLUMNS, detect_format, open_output, serialize_service
+from services.models import Service
+
+
+class Command(BaseCommand):
+    help = 'Xuất toàn bộ catalog dịch vụ ra CSV/JSONL (ghi dạng stream, theo từng lô).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Đường dẫn file, hoặc "-" để ghi ra stdout.')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Mặc định: đoán theo đuôi file.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options['path'], options['format'])
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size phải lớn hơn 0.')
+
+        # iterator(chunk_size) + prefetch_related: mỗi lô tốn 3 truy vấn, bộ nhớ không phụ thuộc số dịch vụ.
+        queryset = (
+            Service.objects.select_related('category', 'supplier')
+            .prefetch_related('details', 'images')
+            .order_by('pk')
+        )
+        count = 0
+        started = time.monotonic()
+        fh = open_output(options['path'])
+        try:
+            writer = csv.DictWriter(fh, fieldnames=COLUMNS) if fmt == 'csv' else None
+            if writer:
+                writer.writeheader()
+            for service in queryset.iterator(chunk_size=batch_size):
+                row = serialize_service(service, fmt)
+                if writer:
+                    writer.writerow(row)
+                else:
+                    fh.write(json.dumps(row, ensure_ascii=False) + '\n')
+                count += 1
+        finally:
+            if options['path'] != '-':
+                fh.close()
+
+        elapsed = time.monotonic() - started
+        # Khi ghi ra stdout thì báo cáo qua stderr để không lẫn vào dữ liệu.
+        report = self.stderr if options['path'] == '-' else self.stdout
+        report.write(self.style.SUCCESS(
+            f'Đã xuất {count} dịch vụ trong {elapsed:.2f}s ({count / elapsed if elapsed else count:.0f} dòng/giây).'
+        ))
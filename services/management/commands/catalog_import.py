@@ -0,0 +1,277 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from mediastore.derivatives import SOURCES_BY_MODEL
+from mediastore.storage import retain, release
+from mediastore.tasks import enqueue
+from search.backends import get_backend
+from search.documents import ServiceDocument
+from search.suggest import bump_suggest_version
+from services.cache import invalidate_service_detail, bump_catalog_version
+from services.catalog_io import detect_format, fetch, open_input, parse_row, read_rows, RowError
+from services.models import Service, ServiceDetail, ServiceImage, Category, Supplier
+from storefront.prerender import queue_paths, service_detail_path, service_list_path
+
+SERVICE_FIELDS = ['name', 'description', 'category', 'supplier', 'price', 'is_price_on_contact', 'updated_at']
+
+
+class Command(BaseCommand):
+    help = (
+        'Nhập hàng loạt dịch vụ từ file CSV/JSONL (đọc dạng stream). '
+        'Tạo mới hoặc cập nhật Service, ServiceDetail, ServiceImage, Category, Supplier '
+        'bằng bulk_create/bulk_update theo từng lô trong transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Đường dẫn file, hoặc "-" để đọc từ stdin.')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Mặc định: đoán theo đuôi file.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=8, help='Số luồng tải/copy ảnh song song.')
+        parser.add_argument('--media-dir', default=settings.MEDIA_ROOT,
+                            help='Thư mục gốc cho đường dẫn ảnh tương đối (mặc định: MEDIA_ROOT).')
+        parser.add_argument('--skip-derivatives', action='store_true',
+                            help='Không tạo ảnh phái sinh ngay (chạy build_image_derivatives sau).')
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options['path'], options['format'])
+        self.batch_size = options['batch_size']
+        self.media_dir = options['media_dir']
+        self.skip_derivatives = options['skip_derivatives']
+        self.verbosity = options['verbosity']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size phải lớn hơn 0.')
+        self.backend = get_backend()
+        self.stored_images = {}
+
+        # Bảng tra cứu trong bộ nhớ: tránh một truy vấn cho mỗi dòng.
+        self.categories = {c.name.lower(): c for c in Category.objects.all()}
+        self.suppliers = {s.name.lower(): s for s in Supplier.objects.all()}
+        self.existing = {
+            (name, supplier_id): pk
+            for pk, name, supplier_id in Service.objects.values_list('pk', 'name', 'supplier_id').iterator()
+        }
+        self.existing_ids = set(self.existing.values())
+
+        self.created = self.updated = self.failed = 0
+        started = time.monotonic()
+        batch = []
+        with open_input(options['path']) as fh, ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            self.pool = pool
+            for line_no, raw in enumerate(read_rows(fh, fmt), start=1):
+                try:
+                    batch.append(parse_row(raw))
+                except (RowError, ValueError) as e:
+                    self.failed += 1
+                    self.stderr.write(f'Dòng {line_no}: {e}')
+                    continue
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, started)
+                    batch = []
+            if batch:
+                self._flush(batch, started)
+
+        elapsed = time.monotonic() - started
+        total = self.created + self.updated
+        self.stdout.write(self.style.SUCCESS(
+            f'Hoàn tất: {self.created} tạo mới, {self.updated} cập nhật, {self.failed} lỗi '
+            f'trong {elapsed:.2f}s ({total / elapsed if elapsed else total:.0f} dòng/giây).'
+        ))
+
+    # --- TỪNG LÔ ---
+
+    def _flush(self, rows, started):
+        # Số nhãn (tên dịch vụ / category / NCC) trước lô: chỉ mục gợi ý chỉ dựng lại khi có nhãn mới.
+        labels = self.created + len(self.categories) + len(self.suppliers)
+        rows = self._resolve_groups(rows)
+        images = self._fetch_images(rows)
+
+        with transaction.atomic():
+            pairs = self._save_services(rows, images)
+            self._replace_details(pairs)
+            self._replace_images(pairs, images)
+            # bulk_* không phát signal: tự cập nhật chỉ mục tìm kiếm.
+            self.backend.index(ServiceDocument, [service for service, _ in pairs])
+
+        invalidate_service_detail(*[service.pk for service, _ in pairs])
+        bump_catalog_version()
+        if self.created + len(self.categories) + len(self.suppliers) > labels:
+            bump_suggest_version()
+        queue_paths(self._affected_pages(pairs))
+        if self.verbosity >= 1:
+            elapsed = time.monotonic() - started
+            done = self.created + self.updated
+            self.stdout.write(f'  {done} dòng ({done / elapsed if elapsed else done:.0f} dòng/giây)')
+
+    def _affected_pages(self, pairs):
+        """Trang tĩnh cần render lại (storefront): chi tiết và danh sách chứa các dịch vụ vừa ghi."""
+        yield service_list_path()
+        slugs = {service.category.slug for service, _ in pairs if service.category}
+        for slug in slugs:
+            yield service_list_path(slug)
+        for service, _ in pairs:
+            yield service_detail_path(service.pk)
+
+    def _resolve_groups(self, rows):
+        """
+        Tạo (bulk) các Category/Supplier chưa có, rồi đưa vào bảng tra cứu.
+        Trả về các dòng dùng được: dòng có category mới trùng slug với category
+        khác bị báo lỗi và bỏ qua (tính vào số lỗi).
+        """
+        new_categories = {}
+        new_suppliers = {}
+        for row in rows:
+            if row['category'] and row['category'].lower() not in self.categories:
+                new_categories.setdefault(row['category'].lower(), row['category'])
+            if row['supplier'] and row['supplier'].lower() not in self.suppliers:
+                new_suppliers.setdefault(row['supplier'].lower(), row['supplier'])
+        rejected = set()
+        if new_categories:
+            rejected = self._slug_collisions(new_categories)
+            # bulk_create bỏ qua Category.save() nên phải tự tạo slug.
+            Category.objects.bulk_create(
+                [Category(name=name, slug=slugify(name)) for key, name in new_categories.items() if key not in rejected],
+                ignore_conflicts=True,
+            )
+            for category in Category.objects.filter(name__in=new_categories.values()):
+                self.categories[category.name.lower()] = category
+        if new_suppliers:
+            Supplier.objects.bulk_create(
+                [Supplier(name=name) for name in new_suppliers.values()], ignore_conflicts=True
+            )
+            for supplier in Supplier.objects.filter(name__in=new_suppliers.values()):
+                self.suppliers[supplier.name.lower()] = supplier
+
+        accepted = [row for row in rows if not row['category'] or row['category'].lower() not in rejected]
+        self.failed += len(rows) - len(accepted)
+        return accepted
+
+    def _slug_collisions(self, new_categories):
+        """
+        Tên category mới (chữ thường) có slug rỗng, trùng slug của category đã
+        có, hoặc trùng slug của một tên mới khác trong lô (tên đầu tiên được giữ).
+        """
+        by_slug = {}
+        for key, name in new_categories.items():
+            by_slug.setdefault(slugify(name), []).append(key)
+        taken = dict(Category.objects.filter(slug__in=[slug for slug in by_slug if slug]).values_list('slug', 'name'))
+        rejected = set()
+        for slug, keys in by_slug.items():
+            if not slug:
+                clashes, reason = keys, 'không tạo được slug'
+            elif slug in taken:
+                clashes, reason = keys, f'slug "{slug}" đã thuộc category "{taken[slug]}"'
+            else:
+                clashes, reason = keys[1:], f'slug "{slug}" trùng với category "{new_categories[keys[0]]}"'
+            for key in clashes:
+                rejected.add(key)
+                self.stderr.write(f'Category "{new_categories[key]}": {reason}; bỏ qua các dòng của category này.')
+        return rejected
+
+    def _fetch_images(self, rows):
+        """Tải/copy song song mọi ảnh của lô. Trả về {vị trí nguồn: tên file trong storage}."""
+        locations = {
+            loc for row in rows for loc in [row['thumbnail'], *row['images']]
+            if loc and loc not in self.stored_images
+        }
+
+        def store(location):
+            try:
+                filename, data = fetch(location, self.media_dir)
+            except OSError as e:
+                self.stderr.write(f'Không lấy được ảnh {location}: {e}')
+                return location, None
+            return location, default_storage.save(f'service_images/{filename}', ContentFile(data))
+
+        for location, name in self.pool.map(store, locations):
+            self.stored_images[location] = name
+        return self.stored_images
+
+    def _save_services(self, rows, images):
+        """Tạo mới/cập nhật Service của lô. Trả về danh sách (service, row) đã lưu."""
+        now = timezone.now()
+        # Cùng một dịch vụ xuất hiện nhiều lần trong lô: dòng sau thắng.
+        latest = {}
+        for row in rows:
+            supplier = self.suppliers.get(row['supplier'].lower()) if row['supplier'] else None
+            category = self.categories.get(row['category'].lower()) if row['category'] else None
+            pk = row['id'] if row['id'] in self.existing_ids else self.existing.get((row['name'], supplier and supplier.pk))
+            service = Service(
+                pk=pk, name=row['name'], description=row['description'], category=category,
+                supplier=supplier, price=row['price'], is_price_on_contact=row['is_price_on_contact'],
+                updated_at=now,
+            )
+            if images.get(row['thumbnail']):
+                service.thumbnail = images[row['thumbnail']]
+            latest[pk or (row['name'], supplier and supplier.pk)] = (service, row)
+        pairs = list(latest.values())
+
+        to_create = [service for service, _ in pairs if service.pk is None]
+        to_update = [service for service, _ in pairs if service.pk is not None]
+        with_thumbnail = [service for service, _ in pairs if service.thumbnail]
+        old_thumbnails = {}
+        if to_create:
+            Service.objects.bulk_create(to_create, batch_size=self.batch_size)
+            for service in to_create:
+                self.existing[(service.name, service.supplier_id)] = service.pk
+                self.existing_ids.add(service.pk)
+        if to_update:
+            old_thumbnails = dict(
+                Service.objects.filter(pk__in=[s.pk for s in to_update if s.thumbnail]).values_list('pk', 'thumbnail')
+            )
+            # Dòng không có thumbnail thì giữ nguyên ảnh cũ.
+            Service.objects.bulk_update([s for s in to_update if not s.thumbnail], SERVICE_FIELDS, batch_size=self.batch_size)
+            Service.objects.bulk_update([s for s in to_update if s.thumbnail], SERVICE_FIELDS + ['thumbnail'], batch_size=self.batch_size)
+
+        # Tự cập nhật bộ đếm tham chiếu file và lên lịch tạo ảnh phái sinh.
+        for service in with_thumbnail:
+            old = old_thumbnails.get(service.pk)
+            if old == service.thumbnail.name:
+                continue
+            retain(service.thumbnail.name)
+            if old:
+                release(old, default_storage)
+            if not self.skip_derivatives:
+                enqueue(SOURCES_BY_MODEL[Service], service.pk)
+
+        self.created += len(to_create)
+        self.updated += len(to_update)
+        return pairs
+
+    def _replace_details(self, pairs):
+        targets = [(service, row) for service, row in pairs if row['details']]
+        if not targets:
+            return
+        ServiceDetail.objects.filter(service__in=[service for service, _ in targets]).delete()
+        ServiceDetail.objects.bulk_create(
+            [
+                ServiceDetail(service=service, title=title, content=content)
+                for service, row in targets for title, content in row['details']
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def _replace_images(self, pairs, images):
+        targets = [(service, row) for service, row in pairs if row['images']]
+        if not targets:
+            return
+        # delete() trên queryset vẫn phát post_delete từng object, nên ảnh cũ được release đúng.
+        ServiceImage.objects.filter(service__in=[service for service, _ in targets]).delete()
+        created = ServiceImage.objects.bulk_create(
+            [
+                ServiceImage(service=service, image=images[location])
+                for service, row in targets for location in row['images'] if images.get(location)
+            ],
+            batch_size=self.batch_size,
+        )
+        for image in created:
+            retain(image.image.name)
+            if not self.skip_derivatives:
+                enqueue(SOURCES_BY_MODEL[ServiceImage], image.pk)
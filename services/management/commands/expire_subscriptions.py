@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services.subscriptions import DEFAULT_BATCH_SIZE, expire_lapsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Vô hiệu hóa các dịch vụ đã hết hạn (is_active=False) và đánh dấu dịch vụ sắp hết hạn, theo từng lô. '
+        'Chạy song song trên nhiều máy vẫn an toàn.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--watch', type=float, metavar='SECONDS',
+                            help='Chạy liên tục, quét lại sau mỗi SECONDS giây.')
+
+    def handle(self, *args, **options):
+        while True:
+            result = expire_lapsed(options['batch_size'])
+            if result.expired or result.expiring or not options['watch']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Đã vô hiệu hóa {result.expired} dịch vụ hết hạn, '
+                    f'đánh dấu {result.expiring} dịch vụ sắp hết hạn trong {result.batches} lô, '
+                    f'{result.duration * 1000:.0f} ms (~{result.rows_per_second:.0f} dòng/giây).'
+                ))
+            if not options['watch']:
+                return
+            time.sleep(options['watch'])
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-18 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0015_usersubscription_duration_days_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['-created_at', '-id'], name='service_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='service_cat_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0016_service_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='thumbnail_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Thumbnail Variants'),
+        ),
+        migrations.AddField(
+            model_name='serviceimage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Image Variants'),
+        ),
+        migrations.AddField(
+            model_name='supplier',
+            name='logo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Logo Variants'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.25 on 2026-10-18 07:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0017_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServicePrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('duration_days', models.PositiveIntegerField(choices=[(30, '1 Tháng'), (90, '3 Tháng'), (180, '6 Tháng'), (365, '1 Năm')], verbose_name='Duration (days)')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Price')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prices', to='services.service', verbose_name='Service')),
+            ],
+            options={
+                'verbose_name': 'Service Price',
+                'verbose_name_plural': 'Service Prices',
+                'ordering': ['duration_days'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='serviceprice',
+            constraint=models.UniqueConstraint(fields=('service', 'duration_days'), name='serviceprice_service_duration_uniq'),
+        ),
+    ]
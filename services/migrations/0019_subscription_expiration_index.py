@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0018_service_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersubscription',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['expiration_date'], name='sub_active_expiration_idx'),
+        ),
+    ]
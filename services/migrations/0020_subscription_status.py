@@ -0,0 +1,47 @@
+# Generated by Django 4.2.25 on 2026-10-18 07:08
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def populate_status(apps, schema_editor):
+    # Cùng quy tắc (và cùng thứ tự ưu tiên) với UserSubscription.compute_status():
+    # mỗi trạng thái một câu UPDATE trên phần còn lại.
+    UserSubscription = apps.get_model('services', 'UserSubscription')
+    now = timezone.now()
+    lapsed = Q(expiration_date__lte=now)
+    inactive = UserSubscription.objects.filter(is_active=False)
+    inactive.filter(lapsed).update(status='expired')
+    inactive.exclude(lapsed).update(status='disabled')
+    UserSubscription.objects.filter(is_active=True, is_verified=False).update(status='pending')
+    current = UserSubscription.objects.filter(is_active=True, is_verified=True)
+    current.filter(lapsed).update(status='expired')
+    current.filter(expiration_date__gt=now, expiration_date__lte=now + timedelta(days=7)).update(status='expiring')
+    current.filter(Q(expiration_date__isnull=True) | Q(expiration_date__gt=now + timedelta(days=7))).update(status='active')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0019_subscription_expiration_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersubscription',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending verification'), ('active', 'Active'), ('expiring', 'Expiring soon'), ('expired', 'Expired'), ('disabled', 'Disabled')], default='pending', editable=False, max_length=10, verbose_name='Status'),
+        ),
+        migrations.AddIndex(
+            model_name='usersubscription',
+            index=models.Index(fields=['user', 'status', 'expiration_date'], name='sub_user_status_exp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersubscription',
+            index=models.Index(fields=['purchased_by', 'status'], name='sub_purchaser_status_idx'),
+        ),
+        migrations.RunPython(populate_status, migrations.RunPython.noop),
+    ]
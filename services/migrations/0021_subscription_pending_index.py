@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0020_subscription_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersubscription',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['id'], name='sub_pending_idx'),
+        ),
+    ]
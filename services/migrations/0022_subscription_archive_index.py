@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0021_subscription_pending_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersubscription',
+            index=models.Index(fields=['status', 'expiration_date'], name='sub_status_expiration_idx'),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from datetime import timedelta
 from django.utils import timezone
@@ -6,6 +6,8 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 from django.urls import reverse
 
+from outbox.events import publish, subscription_payload
+
 class Category(models.Model):
     name = models.CharField(_('Category Name'), max_length=100, unique=True)
     slug = models.SlugField(_('Slug'), max_length=110, unique=True, blank=True, help_text="Tự động tạo nếu để trống")
@@ -29,6 +31,7 @@ class Category(models.Model):
 class Supplier(models.Model):
     name = models.CharField(_('Supplier Name'), max_length=200, unique=True)
     logo = models.ImageField(_('Logo'), upload_to='supplier_logos/', null=True, blank=True)
+    logo_variants = models.JSONField(_('Logo Variants'), default=dict, blank=True, editable=False)
     color = models.CharField(_('Color Code'), max_length=7, default='#333333', help_text=_("Nhập mã màu Hex (ví dụ: #333333)"))
     class Meta:
         verbose_name = _('Supplier')
@@ -37,6 +40,14 @@ class Supplier(models.Model):
     def __str__(self):
         return self.name
 
+# Các thời hạn gói được bán (số ngày)
+DURATION_CHOICES = [
+    (30, _('1 Tháng')),
+    (90, _('3 Tháng')),
+    (180, _('6 Tháng')),
+    (365, _('1 Năm')),
+]
+
 class Service(models.Model):
     name = models.CharField(_('Service Name'), max_length=255)
     description = models.TextField(_('General Description'))
@@ -49,15 +60,42 @@ class Service(models.Model):
         verbose_name=_('Supplier')
     )
     thumbnail = models.ImageField(_('Thumbnail Image'), upload_to='service_thumbnails/', null=True, blank=True)
+    thumbnail_variants = models.JSONField(_('Thumbnail Variants'), default=dict, blank=True, editable=False)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='services', verbose_name=_('Category'))
     price = models.DecimalField(_('Price'), max_digits=10, decimal_places=2, null=True, blank=True )
     is_price_on_contact = models.BooleanField(_('Is Price on Contact'), default=False, help_text="Đánh dấu nếu giá cần liên hệ.")
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, limit_choices_to={'is_staff': True})
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        # Khóa sắp xếp ổn định cho phân trang keyset (xem services/pagination.py)
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='service_created_id_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], name='service_cat_created_id_idx'),
+        ]
     def __str__(self):
         return self.name
 
+class ServicePrice(models.Model):
+    """
+    Giá của dịch vụ cho một thời hạn gói. Thời hạn không có dòng nào thì dùng
+    Service.price. Được tra cứu qua bảng giá có cache (services/pricing.py).
+    """
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='prices', verbose_name=_('Service'))
+    duration_days = models.PositiveIntegerField(_("Duration (days)"), choices=DURATION_CHOICES)
+    price = models.DecimalField(_('Price'), max_digits=10, decimal_places=2)
+
+    class Meta:
+        verbose_name = _('Service Price')
+        verbose_name_plural = _('Service Prices')
+        ordering = ['duration_days']
+        constraints = [
+            models.UniqueConstraint(fields=['service', 'duration_days'], name='serviceprice_service_duration_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.service_id} / {self.duration_days} ngày: {self.price}"
+
 class ServiceDetail(models.Model):
     service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name="details", verbose_name=_('Service'))
     title = models.CharField(_('Detail Title'), max_length=255)
@@ -68,6 +106,7 @@ class ServiceDetail(models.Model):
 class ServiceImage(models.Model):
     service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name="images")
     image = models.ImageField(_('Image'), upload_to='service_images/')
+    image_variants = models.JSONField(_('Image Variants'), default=dict, blank=True, editable=False)
     caption = models.CharField(_('Caption (optional)'), max_length=255, blank=True)
     class Meta:
         verbose_name = _('Service Image')
@@ -104,6 +143,38 @@ class UserSubscription(models.Model):
         help_text="Đã được admin xác nhận thanh toán/kích hoạt"
     )
 
+    # --- TRẠNG THÁI LƯU SẴN (cho dashboard) ---
+    # Tính từ is_verified / is_active / expiration_date trong save(); chuyển
+    # active -> expiring -> expired theo thời gian do `manage.py expire_subscriptions`.
+    STATUS_CHOICES = (
+        ('pending', _('Pending verification')),
+        ('active', _('Active')),
+        ('expiring', _('Expiring soon')),
+        ('expired', _('Expired')),
+        ('disabled', _('Disabled')),
+    )
+    CURRENT_STATUSES = ('pending', 'active', 'expiring')
+    ENDED_STATUSES = ('expired', 'disabled')
+    EXPIRING_WINDOW = timedelta(days=7)
+
+    status = models.CharField(_('Status'), max_length=10, choices=STATUS_CHOICES, default='pending', editable=False)
+
+    class Meta:
+        indexes = [
+            # Cho `manage.py expire_subscriptions`: chỉ các dòng còn active, theo ngày hết hạn
+            models.Index(
+                fields=['expiration_date'], name='sub_active_expiration_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # Mỗi mục trên dashboard là một lần quét theo khoảng trên index
+            models.Index(fields=['user', 'status', 'expiration_date'], name='sub_user_status_exp_idx'),
+            models.Index(fields=['purchased_by', 'status'], name='sub_purchaser_status_idx'),
+            # Trang "Xác minh dịch vụ" (hàng đợi chờ xác minh, theo id)
+            models.Index(fields=['id'], name='sub_pending_idx', condition=models.Q(status='pending')),
+            # Cho `manage.py archive_history`: dịch vụ đã kết thúc, theo ngày hết hạn
+            models.Index(fields=['status', 'expiration_date'], name='sub_status_expiration_idx'),
+        ]
+
     # --- LOGIC MỚI ĐỂ THEO DÕI TRẠNG THÁI CŨ CỦA is_verified ---
     _original_is_verified = None
 
@@ -115,7 +186,8 @@ class UserSubscription(models.Model):
     # --- LOGIC MỚI: TỰ ĐỘNG ĐẶT NGÀY KHI ADMIN XÁC MINH ---
     def save(self, *args, **kwargs):
         # Kiểm tra xem 'is_verified' CÓ thay đổi VÀ thay đổi từ False -> True
-        if self.is_verified and not self._original_is_verified:
+        just_verified = self.is_verified and not self._original_is_verified
+        if just_verified:
             
             # Chỉ đặt ngày nếu chưa được đặt (để tránh ghi đè)
             if not self.start_date:
@@ -125,10 +197,31 @@ class UserSubscription(models.Model):
             if not self.expiration_date and self.duration_days:
                 self.expiration_date = self.start_date + timedelta(days=self.duration_days)
 
-        super().save(*args, **kwargs)
+        self.status = self.compute_status()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'status'}
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if just_verified:
+                # Ghi sự kiện cùng transaction (thông báo kích hoạt do worker outbox gửi)
+                publish('subscription.verified', subscription_payload(self))
         # Cập nhật lại trạng thái 'original' sau khi lưu
         self._original_is_verified = self.is_verified
 
+    def compute_status(self, now=None):
+        now = now or timezone.now()
+        lapsed = self.expiration_date is not None and self.expiration_date <= now
+        if not self.is_active:
+            return 'expired' if lapsed else 'disabled'
+        if not self.is_verified:
+            return 'pending'
+        if lapsed:
+            return 'expired'
+        if self.expiration_date is not None and self.expiration_date <= now + self.EXPIRING_WINDOW:
+            return 'expiring'
+        return 'active'
+
     def __str__(self):
         return f"{self.user} - {self.service.name}"
 
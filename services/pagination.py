@@ -0,0 +1,111 @@
+"""
+Phân trang theo con trỏ (keyset pagination).
+
+Thay vì dùng OFFSET/COUNT(*) như Paginator của Django, mỗi trang được lấy
+bằng điều kiện "sau bản ghi cuối cùng của trang trước" trên một khóa sắp xếp
+ổn định (ví dụ: created_at, id). Nhờ có index trên khóa này, trang thứ N tốn
+chi phí như trang đầu tiên, bất kể catalog lớn đến đâu.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Con trỏ gửi lên không hợp lệ (bị sửa, hoặc không khớp khóa sắp xếp)."""
+
+
+class KeysetPage:
+    """Một trang kết quả: danh sách bản ghi và con trỏ tới trang kế tiếp."""
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    padded = token + '=' * (-len(token) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+    if not isinstance(values, list):
+        raise InvalidCursor('Cursor must encode a list.')
+    return values
+
+
+def _serialize(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if value is None or isinstance(value, (int, str)):
+        return value
+    return str(value)
+
+
+def cursor_for(obj, keys):
+    """Con trỏ tới trang ngay sau bản ghi `obj` (theo khóa `keys`)."""
+    return encode_cursor([_serialize(getattr(obj, key)) for key in keys])
+
+
+def _after(model, keys, values, descending):
+    """
+    Dựng điều kiện (k1, k2, ...) > (v1, v2, ...) dạng OR lồng nhau,
+    ví dụ: k1 > v1 OR (k1 = v1 AND k2 > v2).
+    """
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for i, key in enumerate(keys):
+        field = model._meta.get_field(key)
+        term = Q(**{f'{key}__{lookup}': field.to_python(values[i])})
+        for prev_key, prev_value in zip(keys[:i], values[:i]):
+            prev_field = model._meta.get_field(prev_key)
+            term &= Q(**{prev_key: prev_field.to_python(prev_value)})
+        condition |= term
+    return condition
+
+
+def keyset_paginate(queryset, cursor=None, per_page=12, keys=('created_at', 'id'), descending=True):
+    """
+    Lấy một trang của `queryset` theo khóa `keys`.
+
+    Khóa cuối cùng phải là duy nhất (thường là 'id') để thứ tự ổn định.
+    Chỉ chạy một câu truy vấn LIMIT per_page + 1, không có OFFSET hay COUNT.
+    """
+    keys = list(keys)
+    prefix = '-' if descending else ''
+    queryset = queryset.order_by(*[prefix + key for key in keys])
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(keys):
+            raise InvalidCursor('Cursor does not match the ordering keys.')
+        try:
+            queryset = queryset.filter(_after(queryset.model, keys, values, descending))
+        except (ValidationError, TypeError, ValueError) as e:
+            # ValueError: ví dụ giá trị null ("Cannot use None as a query value")
+            raise InvalidCursor(str(e))
+
+    items = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = cursor_for(items[-1], keys)
+    return KeysetPage(items, next_cursor)
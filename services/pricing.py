@@ -0,0 +1,74 @@
+"""
+Bảng giá (dịch vụ, thời hạn) -> giá, tính sẵn một lần cho mỗi phiên bản catalog.
+
+    price_for(service_id, duration_days)  -> Decimal, hoặc None nếu "Liên hệ"
+
+Thứ tự ưu tiên: dịch vụ "Liên hệ" -> None; có ServicePrice cho thời hạn đó ->
+giá đó; không thì Service.price (None nếu trống). Bảng giá nằm trong cache
+dùng chung (key theo phiên bản catalog, nên đổi giá/dịch vụ là tự hết hiệu
+lực) và được giữ lại trong bộ nhớ tiến trình cho tới khi phiên bản đổi: tra
+giá cho mỗi dòng giỏ hàng / hóa đơn nháp là O(1), không thêm truy vấn nào.
+"""
+from django.core.cache import cache
+
+from .cache import catalog_version
+from .models import DURATION_CHOICES, Service, ServicePrice
+
+PRICE_MATRIX_TIMEOUT = 60 * 60 * 24
+
+# Bản sao trong tiến trình: (phiên bản catalog, bảng giá). Một tuple được gán
+# nguyên khối, để thread khác không đọc phải phiên bản mới đi với bảng giá cũ.
+_local = (None, None)
+
+
+def price_matrix_key(version):
+    return f'services:prices:{version}'
+
+
+def build_price_matrix():
+    """{'base': {service_id: giá | None}, 'tiers': {(service_id, số ngày): giá}}."""
+    base = {}
+    for pk, price, on_contact in Service.objects.values_list('pk', 'price', 'is_price_on_contact').iterator():
+        # Dịch vụ "Liên hệ" không có trong 'base': price_for() trả về None kể cả khi có bậc giá.
+        if not on_contact:
+            base[pk] = price
+    tiers = {
+        (service_id, days): price
+        for service_id, days, price in ServicePrice.objects.filter(service_id__in=base)
+        .values_list('service_id', 'duration_days', 'price').iterator()
+    }
+    return {'base': base, 'tiers': tiers}
+
+
+def price_matrix():
+    global _local
+    version = catalog_version()
+    local_version, local_matrix = _local
+    if local_version == version:
+        return local_matrix
+    key = price_matrix_key(version)
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = build_price_matrix()
+        cache.set(key, matrix, PRICE_MATRIX_TIMEOUT)
+    _local = (version, matrix)
+    return matrix
+
+
+def price_for(service_id, duration_days, matrix=None):
+    matrix = matrix or price_matrix()
+    if service_id not in matrix['base']:
+        return None
+    price = matrix['tiers'].get((service_id, int(duration_days)))
+    return price if price is not None else matrix['base'][service_id]
+
+
+def duration_prices(service_id, matrix=None):
+    """
+    [(nhãn thời hạn, giá)] cho trang chi tiết dịch vụ; rỗng nếu dịch vụ không có
+    bậc giá riêng (mọi thời hạn cùng Service.price) hoặc là dịch vụ "Liên hệ".
+    """
+    matrix = matrix or price_matrix()
+    if not any((service_id, days) in matrix['tiers'] for days, _ in DURATION_CHOICES):
+        return []
+    return [(label, price_for(service_id, days, matrix)) for days, label in DURATION_CHOICES]
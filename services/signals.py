@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_service_detail, bump_catalog_version
+from .entitlements import invalidate_entitlements
+from .models import Service, ServiceImage, ServiceDetail, ServicePrice, Category, Supplier, UserSubscription
+
+
+# --- XÓA CACHE TRANG CHI TIẾT DỊCH VỤ ---
+# Xóa sau khi commit: xóa trước thì một GET xen giữa có thể nạp lại dữ liệu
+# chưa commit (cũ) vào cache và giữ nó tới hết TTL.
+
+def _evict(*pks):
+    if pks:
+        transaction.on_commit(lambda: invalidate_service_detail(*pks))
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def evict_service(sender, instance, **kwargs):
+    _evict(instance.pk)
+
+
+@receiver(post_save, sender=ServiceImage)
+@receiver(post_delete, sender=ServiceImage)
+@receiver(post_save, sender=ServiceDetail)
+@receiver(post_delete, sender=ServiceDetail)
+@receiver(post_save, sender=ServicePrice)
+@receiver(post_delete, sender=ServicePrice)
+def evict_service_child(sender, instance, **kwargs):
+    _evict(instance.service_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Supplier)
+def evict_services_of_group(sender, instance, **kwargs):
+    # Tên Category/Supplier hiển thị trên trang chi tiết của mọi dịch vụ liên quan
+    _evict(*instance.services.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Supplier)
+def remember_services_of_group(sender, instance, **kwargs):
+    # Sau khi xóa, FK của Service đã bị SET_NULL nên phải lấy danh sách trước
+    instance._affected_service_pks = list(instance.services.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Supplier)
+def evict_services_of_deleted_group(sender, instance, **kwargs):
+    _evict(*getattr(instance, '_affected_service_pks', []))
+
+
+# --- PHIÊN BẢN CATALOG (cache facet, ETag các trang public) ---
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+@receiver(post_save, sender=ServiceImage)
+@receiver(post_delete, sender=ServiceImage)
+@receiver(post_save, sender=ServiceDetail)
+@receiver(post_delete, sender=ServiceDetail)
+@receiver(post_save, sender=ServicePrice)
+@receiver(post_delete, sender=ServicePrice)
+def bump_catalog(sender, instance, **kwargs):
+    # Sau khi commit: bump trước commit thì request khác có thể đọc dữ liệu cũ
+    # và cache nó dưới phiên bản mới (ví dụ bảng giá, services/pricing.py).
+    transaction.on_commit(bump_catalog_version)
+
+
+# --- QUYỀN SỬ DỤNG DỊCH VỤ (services/entitlements.py) ---
+# UPDATE hàng loạt không phát signal: các chỗ đó gọi invalidate_entitlements() trực tiếp.
+
+@receiver(post_save, sender=UserSubscription)
+@receiver(post_delete, sender=UserSubscription)
+def evict_entitlements(sender, instance, **kwargs):
+    invalidate_entitlements(instance.user_id)
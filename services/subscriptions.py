@@ -0,0 +1,235 @@
+"""
+Vô hiệu hóa (is_active=False, status='expired') các UserSubscription đã hết hạn
+và chuyển các dòng sắp hết hạn sang status='expiring'.
+
+Chạy bằng `manage.py expire_subscriptions` (cron, hoặc --watch để chạy liên tục).
+Mỗi lô là một transaction ngắn với một câu UPDATE duy nhất: chọn tối đa
+`batch_size` dòng còn active có expiration_date <= now (qua index
+sub_active_expiration_idx), đổi is_active và trả về (RETURNING) đúng các dòng
+nó đã đổi, nên khi nhiều node chạy cùng lúc mỗi dòng chỉ được tính và thông
+báo một lần (PostgreSQL còn dùng SKIP LOCKED để các node lấy các lô khác nhau). Mỗi dòng hết hạn sinh một sự kiện outbox
+'subscription.expired' (email thông báo do worker outbox gửi).
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.db import connection, connections, transaction
+from django.db.models import Case, CharField, DateTimeField, F, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import IsNull, LessThanOrEqual
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+
+from outbox.events import publish_many, subscription_payload
+
+from .entitlements import invalidate_entitlements
+from .models import UserSubscription
+
+DEFAULT_BATCH_SIZE = 500
+VERIFY_EVENT_BATCH_SIZE = 500
+
+logger = logging.getLogger('services.subscriptions')
+
+
+class ExpireResult:
+    def __init__(self):
+        self.expired = 0
+        self.expiring = 0
+        self.batches = 0
+        self.duration = 0.0
+
+    @property
+    def rows_per_second(self):
+        rows = self.expired + self.expiring
+        return rows / self.duration if self.duration else float(rows)
+
+    def __str__(self):
+        return (
+            f'expired={self.expired} expiring={self.expiring} batches={self.batches} '
+            f'duration={self.duration * 1000:.0f}ms (~{self.rows_per_second:.0f} dòng/giây)'
+        )
+
+
+def lapsed(now):
+    return UserSubscription.objects.filter(is_active=True, expiration_date__lte=now)
+
+
+def expire_batch(now, batch_size=DEFAULT_BATCH_SIZE):
+    """Vô hiệu hóa một lô. Trả về số dòng chính lần chạy này đã đổi (0 = hết việc)."""
+    with transaction.atomic():
+        pks = _deactivate_batch(now, batch_size)
+        if pks:
+            subscriptions = list(UserSubscription.objects.filter(pk__in=pks).select_related('user', 'service'))
+            publish_many(('subscription.expired', subscription_payload(sub)) for sub in subscriptions)
+            invalidate_entitlements(*(sub.user_id for sub in subscriptions))
+    return len(pks)
+
+
+def _deactivate_batch(now, batch_size):
+    """
+    Một câu lệnh: UPDATE ... WHERE id IN (SELECT ... LIMIT n) AND is_active
+    RETURNING id. Lấy khóa ghi ngay từ đầu (SQLite không phải nâng khóa đọc
+    lên ghi giữa chừng), và chỉ trả về các dòng chính câu lệnh này đã đổi.
+    """
+    if not connection.features.can_return_columns_from_insert:
+        pks = list(lapsed(now).order_by('expiration_date', 'pk').values_list('pk', flat=True)[:batch_size])
+        lapsed(now).filter(pk__in=pks).update(is_active=False, status='expired')
+        return pks
+    meta = UserSubscription._meta
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    column = lambda name: qn(meta.get_field(name).column)  # noqa: E731
+    skip_locked = ' FOR UPDATE SKIP LOCKED' if connection.features.has_select_for_update_skip_locked else ''
+    sql = (
+        f"UPDATE {table} SET {column('is_active')} = %s, {column('status')} = %s "
+        f"WHERE {column('id')} IN ("
+        # Điều kiện viết giống hệt điều kiện của partial index để CSDL dùng được index
+        f"SELECT {column('id')} FROM {table} "
+        f"WHERE {column('is_active')} AND {column('expiration_date')} <= %s "
+        f"ORDER BY {column('expiration_date')} LIMIT %s{skip_locked}"
+        f") AND {column('is_active')} "
+        f"RETURNING {column('id')}"
+    )
+    params = [False, 'expired', connection.ops.adapt_datetimefield_value(now), batch_size]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def mark_expiring_batch(now, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Chuyển một lô 'active' sắp hết hạn (trong EXPIRING_WINDOW) sang 'expiring'.
+    Một câu UPDATE ... WHERE id IN (SELECT ... LIMIT n); dùng cùng partial index.
+    """
+    threshold = now + UserSubscription.EXPIRING_WINDOW
+    candidates = (
+        UserSubscription.objects.filter(is_active=True, expiration_date__lte=threshold, status='active')
+        .order_by('expiration_date').values('pk')[:batch_size]
+    )
+    return UserSubscription.objects.filter(pk__in=candidates, status='active').update(status='expiring')
+
+
+def expire_lapsed(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """
+    Vô hiệu hóa mọi dòng đã hết hạn tại `now`, rồi đánh dấu 'expiring' các dòng
+    sắp hết hạn, theo từng lô. Trả về ExpireResult.
+    """
+    now = now or timezone.now()
+    result = ExpireResult()
+    started = time.perf_counter()
+    while True:
+        expired = expire_batch(now, batch_size)
+        if not expired:
+            break
+        result.expired += expired
+        result.batches += 1
+    while True:
+        expiring = mark_expiring_batch(now, batch_size)
+        if not expiring:
+            break
+        result.expiring += expiring
+        result.batches += 1
+    result.duration = time.perf_counter() - started
+    if result.expired or result.expiring:
+        logger.info('expire_subscriptions %s', result)
+    return result
+
+
+# --- XÁC MINH HÀNG LOẠT ---
+
+def _inactive_status_expression(expiration, now):
+    """Status của dòng is_active=False theo compute_status(): 'expired' nếu đã qua hạn, không thì 'disabled'."""
+    return Case(
+        When(LessThanOrEqual(expiration, Value(now)), then=Value('expired')),
+        default=Value('disabled'),
+        output_field=CharField(),
+    )
+
+
+def _status_expression(expiration, now):
+    """Cùng quy tắc với UserSubscription.compute_status(), tính trong SQL."""
+    lapsed = LessThanOrEqual(expiration, Value(now))
+    return Case(
+        When(is_active=False, then=_inactive_status_expression(expiration, now)),
+        When(IsNull(expiration, True), then=Value('active')),
+        When(lapsed, then=Value('expired')),
+        When(LessThanOrEqual(expiration, Value(now + UserSubscription.EXPIRING_WINDOW)), then=Value('expiring')),
+        default=Value('active'),
+        output_field=CharField(),
+    )
+
+
+def _update_returning_pks(queryset, **values):
+    """queryset.update(**values) trong một câu UPDATE ... RETURNING id; trả về id các dòng đã đổi."""
+    connection = connections[queryset.db]
+    if not connection.features.can_return_columns_from_insert:
+        pks = list(queryset.values_list('pk', flat=True))
+        queryset.model.objects.filter(pk__in=pks).update(**values)
+        return pks
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    sql, params = query.get_compiler(queryset.db).as_sql()
+    pk_column = connection.ops.quote_name(queryset.model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(f'{sql} RETURNING {pk_column}', params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def verify_subscriptions(queryset):
+    """
+    Xác minh các dịch vụ chưa xác minh trong `queryset` bằng MỘT câu UPDATE,
+    cùng ngữ nghĩa với UserSubscription.save() khi is_verified chuyển False -> True:
+    start_date giữ nguyên nếu đã có, không thì = now; expiration_date giữ nguyên
+    nếu đã có, không thì = start_date + duration_days (bỏ trống nếu không có
+    duration_days); status tính lại; mỗi dòng một sự kiện 'subscription.verified'
+    (đọc lại theo lô VERIFY_EVENT_BATCH_SIZE dòng). Trả về số dòng đã xác minh.
+    """
+    now = timezone.now()
+    pending = queryset.filter(is_verified=False)
+    with transaction.atomic():
+        durations = sorted(
+            pending.exclude(duration_days=None).order_by().values_list('duration_days', flat=True).distinct()
+        )
+        # Dòng thêm vào sau truy vấn trên với duration_days khác thì để lần sau.
+        pending = pending.filter(Q(duration_days__isnull=True) | Q(duration_days__in=durations))
+
+        # SET dùng giá trị CŨ của start_date, nên expiration tính từ cùng mốc bắt đầu.
+        start = Coalesce(F('start_date'), Value(now), output_field=DateTimeField())
+        # Cộng ngày theo từng giá trị duration_days có trong lô (chạy được trên SQLite lẫn PostgreSQL).
+        computed = Case(
+            *[When(duration_days=days, then=start + Value(timedelta(days=days))) for days in durations],
+            default=Value(None),
+            output_field=DateTimeField(),
+        )
+        expiration = Coalesce(F('expiration_date'), computed, output_field=DateTimeField())
+        pks = _update_returning_pks(
+            pending,
+            is_verified=True,
+            start_date=start,
+            expiration_date=expiration,
+            status=_status_expression(expiration, now),
+        )
+        for i in range(0, len(pks), VERIFY_EVENT_BATCH_SIZE):
+            verified = list(
+                UserSubscription.objects.filter(pk__in=pks[i:i + VERIFY_EVENT_BATCH_SIZE]).select_related('user', 'service')
+            )
+            publish_many(('subscription.verified', subscription_payload(sub)) for sub in verified)
+            invalidate_entitlements(*(sub.user_id for sub in verified))
+    if pks:
+        logger.info('verify_subscriptions verified=%s', len(pks))
+    return len(pks)
+
+
+# --- TẮT HÀNG LOẠT ---
+
+def deactivate_subscriptions(queryset, now=None):
+    """
+    Tắt (is_active=False) các dòng còn active trong `queryset` bằng một câu
+    UPDATE, status tính như compute_status() cho dòng đã tắt. Người gọi tự
+    xóa cache quyền (invalidate_entitlements). Trả về số dòng đã tắt.
+    """
+    now = now or timezone.now()
+    return queryset.filter(is_active=True).update(
+        is_active=False, status=_inactive_status_expression(F('expiration_date'), now),
+    )
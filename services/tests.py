@@ -1,3 +1,142 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from outbox.models import OutboxEvent
+from users.models import User
+
+from .cart import add_items
+from .models import CartItem, Service, UserSubscription
+from .subscriptions import expire_lapsed, verify_subscriptions
+
+
+class ServiceTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='member@example.com', password='pw-123456')
+        self.service = Service.objects.create(name='Bảo hiểm', description='', price=Decimal('100.00'))
+
+    def subscription(self, **fields):
+        return UserSubscription.objects.create(user=self.user, service=self.service, **fields)
+
+
+# --- GIỎ HÀNG ---
+
+class AddItemsTests(ServiceTestMixin, TestCase):
+    def test_returns_only_newly_added_items(self):
+        other = Service.objects.create(name='Tư vấn', description='', price=Decimal('50.00'))
+
+        first = add_items(self.user.pk, [(self.service.pk, 30)])
+        second = add_items(self.user.pk, [(self.service.pk, 30), (self.service.pk, 90), (other.pk, 30)])
+
+        self.assertEqual(first, {(self.service.pk, 30)})
+        self.assertEqual(second, {(self.service.pk, 90), (other.pk, 30)})
+        self.assertEqual(CartItem.objects.filter(user=self.user).count(), 3)
+
+    def test_duplicates_in_one_call_are_added_once(self):
+        created = add_items(self.user.pk, [(self.service.pk, '30'), (str(self.service.pk), 30)])
+
+        self.assertEqual(created, {(self.service.pk, 30)})
+        self.assertEqual(CartItem.objects.filter(user=self.user).count(), 1)
+
+    def test_items_of_other_users_do_not_conflict(self):
+        other_user = User.objects.create_user(email='other@example.com', password='pw-123456')
+        add_items(other_user.pk, [(self.service.pk, 30)])
+
+        self.assertEqual(add_items(self.user.pk, [(self.service.pk, 30)]), {(self.service.pk, 30)})
+
+
+# --- HẾT HẠN (manage.py expire_subscriptions) ---
+
+class ExpireLapsedTests(ServiceTestMixin, TestCase):
+    def test_deactivates_lapsed_and_marks_expiring(self):
+        now = timezone.now()
+        lapsed = self.subscription(is_verified=True, expiration_date=now + timedelta(days=30))
+        soon = self.subscription(is_verified=True, expiration_date=now + timedelta(days=30))
+        later = self.subscription(is_verified=True, expiration_date=now + timedelta(days=30))
+        # Thời gian trôi qua mà không có save(): status lưu sẵn vẫn là 'active'
+        UserSubscription.objects.filter(pk=lapsed.pk).update(expiration_date=now - timedelta(minutes=1))
+        UserSubscription.objects.filter(pk=soon.pk).update(expiration_date=now + timedelta(days=2))
+
+        result = expire_lapsed(batch_size=1, now=now)
+
+        self.assertEqual((result.expired, result.expiring), (1, 1))
+        statuses = dict(UserSubscription.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {lapsed.pk: 'expired', soon.pk: 'expiring', later.pk: 'active'})
+        self.assertFalse(UserSubscription.objects.get(pk=lapsed.pk).is_active)
+        self.assertEqual(
+            list(OutboxEvent.objects.filter(topic='subscription.expired').values_list('payload__subscription_id', flat=True)),
+            [lapsed.pk],
+        )
+
+    def test_second_run_changes_nothing(self):
+        now = timezone.now()
+        sub = self.subscription(is_verified=True, expiration_date=now + timedelta(days=30))
+        UserSubscription.objects.filter(pk=sub.pk).update(expiration_date=now - timedelta(days=1))
+        expire_lapsed(now=now)
+
+        result = expire_lapsed(now=now)
+
+        self.assertEqual((result.expired, result.expiring), (0, 0))
+        self.assertEqual(OutboxEvent.objects.filter(topic='subscription.expired').count(), 1)
+
+
+# --- XÁC MINH HÀNG LOẠT ---
+
+class VerifySubscriptionsTests(ServiceTestMixin, TestCase):
+    CASES = [
+        {'duration_days': 30},
+        {'duration_days': None},
+        {'duration_days': 3},
+        {'duration_days': 7, 'start_date': timedelta(days=-10)},
+        {'duration_days': 30, 'expiration_date': timedelta(days=-1)},
+        {'duration_days': 30, 'is_active': False},
+        {'duration_days': 90, 'start_date': timedelta(days=-85)},
+    ]
+
+    def make_cases(self, now):
+        subscriptions = []
+        for case in self.CASES:
+            fields = {key: now + value if isinstance(value, timedelta) else value for key, value in case.items()}
+            subscriptions.append(self.subscription(**fields))
+        return subscriptions
+
+    def assertSameResult(self, by_save, by_update):
+        by_save.refresh_from_db()
+        by_update.refresh_from_db()
+        fields = ('is_verified', 'is_active', 'status')
+        self.assertEqual([getattr(by_save, f) for f in fields], [getattr(by_update, f) for f in fields])
+        # now của save() và của câu UPDATE lệch nhau vài mili giây
+        for field in ('start_date', 'expiration_date'):
+            saved, updated = getattr(by_save, field), getattr(by_update, field)
+            if saved is None or updated is None:
+                self.assertEqual(saved, updated, field)
+            else:
+                self.assertAlmostEqual(saved, updated, delta=timedelta(seconds=5), msg=field)
+
+    def test_matches_save(self):
+        now = timezone.now()
+        saved = self.make_cases(now)
+        bulk = self.make_cases(now)
+        for sub in saved:
+            sub.is_verified = True
+            sub.save()
+
+        verified = verify_subscriptions(UserSubscription.objects.filter(pk__in=[sub.pk for sub in bulk]))
+
+        self.assertEqual(verified, len(self.CASES))
+        for by_save, by_update in zip(saved, bulk):
+            self.assertSameResult(by_save, by_update)
+        self.assertEqual(OutboxEvent.objects.filter(topic='subscription.verified').count(), 2 * len(self.CASES))
+
+    def test_already_verified_rows_are_skipped(self):
+        sub = self.subscription(duration_days=30)
+        verify_subscriptions(UserSubscription.objects.filter(pk=sub.pk))
+        expiration = UserSubscription.objects.get(pk=sub.pk).expiration_date
 
-# Create your tests here.
+        self.assertEqual(verify_subscriptions(UserSubscription.objects.filter(pk=sub.pk)), 0)
+        self.assertEqual(UserSubscription.objects.get(pk=sub.pk).expiration_date, expiration)
+        self.assertEqual(OutboxEvent.objects.filter(topic='subscription.verified').count(), 1)
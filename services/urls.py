@@ -7,9 +7,12 @@ urlpatterns = [
     # URLs cho User
     path('', views.service_list, name='service_list'),
     path('category/<slug:category_slug>/', views.service_list, name='service_list_by_category'),
+    path('feed/', views.service_list_feed, name='service_list_feed'),
+    path('category/<slug:category_slug>/feed/', views.service_list_feed, name='service_list_feed_by_category'),
     path('<int:pk>/', views.service_detail, name='service_detail'),
     path('<int:pk>/purchase/', views.purchase_service, name='purchase_service'),
     path('<int:pk>/assign/', views.assign_service_to_child, name='assign_service'),
+    path('entitlements/', views.entitlements_api, name='entitlements_api'),
     
     # URLs quản lý Dịch Vụ
     path('management/', views.service_management_list, name='service_management_list'),
@@ -17,6 +20,10 @@ urlpatterns = [
     path('management/edit/<int:pk>/', views.service_management_edit, name='service_management_edit'),
     path('management/delete/<int:pk>/', views.service_management_delete, name='service_management_delete'),
     
+    # URLs xác minh (kích hoạt) dịch vụ đã mua
+    path('management/verification/', views.subscription_verification_list, name='subscription_verification_list'),
+    path('management/verification/verify/', views.bulk_verify_subscriptions, name='bulk_verify_subscriptions'),
+    
     # URLs CHO AJAX CATEGORY
     path('management/category/ajax-create/', views.ajax_create_category, name='ajax_create_category'),
     path('management/category/ajax-get/<int:pk>/', views.ajax_get_category_details, name='ajax_get_category_details'),
@@ -1,12 +1,17 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse, Http404
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from django.core.paginator import Paginator
 from django.db import transaction, models
 from django.utils import timezone
 from datetime import timedelta
 from users.decorators import profile_complete_required
+from store_tis.conditional import conditional_page, catalog_versions
+from orders.idempotency import idempotent, key_for_form, succeeded
+from outbox.events import publish, subscription_payload
 
 # Import Forms
 from .forms import (
@@ -19,51 +24,99 @@ from .models import (
     Service, UserSubscription, ServiceDetail, ServiceImage, Category,
     CartItem, Supplier
 )
+from .pagination import keyset_paginate, InvalidCursor
+from .cache import get_service_detail, catalog_version, cart_changed, get_cart_summary
+from .cart import add_items
+from .pricing import duration_prices, price_for, price_matrix
+from .subscriptions import verify_subscriptions
+from .entitlements import get_entitlements
+from .facets import ServiceFilter, build_facets
 
 # --- VIEWS DÀNH CHO USER ---
 
-def service_list(request, category_slug=None):
+SERVICE_LIST_PAGE_SIZE = 12
+
+
+def _service_list_page(request, category_slug=None):
     """
-    Hiển thị danh sách dịch vụ (public), có lọc theo category.
+    Lấy một trang dịch vụ (public) theo con trỏ `?cursor=`,
+    sắp xếp mới nhất trước theo (created_at, id).
     """
-    categories = Category.objects.all()
     current_category = None
-    services = Service.objects.select_related('category') 
+    services = Service.objects.select_related('category')
     if category_slug:
         current_category = get_object_or_404(Category, slug=category_slug)
         services = services.filter(category=current_category)
-    context = { 'categories': categories, 'current_category': current_category, 'services': services }
+    page = keyset_paginate(
+        services,
+        cursor=request.GET.get('cursor'),
+        per_page=SERVICE_LIST_PAGE_SIZE,
+        keys=('created_at', 'id'),
+    )
+    return current_category, page
+
+
+@conditional_page(catalog_versions)
+def service_list(request, category_slug=None):
+    """
+    Hiển thị danh sách dịch vụ (public), có lọc theo category.
+    Chỉ render trang đầu; các trang sau được tải bằng `service_list_feed`.
+    """
+    categories = Category.objects.all()
+    try:
+        current_category, page = _service_list_page(request, category_slug)
+    except InvalidCursor:
+        return redirect(request.path)
+    context = {
+        'categories': categories,
+        'current_category': current_category,
+        'services': page.items,
+        'next_cursor': page.next_cursor,
+    }
     return render(request, 'services/service_list.html', context)
 
+
+def service_list_feed(request, category_slug=None):
+    """
+    AJAX cho cuộn vô hạn: trả về HTML các thẻ dịch vụ của trang kế tiếp
+    và con trỏ cho lần tải sau (null nếu đã hết).
+    """
+    try:
+        _, page = _service_list_page(request, category_slug)
+    except InvalidCursor:
+        return JsonResponse({'success': False, 'errors': 'Invalid cursor.'}, status=400)
+    html = render_to_string('components/service_cards.html', {'services': page.items}, request=request)
+    return JsonResponse({'success': True, 'html': html, 'next_cursor': page.next_cursor})
+
+def _service_detail_versions(request, pk):
+    # updated_at lấy từ cache trang chi tiết: kiểm tra ETag không chạm tới DB.
+    service, _ = get_service_detail(pk)
+    return [catalog_version(), int(service.updated_at.timestamp() * 1e9)]
+
+
+@conditional_page(_service_detail_versions)
 def service_detail(request, pk):
     """
     Hiển thị trang chi tiết của một dịch vụ.
+    Phần ảnh + tab lấy từ cache (services/cache.py); chỉ form giỏ hàng là render mới.
     """
-    service = get_object_or_404(Service, pk=pk)
-    
-    # --- THÊM DÒNG NÀY ---
+    service, service_main_html = get_service_detail(pk)
+
     # Khởi tạo form để user chọn thời hạn
     cart_form = PurchaseServiceForm()
 
-    # (Bạn có thể có logic khác ở đây, ví dụ: lấy images)
-    # images = service.images.all()
-
-    # --- CẬP NHẬT DÒNG NÀY ---
     context = {
         'service': service,
-        'cart_form': cart_form, # <-- Thêm 'cart_form' vào context
-        # 'images': images,
+        'service_main_html': service_main_html,
+        'cart_form': cart_form,
+        'duration_prices': duration_prices(service.pk),
     }
-    
     return render(request, 'services/service_detail.html', context)
 
 
-
-
-
-
 @login_required
 @profile_complete_required
+@idempotent('purchase_service')
 def purchase_service(request, pk):
     service = get_object_or_404(Service, pk=pk)
     if request.method == 'POST':
@@ -76,7 +129,7 @@ def purchase_service(request, pk):
             # 1. Đọc giá trị 'duration_choice' từ form
             duration_days = int(form.cleaned_data['duration_choice'])
             
-            UserSubscription.objects.create(
+            subscription = UserSubscription.objects.create(
                 user=request.user, 
                 service=service, 
                 purchased_by=request.user,
@@ -88,15 +141,18 @@ def purchase_service(request, pk):
                 #  để chờ admin xác minh)
                 is_verified=False 
             )
+            # Cùng transaction với @idempotent: email/webhook/báo cáo do worker outbox xử lý
+            publish('subscription.requested', subscription_payload(subscription))
             
             # --- KẾT THÚC PHẦN SỬA LỖI ---
             
             messages.success(request, f'Bạn đã gửi yêu cầu mua gói {duration_days} ngày dịch vụ "{service.name}". Dịch vụ sẽ được kích hoạt sau khi admin xác minh.')
-            return redirect('dashboard')
+            return succeeded(redirect('dashboard'))
     else:
         # (GET request)
         form = PurchaseServiceForm() 
-    return render(request, 'services/purchase_confirm.html', {'service': service, 'form': form})
+    context = {'service': service, 'form': form, 'idempotency_key': key_for_form(request)}
+    return render(request, 'services/purchase_confirm.html', context)
 
 
 
@@ -104,6 +160,7 @@ def purchase_service(request, pk):
 
 @login_required
 @profile_complete_required # Yêu cầu user hoàn thành hồ sơ
+@idempotent('assign_service')
 def assign_service_to_child(request, pk):
     """Xử lý việc User Cấp Cao mua/gán dịch vụ cho User Con."""
     service = get_object_or_404(Service, pk=pk)
@@ -119,7 +176,7 @@ def assign_service_to_child(request, pk):
             # start_date = timezone.now()
             # expiration_date = start_date + timedelta(days=duration_days)
             
-            UserSubscription.objects.create(
+            subscription = UserSubscription.objects.create(
                 user=child_user, 
                 service=service, 
                 purchased_by=parent_user,
@@ -127,49 +184,72 @@ def assign_service_to_child(request, pk):
                 # start_date=start_date, # <-- BỎ DÒNG NÀY
                 # expiration_date=expiration_date # <-- BỎ DÒNG NÀY
             )
+            publish('subscription.requested', subscription_payload(subscription))
             child_name = child_user.full_name or child_user.phone_number or child_user.cccd
             messages.success(request, f'Bạn đã gửi yêu cầu gán gói {duration_days} ngày dịch vụ "{service.name}" cho {child_name}. Dịch vụ sẽ được kích hoạt sau khi admin xác minh.')
-            return redirect('dashboard')
+            return succeeded(redirect('dashboard'))
     else:
         form = AssignServiceForm(parent_user=parent_user)
-    return render(request, 'services/assign_service.html', {'form': form, 'service': service})
+    context = {'form': form, 'service': service, 'idempotency_key': key_for_form(request)}
+    return render(request, 'services/assign_service.html', context)
+
+
 
+@login_required
+def entitlements_api(request):
+    """
+    JSON: các dịch vụ user đang có quyền sử dụng và hạn dùng (services/entitlements.py).
+    ?service=<id> để hỏi một dịch vụ; staff hỏi thay user khác bằng ?user=<id>.
+    """
+    user_id = request.user.pk
+    if request.GET.get('user'):
+        if not request.user.is_staff:
+            return JsonResponse({'success': False, 'errors': 'Permission denied.'}, status=403)
+        if not request.GET['user'].isdigit():
+            return JsonResponse({'success': False, 'errors': 'Invalid user.'}, status=400)
+        user_id = int(request.GET['user'])
+    entitlements = get_entitlements(user_id)
+    data = {'success': True, **entitlements.as_dict()}
+    if 'service' in request.GET:
+        if not request.GET['service'].isdigit():
+            return JsonResponse({'success': False, 'errors': 'Invalid service.'}, status=400)
+        service_id = int(request.GET['service'])
+        data['service_id'] = service_id
+        data['entitled'] = service_id in entitlements
+        data['expires_at'] = entitlements.expires_at(service_id)
+    return JsonResponse(data)
 
 
 # --- VIEWS CHO ADMIN QUẢN LÝ DỊCH VỤ (FRONTEND) ---
 
+SERVICE_MANAGEMENT_PAGE_SIZE = 25
+
+
 @staff_member_required 
 def service_management_list(request):
     """
     Trang danh sách dịch vụ cho Admin (dạng bảng), CÓ THÊM BỘ LỌC.
+    Số đếm của từng lựa chọn lọc lấy từ services/facets.py (ba truy vấn, có cache);
+    bảng được phân trang nên không render toàn bộ catalog.
     """
-    category_id = request.GET.get('category', '')
-    supplier_id = request.GET.get('supplier', '') 
-    price_filter = request.GET.get('price', '')
+    service_filter = ServiceFilter(request.GET)
+    facets = build_facets(service_filter)
 
-    all_categories = Category.objects.all().order_by('name')
-    all_suppliers = Supplier.objects.all().order_by('name') 
-    
-    services = Service.objects.select_related('category', 'supplier').order_by('name')
-    
-    if category_id:
-        services = services.filter(category__id=category_id)
-    if supplier_id: 
-        services = services.filter(supplier__id=supplier_id)
-    if price_filter == 'contact':
-        services = services.filter(is_price_on_contact=True)
-    elif price_filter == 'paid':
-        services = services.filter(price__gt=0, is_price_on_contact=False)
-    elif price_filter == 'free':
-        services = services.filter(price=0, is_price_on_contact=False)
+    services = service_filter.apply().select_related('category', 'supplier')
+    paginator = Paginator(services, SERVICE_MANAGEMENT_PAGE_SIZE)
+    # Tổng số đã có trong kết quả facet: không cần thêm một truy vấn COUNT.
+    paginator.count = facets['total']
+    page_obj = paginator.get_page(request.GET.get('page'))
 
     context = {
-        'services': services,
-        'all_categories': all_categories,
-        'all_suppliers': all_suppliers, 
-        'current_category_id': int(category_id) if category_id and category_id.isdigit() else '',
-        'current_supplier_id': int(supplier_id) if supplier_id and supplier_id.isdigit() else '',
-        'current_price_filter': price_filter,
+        'services': page_obj.object_list,
+        'page_obj': page_obj,
+        'category_facets': facets['category'],
+        'supplier_facets': facets['supplier'],
+        'price_facets': facets['price'],
+        'current_category_id': service_filter.category or '',
+        'current_supplier_id': service_filter.supplier or '',
+        'current_price_filter': service_filter.price,
     }
     return render(request, 'services/service_management_list.html', context)
 
@@ -228,6 +308,56 @@ def service_management_delete(request, pk):
         return redirect('services:service_management_list')
     return render(request, 'services/service_management_delete.html', {'service': service})
 
+
+# --- XÁC MINH DỊCH VỤ ĐÃ MUA ---
+
+SUBSCRIPTION_VERIFICATION_PAGE_SIZE = 50
+
+
+@staff_member_required
+def subscription_verification_list(request):
+    """
+    Hàng đợi dịch vụ chờ xác minh (status='pending'), cũ nhất trước,
+    phân trang keyset theo id; chọn nhiều dòng để xác minh một lần.
+    """
+    pending = UserSubscription.objects.filter(status='pending').select_related('user', 'service', 'purchased_by')
+    try:
+        page = keyset_paginate(
+            pending,
+            cursor=request.GET.get('cursor'),
+            per_page=SUBSCRIPTION_VERIFICATION_PAGE_SIZE,
+            keys=('id',),
+            descending=False,
+        )
+    except InvalidCursor:
+        return redirect('services:subscription_verification_list')
+
+    context = {
+        'subscriptions': page.items,
+        'next_cursor': page.next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+    }
+    return render(request, 'services/subscription_verification.html', context)
+
+
+@staff_member_required
+def bulk_verify_subscriptions(request):
+    """Xác minh các dịch vụ đã chọn bằng một câu UPDATE (services/subscriptions.py)."""
+    if request.method != 'POST':
+        return redirect('services:subscription_verification_list')
+    ids = [int(pk) for pk in request.POST.getlist('subscription_ids') if pk.isdigit()]
+    if not ids:
+        messages.error(request, "Vui lòng chọn ít nhất một dịch vụ.")
+        return redirect('services:subscription_verification_list')
+    verified = verify_subscriptions(UserSubscription.objects.filter(pk__in=ids))
+    skipped = len(set(ids)) - verified
+    summary = f"Đã xác minh {verified} dịch vụ."
+    if skipped:
+        summary += f" Bỏ qua {skipped} dịch vụ đã được xác minh trước đó."
+    (messages.success if verified else messages.warning)(request, summary)
+    return redirect('services:subscription_verification_list')
+
+
 # --- AJAX VIEWS (CATEGORY) ---
 @staff_member_required
 def ajax_create_category(request):
@@ -410,11 +540,8 @@ def add_to_cart(request, service_id): # <-- SỬA Ở ĐÂY (đổi 'pk' thành
         if form.is_valid():
             duration_days = int(form.cleaned_data['duration_choice'])
             
-            cart_item, created = CartItem.objects.get_or_create(
-                user=request.user,
-                service=service,
-                duration_days=duration_days 
-            )
+            # Một câu INSERT ... ON CONFLICT DO NOTHING (services/cart.py), không lỗi khi bấm trùng
+            created = add_items(request.user.pk, [(service.pk, duration_days)])
             
             if created:
                 messages.success(request, f'Đã thêm "{service.name}" (Gói {duration_days} ngày) vào giỏ hàng.')
@@ -434,9 +561,19 @@ def add_to_cart(request, service_id): # <-- SỬA Ở ĐÂY (đổi 'pk' thành
 
 @login_required
 def view_cart(request):
-    cart_items = CartItem.objects.filter(user=request.user).select_related('service')
+    summary = get_cart_summary(request.user.pk)
+    # Giỏ trống (theo tóm tắt có cache) thì không cần truy vấn CartItem
+    cart_items = (
+        list(CartItem.objects.filter(user=request.user).select_related('service'))
+        if summary['count'] else []
+    )
+    # Giá theo thời hạn của từng dòng, tra trong bảng giá có cache (không thêm truy vấn)
+    matrix = price_matrix()
+    for item in cart_items:
+        item.line_price = price_for(item.service_id, item.duration_days, matrix)
     context = {
-        'cart_items': cart_items
+        'cart_items': cart_items,
+        'cart_summary': summary,
     }
     return render(request, 'services/cart.html', context)
 @login_required
@@ -444,5 +581,6 @@ def remove_from_cart(request, item_id):
     cart_item = get_object_or_404(CartItem, pk=item_id, user=request.user)
     item_name = cart_item.service.name
     cart_item.delete()
+    cart_changed(request.user.pk)
     messages.success(request, f'Đã xóa "{item_name}" khỏi giỏ hàng.')
     return redirect('services:view_cart')
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Conditional GET (ETag / Last-Modified) cho các trang public ít thay đổi.
+
+Validator được tính từ phiên bản catalog/blog (mốc thời gian lưu trong cache,
+xem services/cache.py và blog/cache.py) nên kiểm tra một request chỉ tốn vài
+lần đọc cache; trình duyệt/proxy gửi lại If-None-Match sẽ nhận 304 mà không
+phải chạy truy vấn hay render template.
+
+Trang có phần riêng của từng user (menu theo vai trò, nhắc nhở hồ sơ, form có
+CSRF token), nên ETag luôn kèm "dấu vân tay" của user. Last-Modified chỉ gửi
+cho khách chưa đăng nhập, vì If-Modified-Since không phân biệt được user.
+Request còn message chưa hiển thị thì bỏ qua conditional để message không bị mất.
+"""
+import hashlib
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from blog.cache import blog_version
+from services.cache import catalog_version, get_cart_summary, version_datetime
+
+
+def user_fingerprint(request):
+    """Những gì của user làm khác nội dung trang. None = không dùng conditional."""
+    if len(get_messages(request)):
+        return None
+    parts = [request.COOKIES.get('csrftoken', '')]
+    user = request.user
+    if user.is_authenticated:
+        # Cùng các trường mà users/context_processors.role_context dùng cho vai trò và nhắc nhở.
+        parts += [
+            user.pk, user.is_staff, user.is_parent_user,
+            bool(user.phone_number), bool(user.email), bool(user.address), bool(user.face_id_image),
+            # Badge giỏ hàng (services.context_processors.cart)
+            get_cart_summary(user.pk)['version'],
+        ]
+    return '|'.join(str(part) for part in parts)
+
+
+def _etag(request, versions):
+    fingerprint = user_fingerprint(request)
+    if fingerprint is None:
+        return None
+    raw = '|'.join(str(version) for version in versions) + '|' + fingerprint
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def conditional_page(versions_func):
+    """
+    Decorator: `versions_func(request, *args, **kwargs)` trả về danh sách phiên bản
+    (mốc thời gian ns) mà nội dung trang phụ thuộc, hoặc None nếu không áp dụng.
+    """
+    def etag_func(request, *args, **kwargs):
+        versions = versions_func(request, *args, **kwargs)
+        return _etag(request, versions) if versions else None
+
+    def last_modified_func(request, *args, **kwargs):
+        if request.user.is_authenticated or len(get_messages(request)):
+            return None
+        versions = versions_func(request, *args, **kwargs)
+        return version_datetime(max(versions)) if versions else None
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Luôn hỏi lại server (rẻ, nhờ 304); trang của user đăng nhập không cho proxy dùng chung.
+            if request.user.is_authenticated:
+                patch_cache_control(response, no_cache=True, private=True)
+            else:
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def catalog_versions(request, *args, **kwargs):
+    return [catalog_version()]
+
+
+def catalog_and_blog_versions(request, *args, **kwargs):
+    # Footer của mọi trang liệt kê category, nên trang blog cũng phụ thuộc catalog.
+    return [catalog_version(), blog_version()]
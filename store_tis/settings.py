@@ -16,6 +16,11 @@ INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'reports.apps.ReportsConfig',
     'orders.apps.OrdersConfig',
+    'search.apps.SearchConfig',
+    'mediastore.apps.MediastoreConfig',
+    'storefront.apps.StorefrontConfig',
+    'outbox.apps.OutboxConfig',
+    'archive.apps.ArchiveConfig',
     
     # Apps mặc định của Django
     'django.contrib.admin',
@@ -50,6 +55,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'users.context_processors.role_context',
+                'services.context_processors.cart',
             ],
         },
     },
@@ -64,6 +70,16 @@ DATABASES = {
     }
 }
 
+# Cache dùng chung cho các trang catalog (xem services/cache.py).
+# Khi chạy nhiều worker, nên đổi sang Redis/Memcached để việc xóa cache
+# bằng signal có hiệu lực trên mọi worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'store-tis',
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     { 'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator', },
     { 'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', },
@@ -85,6 +101,41 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# File upload được lưu theo nội dung (SHA-256) và khử trùng lặp, xem mediastore/storage.py
+STORAGES = {
+    'default': {
+        'BACKEND': 'mediastore.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Ảnh phái sinh cho thumbnail/gallery/logo/ảnh bài đăng (xem mediastore/derivatives.py)
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1280)
+IMAGE_DERIVATIVES_ASYNC = True
+IMAGE_DERIVATIVE_WORKERS = 2
+
+# Hóa đơn nháp hết hạn sau (giây); dọn bằng `manage.py purge_draft_orders`
+DRAFT_ORDER_TTL = 60 * 60
+
+# Bản HTML tĩnh của các trang public cho khách chưa đăng nhập (xem storefront/prerender.py)
+PRERENDER_ROOT = os.path.join(BASE_DIR, 'prerendered')
+
+# Sự kiện hóa đơn / dịch vụ được xử lý ngoài request bởi `manage.py drain_outbox`
+# (xem outbox/worker.py). Chưa có URL webhook thì handler webhook chỉ ghi log.
+OUTBOX_WEBHOOK_URL = None
+OUTBOX_WEBHOOK_SECRET = ''
+OUTBOX_MAX_ATTEMPTS = 8
+
+# Dịch vụ đã kết thúc, hóa đơn đã hủy và yêu cầu tư vấn đã hoàn thành cũ hơn số ngày này
+# được chuyển sang bảng lưu trữ bởi `manage.py archive_history` (xem archive/archiving.py).
+ARCHIVE_AFTER_DAYS = 365
+
+# Email thông báo (handler outbox 'email'); môi trường dev chỉ in ra console.
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'no-reply@tisbroker.com'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings 
 from django.conf.urls.static import static 
-from .views import home_page, ajax_search
+from .views import home_page, ajax_search, ajax_suggest
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,6 +15,7 @@ urlpatterns = [
     path('orders/', include('orders.urls')),
     
     path('ajax-search/', ajax_search, name='ajax_search'),
+    path('ajax-suggest/', ajax_suggest, name='ajax_suggest'),
 ]
 
 if settings.DEBUG:
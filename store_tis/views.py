@@ -1,11 +1,13 @@
 from django.shortcuts import render
 from django.http import JsonResponse
-from django.db.models import Q
 from django.template.loader import render_to_string
 from django.urls import reverse 
 from blog.models import Post
-from services.models import Service 
+from search.backends import search
+from search.suggest import suggestion_index, DEFAULT_LIMIT
+from .conditional import conditional_page, catalog_and_blog_versions
 
+@conditional_page(catalog_and_blog_versions)
 def home_page(request):
     """View cho trang chủ, tải các bài đăng quảng cáo."""
     posts = Post.objects.all().order_by('-created_at')[:5] 
@@ -25,29 +27,17 @@ def ajax_search(request):
     }
     
     if query and len(query) >= 2:
-        # Tìm Dịch vụ
-        service_qs = Service.objects.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query)
-        ).select_related('category')[:3]
-        
-        for service in service_qs:
+        # Tìm Dịch vụ (chỉ mục toàn văn, xem search/backends.py)
+        for service in search('services', query, limit=3):
             results['services'].append({
                 'name': service.name,
-                # --- SỬA LỖI Ở ĐÂY ---
                 'url': reverse('services:service_detail', args=[service.pk]),
-                # ---------------------
                 'category': service.category.name if service.category else 'Khác',
                 'thumbnail': service.thumbnail.url if service.thumbnail else None
             })
             
         # Tìm Bài đăng
-        post_qs = Post.objects.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query)
-        )[:3]
-        
-        for post in post_qs:
+        for post in search('posts', query, limit=3):
             results['posts'].append({
                 'name': post.title,
                 'url': post.get_absolute_url(),
@@ -55,4 +45,17 @@ def ajax_search(request):
             })
 
     html_results = render_to_string('components/search_results.html', {'results': results})
-    return JsonResponse({'html': html_results})
\ No newline at end of file
+    return JsonResponse({'html': html_results})
+
+def ajax_suggest(request):
+    """
+    Gợi ý tức thời khi gõ (typeahead), trả lời từ chỉ mục trong bộ nhớ,
+    không truy vấn DB.
+    """
+    query = request.GET.get('q', '')
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    suggestions = suggestion_index.suggest(query, limit=max(limit, 1))
+    return JsonResponse({'suggestions': [item.as_dict() for item in suggestions]})
@@ -0,0 +1,7 @@
+from django.contrib import admin
+from .models import PendingPage
+
+@admin.register(PendingPage)
+class PendingPageAdmin(admin.ModelAdmin):
+    list_display = ('path', 'queued_at')
+    search_fields = ('path',)
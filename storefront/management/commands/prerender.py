@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from storefront.models import PendingPage
+from storefront.prerender import all_paths, get_root, prerender, process_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Render sẵn các trang public (trang chủ, danh sách/category, chi tiết dịch vụ, bài đăng) '
+        'ra thư mục PRERENDER_ROOT để web server trả trực tiếp cho khách chưa đăng nhập.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Chỉ render các đường dẫn này (ví dụ /services/4/).')
+        parser.add_argument('--pending', action='store_true',
+                            help='Chỉ render lại các trang đã được signal xếp hàng (PendingPage).')
+        parser.add_argument('--watch', type=float, metavar='SECONDS',
+                            help='Cùng với --pending: chạy liên tục, kiểm tra hàng đợi sau mỗi SECONDS giây.')
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            while True:
+                done = process_pending()
+                if done:
+                    self.stdout.write(f'Đã render lại {done} trang.')
+                if not options['watch']:
+                    return
+                time.sleep(options['watch'])
+
+        started = timezone.now()
+        paths = options['paths'] or all_paths()
+        rendered = removed = 0
+        for path in paths:
+            if prerender(path):
+                rendered += 1
+            else:
+                removed += 1
+        if not options['paths']:
+            # Lần render toàn bộ đã bao gồm mọi trang xếp hàng trước thời điểm bắt đầu.
+            PendingPage.objects.filter(queued_at__lte=started).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'Đã render {rendered} trang vào {get_root()} ({removed} trang không còn tồn tại).'
+        ))
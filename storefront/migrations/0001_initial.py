@@ -0,0 +1,27 @@
+# Generated by Django 4.2.25 on 2026-10-18 06:54
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True, verbose_name='Path')),
+                ('queued_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Queued At')),
+            ],
+            options={
+                'verbose_name': 'Pending Page',
+                'verbose_name_plural': 'Pending Pages',
+            },
+        ),
+    ]
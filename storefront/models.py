@@ -0,0 +1,20 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class PendingPage(models.Model):
+    """
+    Một trang public cần render lại vào thư mục tĩnh (xem storefront/prerender.py).
+    Được thêm bởi signal khi nội dung liên quan thay đổi; `manage.py prerender --pending`
+    render lại rồi xóa dòng tương ứng.
+    """
+    path = models.CharField(_('Path'), max_length=500, unique=True)
+    queued_at = models.DateTimeField(_('Queued At'), default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = _('Pending Page')
+        verbose_name_plural = _('Pending Pages')
+
+    def __str__(self):
+        return self.path
@@ -0,0 +1,158 @@
+"""
+Render sẵn các trang public (khách chưa đăng nhập) ra file HTML tĩnh.
+
+    PRERENDER_ROOT/index.html                          <- /
+    PRERENDER_ROOT/services/index.html                 <- /services/
+    PRERENDER_ROOT/services/category/<slug>/index.html <- /services/category/<slug>/
+    PRERENDER_ROOT/services/<pk>/index.html            <- /services/<pk>/
+    PRERENDER_ROOT/blog/post/<slug>/index.html         <- /blog/post/<slug>/
+
+Web server phía trước trả thẳng file này cho request GET không có query string
+và không có cookie phiên đăng nhập, ví dụ với nginx:
+
+    location / {
+        if ($cookie_sessionid) { proxy_pass http://django; }
+        try_files /prerendered$uri/index.html @django;
+    }
+
+Khi nội dung đổi, signal (storefront/signals.py) chỉ xếp hàng những trang bị
+ảnh hưởng vào PendingPage; `manage.py prerender --pending` render lại chúng.
+Trang không còn tồn tại (404) thì file tĩnh bị xóa.
+"""
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve, reverse, Resolver404
+from django.utils import timezone
+
+from blog.models import Post
+from services.models import Service, Category
+
+from .models import PendingPage
+
+logger = logging.getLogger(__name__)
+
+
+# --- ĐƯỜNG DẪN CÁC TRANG ---
+
+def home_path():
+    return reverse('home')
+
+
+def service_list_path(category_slug=None):
+    if category_slug:
+        return reverse('services:service_list_by_category', args=[category_slug])
+    return reverse('services:service_list')
+
+
+def service_detail_path(pk):
+    return reverse('services:service_detail', args=[pk])
+
+
+def post_detail_path(slug):
+    return reverse('post_detail', args=[slug])
+
+
+def all_paths():
+    yield home_path()
+    yield service_list_path()
+    for slug in Category.objects.exclude(slug='').values_list('slug', flat=True):
+        yield service_list_path(slug)
+    for pk in Service.objects.values_list('pk', flat=True).iterator():
+        yield service_detail_path(pk)
+    for slug in Post.objects.exclude(slug='').values_list('slug', flat=True).iterator():
+        yield post_detail_path(slug)
+
+
+# --- RENDER VÀ GHI FILE ---
+
+def get_root():
+    return settings.PRERENDER_ROOT
+
+
+def file_for(path):
+    return os.path.join(get_root(), path.strip('/'), 'index.html')
+
+
+def render_path(path):
+    """Render `path` như một khách chưa đăng nhập. Trả về HTML, hoặc None nếu 404."""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Http404:
+        return None
+    if response.status_code != 200:
+        return None
+    return response.content
+
+
+def write_page(path, content):
+    """Ghi file qua một file tạm rồi đổi tên, để web server không đọc phải file dở dang."""
+    target = file_for(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix='.prerender-')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(content)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def delete_page(path):
+    target = file_for(path)
+    if os.path.exists(target):
+        os.remove(target)
+
+
+def prerender(path):
+    """Render lại một trang. Trả về True nếu đã ghi, False nếu trang không còn (đã xóa file)."""
+    content = render_path(path)
+    if content is None:
+        delete_page(path)
+        return False
+    write_page(path, content)
+    return True
+
+
+# --- HÀNG ĐỢI ---
+
+def queue_paths(paths):
+    """Xếp hàng các trang cần render lại (gộp trùng theo path, cập nhật thời điểm)."""
+    paths = {path for path in paths if path}
+    if not paths:
+        return
+    now = timezone.now()
+    PendingPage.objects.bulk_create(
+        [PendingPage(path=path, queued_at=now) for path in paths],
+        update_conflicts=True, unique_fields=['path'], update_fields=['queued_at'],
+    )
+
+
+def process_pending(batch_size=100):
+    """Render lại các trang đang chờ. Trả về số trang đã xử lý."""
+    done = 0
+    while True:
+        pages = list(PendingPage.objects.order_by('queued_at')[:batch_size])
+        if not pages:
+            return done
+        for page in pages:
+            try:
+                prerender(page.path)
+            except Exception:
+                logger.exception('Lỗi khi render sẵn %s', page.path)
+            # Chỉ xóa nếu không bị xếp hàng lại trong lúc đang render.
+            PendingPage.objects.filter(pk=page.pk, queued_at=page.queued_at).delete()
+            done += 1
@@ -0,0 +1,111 @@
+"""
+Xếp hàng render lại các trang tĩnh bị ảnh hưởng khi nội dung thay đổi.
+Chỉ ghi vào PendingPage (sau khi transaction commit); việc render do
+`manage.py prerender --pending` đảm nhận.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
+from django.dispatch import receiver
+
+from blog.models import Post
+from services.models import Service, ServiceImage, ServiceDetail, ServicePrice, Category, Supplier
+
+from .prerender import (
+    all_paths, home_path, post_detail_path, queue_paths, service_detail_path, service_list_path,
+)
+
+
+def _queue(paths):
+    paths = list(paths)
+    transaction.on_commit(lambda: queue_paths(paths))
+
+
+def _service_pages(service, category_slugs=()):
+    """Trang chi tiết của dịch vụ và các trang danh sách có thể chứa nó."""
+    yield service_detail_path(service.pk)
+    yield service_list_path()
+    for slug in category_slugs:
+        if slug:
+            yield service_list_path(slug)
+
+
+# --- DỊCH VỤ ---
+
+@receiver(pre_save, sender=Service)
+def remember_old_category(sender, instance, raw=False, **kwargs):
+    # Đổi category thì trang danh sách của category CŨ cũng phải render lại.
+    instance._prerender_old_category = None
+    if instance.pk and not raw:
+        instance._prerender_old_category = (
+            Service.objects.filter(pk=instance.pk).values_list('category__slug', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def queue_service(sender, instance, **kwargs):
+    slugs = {getattr(instance, '_prerender_old_category', None)}
+    if instance.category_id:
+        slugs.add(Category.objects.filter(pk=instance.category_id).values_list('slug', flat=True).first())
+    _queue(_service_pages(instance, slugs))
+
+
+@receiver(post_save, sender=ServiceImage)
+@receiver(post_delete, sender=ServiceImage)
+@receiver(post_save, sender=ServiceDetail)
+@receiver(post_delete, sender=ServiceDetail)
+@receiver(post_save, sender=ServicePrice)
+@receiver(post_delete, sender=ServicePrice)
+def queue_service_child(sender, instance, **kwargs):
+    _queue([service_detail_path(instance.service_id)])
+
+
+# --- CATEGORY / NHÀ CUNG CẤP ---
+
+@receiver(pre_save, sender=Category)
+def remember_old_category_slug(sender, instance, raw=False, **kwargs):
+    instance._prerender_old_slug = None
+    if instance.pk and not raw:
+        instance._prerender_old_slug = Category.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def queue_category(sender, instance, **kwargs):
+    # Footer của mọi trang liệt kê category: render lại toàn bộ, kể cả trang của slug cũ
+    # (không còn tồn tại thì file tĩnh bị xóa).
+    paths = list(all_paths())
+    paths += [service_list_path(slug) for slug in (instance.slug, getattr(instance, '_prerender_old_slug', None)) if slug]
+    _queue(paths)
+
+
+@receiver(post_save, sender=Supplier)
+def queue_supplier(sender, instance, **kwargs):
+    _queue(service_detail_path(pk) for pk in instance.services.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Supplier)
+def queue_services_of_deleted_supplier(sender, instance, **kwargs):
+    # Sau khi xóa, FK của Service bị SET_NULL (không có signal) nên lấy danh sách trước.
+    _queue(service_detail_path(pk) for pk in instance.services.values_list('pk', flat=True))
+
+
+# --- BÀI ĐĂNG ---
+
+@receiver(pre_save, sender=Post)
+def remember_old_slug(sender, instance, raw=False, **kwargs):
+    instance._prerender_old_slug = None
+    if instance.pk and not raw:
+        instance._prerender_old_slug = Post.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def queue_post(sender, instance, **kwargs):
+    # Mỗi trang bài đăng có mục "bài khác", nên render lại mọi bài cùng trang chủ.
+    paths = [home_path(), post_detail_path(instance.slug)]
+    old_slug = getattr(instance, '_prerender_old_slug', None)
+    if old_slug and old_slug != instance.slug:
+        paths.append(post_detail_path(old_slug))
+    paths += [post_detail_path(slug) for slug in Post.objects.exclude(slug='').values_list('slug', flat=True)]
+    _queue(paths)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_consultationrequest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['status', 'completed_at'], name='consult_status_completed_idx'),
+        ),
+    ]
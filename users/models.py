@@ -132,6 +132,10 @@ class ConsultationRequest(models.Model):
         verbose_name = _("Yêu cầu Tư vấn")
         verbose_name_plural = _("Các yêu cầu Tư vấn")
         ordering = ['-created_at']
+        indexes = [
+            # Cho `manage.py archive_history`: yêu cầu đã hoàn thành, theo ngày hoàn thành
+            models.Index(fields=['status', 'completed_at'], name='consult_status_completed_idx'),
+        ]
 
     def __str__(self):
         service_name = self.service.name if self.service else "[Dịch vụ đã xóa]"
@@ -18,6 +18,10 @@ from .forms import (
 from .models import User, ConsultationRequest
 # --- SỬA LỖI IMPORT ---
 from services.models import UserSubscription, Service
+from services.entitlements import invalidate_entitlements
+from services.subscriptions import deactivate_subscriptions
+from archive.history import consultation_page, ended_subscription_count, ended_subscriptions
+from services.pagination import keyset_paginate, InvalidCursor
 # ---------------------
 from django.utils.crypto import get_random_string
 import random
@@ -47,53 +51,35 @@ from django.db.models import Q # <-- THÊM DÒNG NÀY (nếu chưa có)
 def dashboard(request):
     user = request.user
     context = {}
-    now = timezone.now()
-    expiring_threshold = now + timedelta(days=7) 
 
     # --- 1. Lấy dịch vụ CHO CHÍNH USER ĐANG ĐĂNG NHẬP ---
+    # Dùng trường `status` lưu sẵn (UserSubscription.compute_status, cập nhật bởi
+    # save() và `manage.py expire_subscriptions`): mỗi mục là một lần quét theo
+    # index (user, status, expiration_date) thay vì các điều kiện OR.
     
     # Lấy TẤT CẢ dịch vụ của user này
     all_my_subs = UserSubscription.objects.filter(
         user=user
     ).select_related('service', 'purchased_by')
 
-    # --- START FIX: Sửa logic lọc 'active' ---
-    # "Active" bao gồm:
-    # 1. (Đã xác minh VÀ còn hạn)
-    # 2. (CHƯA xác minh VÀ đang active)
+    # "Active": chờ xác minh, còn hạn, hoặc sắp hết hạn.
+    # Sắp hết hạn (verified) lên đầu, Chờ (None) xuống cuối
     active_subs = all_my_subs.filter(
-        Q(
-            is_verified=True,
-            expiration_date__gt=now,
-            is_active=True
-        ) |
-        Q(
-            is_verified=False,
-            is_active=True
-        )
-    ).order_by('expiration_date') # Sắp hết hạn (verified) lên đầu, Chờ (None) xuống cuối
-    
-    # Lọc ra các dịch vụ SẮP HẾT HẠN (từ danh sách CÒN HẠN đã lọc ở trên)
-    # (Chỉ lọc những cái đã xác minh, vì cái chưa xác minh thì expiration_date=None)
-    expiring_soon_subs = active_subs.filter(
-        is_verified=True,
-        expiration_date__lte=expiring_threshold
-    )
+        status__in=UserSubscription.CURRENT_STATUSES
+    ).order_by('expiration_date')
     
-    # "Expired" bao gồm:
-    # 1. (Đã xác minh VÀ đã hết hạn)
-    # 2. (Bị tắt is_active=False)
-    expired_subs = all_my_subs.filter(
-        Q(is_verified=True, expiration_date__lte=now) |
-        Q(is_active=False)
-    ).order_by('-expiration_date')
+    # Sắp hết hạn: còn <= 7 ngày (UserSubscription.EXPIRING_WINDOW)
+    expiring_soon_subs = all_my_subs.filter(status='expiring').order_by('expiration_date')
     
-    # --- END FIX ---
+    # "Expired": đã hết hạn hoặc bị tắt (is_active=False), kể cả dịch vụ đã lưu trữ.
+    # Chỉ hiện các mục gần nhất (archive/history.py), kèm tổng số.
+    expired_subs = ended_subscriptions(user=user)
 
     # Thêm vào context
     context['active_subscriptions'] = active_subs
     context['expiring_soon_subscriptions'] = expiring_soon_subs
     context['expired_subscriptions'] = expired_subs
+    context['expired_subscription_count'] = ended_subscription_count(user=user)
 
     # --- 2. Logic cho Parent User (QUẢN LÝ DỊCH VỤ CỦA CON) ---
     if user.is_parent_user and not user.is_staff:
@@ -106,16 +92,16 @@ def dashboard(request):
             user=user
         ).select_related('service', 'user')
 
-        # Áp dụng logic lọc tương tự cho các dịch vụ mua cho con
+        # Áp dụng logic lọc tương tự cho các dịch vụ mua cho con (index (purchased_by, status))
         context['purchased_for_others_active'] = purchased_for_others.filter(
-            Q(is_verified=True, expiration_date__gt=now, is_active=True) |
-            Q(is_verified=False, is_active=True)
+            status__in=UserSubscription.CURRENT_STATUSES
         ).order_by('user__email', 'expiration_date')
         
-        context['purchased_for_others_expired'] = purchased_for_others.filter(
-            Q(is_verified=True, expiration_date__lte=now) |
-            Q(is_active=False)
-        ).order_by('user__email', '-expiration_date')
+        context['purchased_for_others_expired'] = sorted(
+            ended_subscriptions(~Q(user=user), purchased_by=user),
+            key=lambda sub: sub.user.email or '',
+        )
+        context['purchased_for_others_expired_count'] = ended_subscription_count(~Q(user=user), purchased_by=user)
 
     # --- 3. Logic cho Child User ---
     elif user.parent is not None:
@@ -180,7 +166,9 @@ def delete_child_user(request, pk):
     child_user = get_object_or_404(User, pk=pk, parent=request.user)
     if request.method == 'POST':
         child_user.parent = None; child_user.save()
-        UserSubscription.objects.filter(user=child_user, purchased_by=request.user).update(is_active=False)
+        # UPDATE hàng loạt không qua save(): status tính như compute_status() ('expired' / 'disabled')
+        deactivate_subscriptions(UserSubscription.objects.filter(user=child_user, purchased_by=request.user))
+        invalidate_entitlements(child_user.pk)
         child_name = child_user.full_name or child_user.phone_number or child_user.cccd
         messages.success(request, f'Đã xóa user con {child_name} khỏi danh sách của bạn.')
         return redirect('dashboard')
@@ -258,6 +246,9 @@ def request_consultation(request, service_id):
         messages.success(request, f'Đã gửi yêu cầu tư vấn cho "{service.name}". Staff sẽ liên hệ bạn sớm nhất!')
     return redirect('service_detail', pk=service_id)
 
+CONSULTATION_PAGE_SIZE = 50
+
+
 @login_required
 def consultation_list(request):
     if not request.user.is_staff:
@@ -268,15 +259,27 @@ def consultation_list(request):
         base_queryset = ConsultationRequest.objects.all()
     else:
         base_queryset = ConsultationRequest.objects.filter(assigned_staff=request.user)
-    if status_filter == 'pending':
-        consult_list = base_queryset.filter(status__in=['new', 'assigned']).select_related('user', 'service')
-    elif status_filter == 'completed':
-        consult_list = base_queryset.filter(status='completed').select_related('user', 'service')
-    else: # 'all'
-        consult_list = base_queryset.select_related('user', 'service')
+    # Yêu cầu đã hoàn thành lâu được chuyển sang bảng lưu trữ (archive/archiving.py):
+    # 'completed' và 'all' đọc cả hai bảng.
+    staff_filter = {} if request.user.is_superuser else {'assigned_staff': request.user}
+    cursor = request.GET.get('cursor')
+    try:
+        if status_filter == 'pending':
+            page = keyset_paginate(
+                base_queryset.filter(status__in=['new', 'assigned']).select_related('user', 'service'),
+                cursor=cursor, per_page=CONSULTATION_PAGE_SIZE, keys=('created_at', 'id'),
+            )
+        elif status_filter == 'completed':
+            page = consultation_page(cursor=cursor, per_page=CONSULTATION_PAGE_SIZE, status='completed', **staff_filter)
+        else: # 'all'
+            page = consultation_page(cursor=cursor, per_page=CONSULTATION_PAGE_SIZE, **staff_filter)
+    except InvalidCursor:
+        return redirect('consultation_list')
     context = {
-        'consult_list': consult_list,
-        'current_filter': status_filter
+        'consult_list': page.items,
+        'current_filter': status_filter,
+        'next_cursor': page.next_cursor,
+        'is_first_page': not cursor,
     }
     return render(request, 'users/consultation_list.html', context)
 